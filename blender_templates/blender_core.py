@@ -0,0 +1,77 @@
+"""Blender-side building blocks shared by every renderer's scene script
+
+Scripts put this directory on sys.path and import from here, so GPU selection, scene
+reset, node-group sockets and the basic material factory are maintained in one place.
+"""
+import bpy
+
+GPU_BACKENDS = ('OPTIX', 'CUDA', 'HIP', 'ONEAPI', 'METAL')
+
+def clear_scene():
+    """Remove every object, mesh, material and related datablock in one batch"""
+    bpy.data.batch_remove(ids=(*bpy.data.objects, *bpy.data.meshes, *bpy.data.materials, *bpy.data.node_groups,
+                               *bpy.data.lights, *bpy.data.cameras, *bpy.data.collections))
+
+def setup_gpu(scene, preferred=GPU_BACKENDS):
+    """Switch the scene to Cycles on the first compute backend that reports a device
+
+    Probing in order of preference means AMD/Intel/Apple GPUs and NVIDIA boxes without
+    OptiX still render on the GPU instead of silently falling back to CPU. Returns the
+    backend name, or None when rendering on the CPU.
+    """
+    scene.render.engine = 'CYCLES'
+    prefs = bpy.context.preferences
+    cprefs = prefs.addons['cycles'].preferences
+
+    print("Configuring GPU for rendering...")
+    gpu_backend = None
+    for backend in preferred:
+        try:
+            cprefs.compute_device_type = backend
+        except TypeError:
+            continue  # Backend not compiled into this Blender build
+        cprefs.get_devices()
+        if any(device.type == backend for device in cprefs.devices):
+            gpu_backend = backend
+            break
+
+    for i, device in enumerate(cprefs.devices):
+        device.use = device.type == gpu_backend
+        if device.use:
+            print(f"ENABLED GPU {i}: {device.name} ({device.type})")
+
+    if gpu_backend:
+        scene.cycles.device = 'GPU'
+        print(f"GPU configured for rendering with {gpu_backend}")
+    else:
+        cprefs.compute_device_type = 'NONE'
+        scene.cycles.device = 'CPU'
+        print("WARNING: No GPU backend found, falling back to CPU")
+    return gpu_backend
+
+def add_group_socket(group, in_out, socket_type, name):
+    """Add a node group socket on Blender 4.0+ (group.interface) and 3.x (inputs/outputs)"""
+    if hasattr(group, "interface"):
+        return group.interface.new_socket(name, in_out=in_out, socket_type=socket_type)
+    sockets = group.inputs if in_out == 'INPUT' else group.outputs
+    return sockets.new(socket_type, name)
+
+def create_simple_material(name, color, roughness=0.5, metallic=0.0):
+    """Single Principled BSDF material"""
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    nodes.clear()
+
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.inputs["Base Color"].default_value = (*color, 1.0)
+    bsdf.inputs["Roughness"].default_value = roughness
+    bsdf.inputs["Metallic"].default_value = metallic
+
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+    return mat
+
+def build_materials(defs):
+    """{key: (name, color, roughness[, metallic])} -> {key: material}"""
+    return {key: create_simple_material(*spec) for key, spec in defs.items()}
@@ -0,0 +1,64 @@
+"""Long-lived Blender worker driven by blender_worker_pool.py
+
+    blender --factory-startup --background --python blender_worker.py
+
+Each stdin line is a JSON argv list: a script path followed by the arguments the script
+reads after '--'. Static scripts in this directory are compiled once per process and
+recompiled only when the file changes; any other script is compiled for each job, so
+per-scene scripts never pile up in the cache. The file is reset to an empty scene
+between scripts (preferences and GPU kernels survive), and a sentinel line reports each
+outcome back to the driver.
+
+Before the first script the worker renders a 16x16, one-sample frame of the empty scene,
+so GPU context creation and kernel loading happen while the driver is still preparing
+the job instead of inside the first real render.
+"""
+import os
+import sys
+import json
+import traceback
+import bpy
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import setup_gpu
+
+DONE_SENTINEL = '__CONSTRUCTAI_DONE__'  # Must match blender_worker_pool.DONE_SENTINEL
+
+def warm_up():
+    scene = bpy.context.scene
+    setup_gpu(scene)
+    scene.cycles.samples = 1
+    scene.cycles.use_denoising = False
+    scene.render.resolution_x = scene.render.resolution_y = 16
+    bpy.ops.render.render(write_still=False)
+
+try:
+    warm_up()
+except Exception:
+    traceback.print_exc()  # Not fatal, the first job just pays the start-up cost itself
+
+compiled = {}
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    bpy.ops.wm.read_homefile(use_empty=True)
+    try:
+        argv = json.loads(line)
+        script_path = argv[0]
+        mtime = os.path.getmtime(script_path)
+        if compiled.get(script_path, (None,))[0] == mtime:
+            code = compiled[script_path][1]
+        else:
+            with open(script_path, encoding='utf-8') as f:
+                code = compile(f.read(), script_path, 'exec')
+            if os.path.dirname(os.path.abspath(script_path)) == script_dir:
+                compiled[script_path] = (mtime, code)
+        sys.argv = ['blender', '--python', *argv]
+        exec(code, {'__name__': '__main__', '__file__': script_path})
+        status = 'OK'
+    except Exception:
+        traceback.print_exc()
+        status = 'ERROR'
+    print('%s %s' % (DONE_SENTINEL, status), flush=True)
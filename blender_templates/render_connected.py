@@ -0,0 +1,131 @@
+"""Build and render a connected floor plan
+
+Run by Blender with the per-scene layout passed as a JSON file:
+    blender --background --python render_connected.py -- --config layout.json
+The script itself never changes between requests; improved_connected_renderer.py computes
+every box and writes the OBJ/MTL pair while this runs.
+"""
+import os
+import sys
+import json
+import argparse
+import bpy
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import build_materials, clear_scene, setup_gpu
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render a connected floor plan")
+    parser.add_argument('--config', required=True, help="JSON layout written by the driver")
+    return parser.parse_args(argv)
+
+# Every box was computed by the driver; the script only creates them
+with open(parse_args().config, encoding='utf-8') as f:
+    layout = json.load(f)
+
+scene_id = layout['scene_id']
+output_prefix = f"{layout['output_dir']}/improved_floor_plan_{scene_id}"
+
+# Clear everything
+clear_scene()
+
+scene = bpy.context.scene
+
+# Render on the GPU the worker already warmed up; without this Cycles stays on the CPU
+# and the kernels compiled at worker boot go unused
+setup_gpu(scene)
+
+# Create room-specific materials
+materials = build_materials(layout['materials'])
+
+building_width = layout['building']['total_width']
+building_length = layout['building']['total_length']
+building_height = layout['building']['height']
+
+# Boxes are built through the data API instead of primitive_cube_add, which pays for an
+# undo push and a depsgraph update per call. Every box links one shared unit cube, so the
+# .blend stores its 8 vertices once; materials are linked per object, not on the mesh
+unit_cube = bpy.data.meshes.new("unit_cube")
+unit_cube.from_pydata(layout['box_corners'], [], layout['box_faces'])
+unit_cube.materials.append(None)
+
+def make_box(name, location, scale, material):
+    obj = bpy.data.objects.new(name, unit_cube)
+    obj.location = location
+    obj.scale = scale
+    bpy.context.collection.objects.link(obj)
+    obj.material_slots[0].link = 'OBJECT'
+    obj.material_slots[0].material = material
+    return obj
+
+# Foundation, floors, walls, doors, furniture and the connecting hallway
+boxes = layout['boxes']
+for name, location, scale, material_key in zip(boxes['names'], boxes['centers'], boxes['scales'], boxes['keys']):
+    make_box(name, location, scale, materials[material_key])
+
+# Add lighting
+light_data = bpy.data.lights.new(name="Sun", type='SUN')
+light_data.energy = 5
+light_object = bpy.data.objects.new(name="Sun", object_data=light_data)
+bpy.context.collection.objects.link(light_object)
+light_object.location = (building_width, building_length, building_height * 2)
+light_object.rotation_euler = (0.785, 0, 0.785)
+
+# Add area light for better illumination
+area_light = bpy.data.lights.new(name="Area", type='AREA')
+area_light.energy = 100
+area_light.size = 15
+area_object = bpy.data.objects.new(name="Area", object_data=area_light)
+bpy.context.collection.objects.link(area_object)
+area_object.location = (0, 0, building_height * 1.5)
+
+# Position camera for good view
+camera = bpy.data.objects.new("Camera", bpy.data.cameras.new("Camera"))
+bpy.context.collection.objects.link(camera)
+camera.location = (building_width*0.7, -building_length*0.7, building_height*0.7)
+camera.rotation_euler = (1.0, 0, 0.785)
+scene.camera = camera
+
+# Configure render settings
+render_settings = layout['render']
+scene.render.resolution_x, scene.render.resolution_y = render_settings['resolution']
+scene.render.film_transparent = False
+scene.cycles.samples = render_settings['samples']
+scene.cycles.use_denoising = render_settings['denoise']
+if render_settings['adaptive_threshold'] is not None:
+    scene.cycles.use_adaptive_sampling = True
+    scene.cycles.adaptive_threshold = render_settings['adaptive_threshold']
+
+# One frame of a few dozen boxes: a quick BVH beats an optimal one, and nothing is worth
+# caching or writing to disk between tiles. Some settings only exist in older versions
+for owner, setting, value in ((scene.cycles, 'debug_use_spatial_splits', False),
+                              (scene.cycles, 'debug_bvh_time_steps', 0),
+                              (scene.cycles, 'use_progressive_refine', False),
+                              (scene.cycles, 'cache_bvh', False),
+                              (scene.render, 'use_save_buffers', False),
+                              (scene.render, 'use_persistent_data', False)):
+    if hasattr(owner, setting):
+        setattr(owner, setting, value)
+
+# Save blend file
+blend_file = output_prefix + ".blend"
+bpy.ops.wm.save_as_mainfile(filepath=blend_file)
+print("BLEND_FILE: " + blend_file)
+
+# The driver writes the OBJ and MTL from the same boxes while this script runs
+print("OBJ_FILE: " + layout['obj_file'])
+print("MTL_FILE: " + layout['mtl_file'])
+
+# Render preview image
+try:
+    render_file = output_prefix + ".png"
+    scene.render.filepath = render_file
+    bpy.ops.render.render(write_still=True)
+    print("RENDER_FILE: " + render_file)
+except Exception as e:
+    print("Render failed: " + str(e))
+
+print("SCENE_ID: " + scene_id)
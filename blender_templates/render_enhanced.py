@@ -0,0 +1,674 @@
+"""Build, export and render an enhanced BOQ scene
+
+Run by Blender with the per-scene settings passed as a JSON file:
+    blender --background --python render_enhanced.py -- --config scene.json
+The script itself never changes between requests.
+"""
+import os
+import sys
+import json
+import argparse
+import contextlib
+import bpy
+import bmesh
+import math
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import add_group_socket, clear_scene, setup_gpu
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render an enhanced BOQ scene")
+    parser.add_argument('--config', required=True, help="JSON settings written by the driver")
+    return parser.parse_args(argv)
+
+with open(parse_args().config, encoding='utf-8') as f:
+    config = json.load(f)
+
+scene_id = config['scene_id']
+output_prefix = f"{config['output_dir']}/enhanced_boq_{scene_id}"
+
+# Clear everything in one batch instead of per-datablock removes
+clear_scene()
+
+scene = bpy.context.scene
+
+gpu_backend = setup_gpu(scene)
+
+# Adaptive sampling - samples is only the ceiling, the noise threshold stops
+# flat walls and sky early while detailed areas keep refining
+scene.cycles.samples = 4096
+scene.cycles.use_denoising = True  # Final render only, applied once after sampling
+scene.cycles.use_preview_denoising = False
+scene.cycles.denoiser = 'OPTIX' if gpu_backend == 'OPTIX' else 'OPENIMAGEDENOISE'
+scene.cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
+scene.cycles.use_adaptive_sampling = True
+try:
+    scene.cycles.sampling_pattern = 'BLUE_NOISE'  # Blender 4.2+
+except TypeError:
+    scene.cycles.sampling_pattern = 'PROGRESSIVE_MULTI_JITTER'
+scene.cycles.adaptive_min_samples = 32
+scene.cycles.adaptive_threshold = 0.01
+scene.cycles.time_limit = config['time_limit']  # Seconds per view, 0 = no limit
+
+# Light path limits - interior paths rarely contribute past a few bounces and the scene
+# has no caustic features, so trimming them saves work on every sample
+for setting, value in config['light_paths'].items():
+    setattr(scene.cycles, setting, value)
+
+# Render resolution chosen by the caller - 1080p unless the ultra quality level asks for more,
+# the denoiser carries perceived quality at the lower pixel count
+scene.render.resolution_x, scene.render.resolution_y = config['resolution']
+scene.render.resolution_percentage = 100
+
+# Large tiles keep GPU kernel launches per frame low, and spatial splits give a tighter BVH
+# for the many axis-aligned boxes; render buffers stay in memory instead of staging to disk
+if hasattr(scene.cycles, 'tile_size'):  # Blender 3.0+
+    scene.cycles.use_auto_tile = True
+    scene.cycles.tile_size = 2048
+else:
+    scene.render.tile_x = 512
+    scene.render.tile_y = 512
+if hasattr(scene.render, 'use_save_buffers'):
+    scene.render.use_save_buffers = False
+scene.cycles.debug_use_spatial_splits = True
+
+# Static single-frame scene - motion blur only when the BOQ asks for animation
+scene.render.use_motion_blur = config['animate']
+scene.render.motion_blur_shutter = 0.5
+
+# Shared shader subgraphs - the noise-driven bump and colour variation are identical
+# across materials, so they are built once as node groups and instanced per material
+def create_bump_noise_group():
+    group = bpy.data.node_groups.new("BumpNoise", 'ShaderNodeTree')
+    add_group_socket(group, 'INPUT', 'NodeSocketFloat', "Strength")
+    add_group_socket(group, 'OUTPUT', 'NodeSocketVector', "Normal")
+    group_in = group.nodes.new('NodeGroupInput')
+    group_out = group.nodes.new('NodeGroupOutput')
+    
+    noise = group.nodes.new(type='ShaderNodeTexNoise')
+    noise.inputs["Scale"].default_value = 15.0
+    noise.inputs["Detail"].default_value = 10.0
+    noise.inputs["Roughness"].default_value = 0.5
+    
+    bump = group.nodes.new(type='ShaderNodeBump')
+    group.links.new(group_in.outputs["Strength"], bump.inputs["Strength"])
+    group.links.new(noise.outputs["Fac"], bump.inputs["Height"])
+    group.links.new(bump.outputs["Normal"], group_out.inputs["Normal"])
+    return group
+
+def create_color_variation_group():
+    group = bpy.data.node_groups.new("ColorVariation", 'ShaderNodeTree')
+    add_group_socket(group, 'INPUT', 'NodeSocketColor', "Color")
+    add_group_socket(group, 'INPUT', 'NodeSocketColor', "Variation")
+    add_group_socket(group, 'OUTPUT', 'NodeSocketColor', "Color")
+    group_in = group.nodes.new('NodeGroupInput')
+    group_out = group.nodes.new('NodeGroupOutput')
+    
+    noise = group.nodes.new(type='ShaderNodeTexNoise')
+    noise.inputs["Scale"].default_value = 25.0
+    
+    # Linear two-stop ramp between the base and variation colours
+    try:
+        mix = group.nodes.new(type='ShaderNodeMix')
+        mix.data_type = 'RGBA'
+        fac, color_a, color_b, result = mix.inputs[0], mix.inputs[6], mix.inputs[7], mix.outputs[2]
+    except RuntimeError:
+        mix = group.nodes.new(type='ShaderNodeMixRGB')
+        fac, color_a, color_b, result = mix.inputs[0], mix.inputs[1], mix.inputs[2], mix.outputs[0]
+    
+    group.links.new(noise.outputs["Fac"], fac)
+    group.links.new(group_in.outputs["Color"], color_a)
+    group.links.new(group_in.outputs["Variation"], color_b)
+    group.links.new(result, group_out.inputs["Color"])
+    return group
+
+bump_noise_group = create_bump_noise_group()
+color_variation_group = create_color_variation_group()
+
+# Ultra-premium material library with realistic textures and advanced shading
+def create_advanced_material(name, base_color, roughness=0.5, metallic=0.0, emission=None, normal_strength=0.0, subsurface=0.0, transmission=0.0, ior=1.45):
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    nodes.clear()
+    
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.inputs["Base Color"].default_value = (*base_color, 1.0)
+    bsdf.inputs["Roughness"].default_value = roughness
+    bsdf.inputs["Metallic"].default_value = metallic
+    bsdf.inputs["IOR"].default_value = ior
+    
+    # Add subsurface scattering for organic materials
+    if subsurface > 0:
+        if "Subsurface" in bsdf.inputs:
+            bsdf.inputs["Subsurface"].default_value = subsurface
+        elif "Subsurface Weight" in bsdf.inputs:
+            bsdf.inputs["Subsurface Weight"].default_value = subsurface
+            if "Subsurface Color" in bsdf.inputs:
+                bsdf.inputs["Subsurface Color"].default_value = (*base_color, 1.0)
+    
+    # Add transmission for glass materials
+    if transmission > 0:
+        if "Transmission" in bsdf.inputs:
+            bsdf.inputs["Transmission"].default_value = transmission
+        elif "Transmission Weight" in bsdf.inputs:
+            bsdf.inputs["Transmission Weight"].default_value = transmission
+    
+    # Add procedural noise for realistic surface variation
+    if normal_strength > 0:
+        bump = nodes.new(type='ShaderNodeGroup')
+        bump.node_tree = bump_noise_group
+        bump.inputs["Strength"].default_value = normal_strength
+        mat.node_tree.links.new(bump.outputs["Normal"], bsdf.inputs["Normal"])
+    
+    # Add color variation
+    color_variation = nodes.new(type='ShaderNodeGroup')
+    color_variation.node_tree = color_variation_group
+    color_variation.inputs["Color"].default_value = (*base_color, 1.0)
+    variation_color = [min(1.0, c * 1.2) for c in base_color]  # Slightly brighter variation
+    color_variation.inputs["Variation"].default_value = (*variation_color, 1.0)
+    mat.node_tree.links.new(color_variation.outputs["Color"], bsdf.inputs["Base Color"])
+    
+    if emission:
+        # Handle emission for advanced lighting
+        try:
+            bsdf.inputs["Emission"].default_value = (*emission, 1.0)
+            bsdf.inputs["Emission Strength"].default_value = 3.0
+        except KeyError:
+            try:
+                bsdf.inputs["Emission Color"].default_value = (*emission, 1.0)
+                bsdf.inputs["Emission Strength"].default_value = 3.0
+            except KeyError:
+                emission_shader = nodes.new(type='ShaderNodeEmission')
+                emission_shader.inputs["Color"].default_value = (*emission, 1.0)
+                emission_shader.inputs["Strength"].default_value = 3.0
+                
+                add_shader = nodes.new(type='ShaderNodeAddShader')
+                mat.node_tree.links.new(bsdf.outputs["BSDF"], add_shader.inputs[0])
+                mat.node_tree.links.new(emission_shader.outputs["Emission"], add_shader.inputs[1])
+                mat.node_tree.links.new(add_shader.outputs["Shader"], output.inputs["Surface"])
+                return mat
+    
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+    return mat
+
+# Material specs for the keys this scene references, selected by the driver.
+# Shader graphs are built on first use by get_material().
+MATERIAL_SPECS = config['material_specs']
+
+# Materials built by earlier renders are appended from a .blend library; anything missing
+# or built from different parameters is constructed here and written back afterwards
+MATERIAL_LIBRARY_PATH = config['material_library_path']
+
+_material_cache = {}
+_built_materials = []
+
+if os.path.exists(MATERIAL_LIBRARY_PATH):
+    needed_names = {spec[0] for spec in MATERIAL_SPECS.values()}
+    with bpy.data.libraries.load(MATERIAL_LIBRARY_PATH, link=False) as (src, dst):
+        dst.materials = [name for name in src.materials if name in needed_names]
+    for material in dst.materials:
+        if material is not None:
+            _material_cache[material.name] = material
+
+def get_material(key):
+    # Cached by spec name so keys that fell back to the same spec share one material
+    spec = MATERIAL_SPECS[key]
+    material = _material_cache.get(spec[0])
+    if material is not None and material.get('constructai_spec') != repr(spec):
+        material.name = spec[0] + " (stale)"
+        material = None
+    if material is None:
+        material = _material_cache[spec[0]] = create_advanced_material(*spec)
+        material['constructai_spec'] = repr(spec)
+        _built_materials.append(material)
+    return material
+
+@contextlib.contextmanager
+def material_library_lock():
+    # Renders run in parallel Blender processes - serialise the load/merge/write so one
+    # process never replaces the library without the materials another just added
+    with open(MATERIAL_LIBRARY_PATH + ".lock", 'a+b') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def save_material_library():
+    if not _built_materials:
+        return
+    
+    with material_library_lock():
+        # Carry over library entries this scene did not use so the library only grows
+        carried = []
+        if os.path.exists(MATERIAL_LIBRARY_PATH):
+            with bpy.data.libraries.load(MATERIAL_LIBRARY_PATH, link=False) as (src, dst):
+                dst.materials = [name for name in src.materials if name not in _material_cache]
+            carried = [material for material in dst.materials if material is not None]
+        
+        tmp_path = f"{MATERIAL_LIBRARY_PATH}.{os.getpid()}.tmp"
+        bpy.data.libraries.write(tmp_path, set(_material_cache.values()) | set(carried), fake_user=True)
+        os.replace(tmp_path, MATERIAL_LIBRARY_PATH)
+    if carried:
+        bpy.data.batch_remove(ids=carried)
+    print(f"Material library updated with {len(_built_materials)} materials")
+
+# Enhanced features configuration
+enhanced_features = config['enhanced_features']
+
+# Building dimensions
+total_width = config['building']['width']
+total_length = config['building']['length']
+total_height = config['building']['height']
+
+# Create foundation
+bpy.ops.mesh.primitive_plane_add(size=1, location=(total_width/2, total_length/2, 0))
+foundation = bpy.context.active_object
+foundation.name = "Foundation"
+foundation.scale = (total_width/2, total_length/2, 1)
+foundation.data.materials.append(get_material('floor_concrete_polished'))
+
+# Add light for rendering
+bpy.ops.object.light_add(type='SUN', location=(total_width/2, total_length/2, total_height * 2))
+sun = bpy.context.active_object
+sun.name = "Sun"
+sun.data.energy = 5.0
+
+# Batched box geometry - every cuboid is appended here and built as one mesh at the end,
+# instead of one primitive_cube_add operator (undo push + depsgraph update) per object
+BOX_CORNERS = [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]
+BOX_FACES = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+
+box_verts = []
+box_faces = []
+box_material_keys = []
+
+def add_box(center, scale, material_key):
+    base = len(box_verts)
+    cx, cy, cz = center
+    sx, sy, sz = scale
+    box_verts.extend((cx + dx * sx, cy + dy * sy, cz + dz * sz) for dx, dy, dz in BOX_CORNERS)
+    box_faces.extend(tuple(base + v for v in face) for face in BOX_FACES)
+    box_material_keys.append(material_key)
+    return len(box_material_keys) - 1
+
+def add_boxes(centers, scales, material_keys):
+    # Vectorised add_box for precomputed (N, 3) center and scale arrays
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 1, 3)
+    scales = np.asarray(scales, dtype=np.float64).reshape(-1, 1, 3)
+    base = len(box_verts) + 8 * np.arange(len(centers)).reshape(-1, 1, 1)
+    box_verts.extend(map(tuple, (centers + np.array(BOX_CORNERS) * scales).reshape(-1, 3).tolist()))
+    box_faces.extend(map(tuple, (base + np.array(BOX_FACES)).reshape(-1, 4).tolist()))
+    box_material_keys.extend(material_keys)
+
+def build_box_mesh(name):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(box_verts, [], box_faces)
+    slots = {}
+    for key in box_material_keys:
+        if key not in slots:
+            slots[key] = len(slots)
+            mesh.materials.append(get_material(key))
+    mesh.polygons.foreach_set("material_index", [slots[key] for key in box_material_keys for _ in BOX_FACES])
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+# Shared unit meshes for repeated round primitives - every light fixture and tree
+# links the same mesh datablock and differs only by transform and object-level material
+def create_unit_mesh(name, build):
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    build(bm)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.materials.append(None)
+    return mesh
+
+_unit_sphere = create_unit_mesh("unit_sphere", lambda bm: bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, radius=1.0))
+_unit_cylinder = create_unit_mesh("unit_cylinder", lambda bm: bmesh.ops.create_cone(bm, cap_ends=True, segments=32, radius1=1.0, radius2=1.0, depth=2.0))
+
+# Linked objects live in their own collection so their transforms can be written
+# in one foreach_set per attribute once every object exists
+linked_collection = bpy.data.collections.new("LinkedPrimitives")
+scene.collection.children.link(linked_collection)
+linked_locations = []
+linked_scales = []
+
+def place_linked_object(obj, location, scale):
+    linked_collection.objects.link(obj)
+    linked_locations.extend(location)
+    linked_scales.extend(scale)
+    return obj
+
+def add_linked_object(name, mesh, location, scale, material_key):
+    obj = bpy.data.objects.new(name, mesh)
+    obj.material_slots[0].link = 'OBJECT'
+    obj.material_slots[0].material = get_material(material_key)
+    return place_linked_object(obj, location, scale)
+
+def add_collection_instance(name, collection, location):
+    # Empty that instances a prototype collection - Cycles builds the prototype BVH once
+    inst = bpy.data.objects.new(name, None)
+    inst.instance_type = 'COLLECTION'
+    inst.instance_collection = collection
+    return place_linked_object(inst, location, (1.0, 1.0, 1.0))
+
+_tree_proto = None
+
+def tree_prototype():
+    # Trunk and foliage built once in a collection outside the scene, placed via instances
+    global _tree_proto
+    if _tree_proto is None:
+        _tree_proto = bpy.data.collections.new("TreeProto")
+        for name, mesh, location, scale, material_key in (
+            ("TreeTrunk", _unit_cylinder, (0, 0, 1.5), (0.2, 0.2, 1.5), 'tree_bark_oak'),
+            ("TreeFoliage", _unit_sphere, (0, 0, 2.5), (1.0, 1.0, 0.8), 'tree_leaves_seasonal'),
+        ):
+            obj = bpy.data.objects.new(name, mesh)
+            obj.location = location
+            obj.scale = scale
+            obj.material_slots[0].link = 'OBJECT'
+            obj.material_slots[0].material = get_material(material_key)
+            _tree_proto.objects.link(obj)
+    return _tree_proto
+
+def apply_linked_transforms():
+    linked_collection.objects.foreach_set("location", linked_locations)
+    linked_collection.objects.foreach_set("scale", linked_scales)
+
+# Create exterior walls
+wall_thickness = 0.3
+wall_height = 3.0
+
+walls = [
+    ("North", (total_width/2, total_length, wall_height/2), (total_width/2, wall_thickness/2, wall_height/2)),
+    ("South", (total_width/2, 0, wall_height/2), (total_width/2, wall_thickness/2, wall_height/2)),
+    ("East", (total_width, total_length/2, wall_height/2), (wall_thickness/2, total_length/2, wall_height/2)),
+    ("West", (0, total_length/2, wall_height/2), (wall_thickness/2, total_length/2, wall_height/2))
+]
+
+for name, location, scale in walls:
+    add_box(location, scale, 'wall_natural_stone_limestone')
+
+# Layout data
+# Layout from the driver's layout generator
+layout_data = config['layout']
+
+print(f"Creating {len(layout_data)} enhanced rooms with premium features")
+
+# Function to create furniture
+def create_furniture(room_type, room_center, room_width, room_length, style):
+    furniture_objects = []
+    
+    if room_type == 'living' and enhanced_features.get('furniture', False):
+        # Create sofa
+        furniture_objects.append(add_box((room_center[0], room_center[1] - room_length/4, 0.4), (1.5, 0.4, 0.4), 'furniture_fabric_cashmere'))
+        
+        # Create coffee table
+        furniture_objects.append(add_box((room_center[0], room_center[1], 0.2), (0.8, 0.5, 0.2), 'furniture_teak_aged'))
+        
+        # Create TV stand
+        furniture_objects.append(add_box((room_center[0], room_center[1] + room_length/3, 0.3), (1.2, 0.3, 0.3), 'furniture_mahogany_premium'))
+        
+    elif room_type == 'bedroom' and enhanced_features.get('furniture', False):
+        # Create bed
+        furniture_objects.append(add_box((room_center[0], room_center[1], 0.3), (1.0, 1.5, 0.3), 'furniture_fabric_silk'))
+        
+        # Create nightstands
+        for side in [-1, 1]:
+            furniture_objects.append(add_box((room_center[0] + side * 1.3, room_center[1], 0.25), (0.3, 0.4, 0.25), 'furniture_teak_aged'))
+            
+        # Create wardrobe
+        furniture_objects.append(add_box((room_center[0] + room_width/3, room_center[1] + room_length/3, 1.0), (0.6, 0.3, 1.0), 'furniture_mahogany_premium'))
+        
+    elif room_type == 'kitchen' and enhanced_features.get('furniture', False):
+        # Create kitchen island
+        furniture_objects.append(add_box((room_center[0], room_center[1], 0.45), (1.0, 0.6, 0.45), 'floor_italian_marble_carrara'))
+        
+        # Create cabinets
+        for i in range(3):
+            furniture_objects.append(add_box((room_center[0] - room_width/3 + i*0.8, room_center[1] + room_length/3, 0.4), (0.35, 0.3, 0.4), 'furniture_teak_aged'))
+    
+    return furniture_objects
+
+# Function to create interior details
+def create_interior_details(room_type, room_center, room_width, room_length):
+    detail_objects = []
+    
+    if enhanced_features.get('interiorDetails', False):
+        # Create ceiling light
+        light_fixture = add_linked_object(f"CeilingLight_{room_type}", _unit_sphere, (room_center[0], room_center[1], 2.8), (0.2, 0.2, 0.1), 'light_warm_led')
+        detail_objects.append(light_fixture)
+        
+        # Create baseboard
+        for wall in ['north', 'south', 'east', 'west']:
+            if wall == 'north':
+                location = (room_center[0], room_center[1] + room_length/2, 0.1)
+                scale = (room_width/2, 0.05, 0.1)
+            elif wall == 'south':
+                location = (room_center[0], room_center[1] - room_length/2, 0.1)
+                scale = (room_width/2, 0.05, 0.1)
+            elif wall == 'east':
+                location = (room_center[0] + room_width/2, room_center[1], 0.1)
+                scale = (0.05, room_length/2, 0.1)
+            elif wall == 'west':
+                location = (room_center[0] - room_width/2, room_center[1], 0.1)
+                scale = (0.05, room_length/2, 0.1)
+            
+            detail_objects.append(add_box(location, scale, 'furniture_teak_aged'))
+    
+    return detail_objects
+
+# Function to create landscaping
+def create_landscaping():
+    landscaping_objects = []
+    
+    if enhanced_features.get('landscaping', False):
+        # Create grass areas around the building
+        grass_margin = 5
+        
+        # Front yard
+        bpy.ops.mesh.primitive_plane_add(location=(total_width/2, -grass_margin/2, 0.01))
+        front_yard = bpy.context.active_object
+        front_yard.name = "FrontYard"
+        front_yard.scale = (total_width/2 + grass_margin, grass_margin/2, 1)
+        front_yard.data.materials.append(get_material('grass_premium_blend'))
+        landscaping_objects.append(front_yard)
+        
+        # Back yard
+        bpy.ops.mesh.primitive_plane_add(location=(total_width/2, total_length + grass_margin/2, 0.01))
+        back_yard = bpy.context.active_object
+        back_yard.name = "BackYard"
+        back_yard.scale = (total_width/2 + grass_margin, grass_margin/2, 1)
+        back_yard.data.materials.append(get_material('grass_premium_blend'))
+        landscaping_objects.append(back_yard)
+        
+        # Create trees at the scatter positions precomputed by the driver
+        for i, (tree_x, tree_y) in enumerate(config['tree_positions']):
+            tree = add_collection_instance(f"Tree_{i}", tree_prototype(), (tree_x, tree_y, 0))
+            landscaping_objects.append(tree)
+        
+        # Create pathway
+        landscaping_objects.append(add_box((total_width/2, -2, 0.02), (1.0, 2, 0.02), 'concrete_architectural'))
+    
+    return landscaping_objects
+
+# Room floors and walls, transforms precomputed by the driver
+room_boxes = config['room_boxes']
+add_boxes(room_boxes['floor_centers'], room_boxes['floor_scales'], room_boxes['floor_keys'])
+add_boxes(room_boxes['wall_centers'], room_boxes['wall_scales'], ['wall_designer_paint_pearl'] * len(room_boxes['wall_centers']))
+
+# Create enhanced rooms with premium features
+all_furniture = []
+all_details = []
+
+for i, room_data in enumerate(layout_data):
+    room_info = room_data['room']
+    room_name = room_info['name']
+    room_type = room_info['type']
+    
+    x = room_data['x']
+    y = room_data['y']
+    width = room_data['width']
+    length = room_data['length']
+    rotation = room_data.get('rotation', 0)
+    
+    features = room_data.get('architectural_features', {})
+    
+    print(f"Creating enhanced {room_name} ({room_type}) - {features.get('style', 'standard')} style")
+    
+    # Create furniture for this room
+    room_center = (x, y, 0)
+    furniture = create_furniture(room_type, room_center, width, length, features.get('style', 'modern'))
+    all_furniture.extend(furniture)
+    
+    # Create interior details
+    details = create_interior_details(room_type, room_center, width, length)
+    all_details.extend(details)
+
+# Create landscaping
+landscaping = create_landscaping()
+
+# Walls, floors, furniture and baseboards as a single mesh
+build_box_mesh("EnhancedGeometry")
+apply_linked_transforms()
+save_material_library()
+
+# Enhanced lighting setup - one key sun plus world lighting instead of key/fill/rim suns,
+# so Cycles evaluates a single lamp per shading sample and the world carries the fill
+if enhanced_features.get('lighting', False):
+    sun.data.energy = 5.0
+    sun.data.color = (1.0, 0.95, 0.8)
+    sun.rotation_euler = (math.radians(45), 0, math.radians(45))
+    
+    world = scene.world or bpy.data.worlds.new("World")
+    scene.world = world
+    world.use_nodes = True
+    background = world.node_tree.nodes['Background']
+    hdri_path = config['hdri_path']
+    if hdri_path and os.path.exists(hdri_path):
+        env = world.node_tree.nodes.new('ShaderNodeTexEnvironment')
+        env.image = bpy.data.images.load(hdri_path, check_existing=True)
+        world.node_tree.links.new(env.outputs['Color'], background.inputs['Color'])
+    else:
+        # Cool skylight tint of the old fill light
+        background.inputs['Color'].default_value = (0.8, 0.9, 1.0, 1.0)
+    background.inputs['Strength'].default_value = 0.5
+    world.cycles.sampling_method = 'AUTOMATIC'
+
+# Camera setup for architectural photography
+bpy.ops.object.camera_add(location=(total_width + 15, total_length + 15, 8))
+camera = bpy.context.active_object
+camera.name = "ArchitecturalCamera"
+camera.rotation_euler = (math.radians(65), 0, math.radians(45))
+camera.data.lens = 35
+camera.data.dof.use_dof = True
+camera.data.dof.focus_distance = 20
+camera.data.dof.aperture_fstop = 5.6
+
+# Set as active camera
+scene.camera = camera
+
+# One camera per angle, created with its final rotation, so switching views only swaps
+# scene.camera and the persistent render data (BVH, textures) stays valid between renders
+camera_positions = config['camera_views']
+for view_name, cam_loc, cam_rotation in camera_positions:
+    view_camera = bpy.data.objects.new(f"Camera_{view_name}", bpy.data.cameras.new(f"Camera_{view_name}"))
+    view_camera.location = cam_loc
+    view_camera.rotation_euler = cam_rotation  # Look-at rotation precomputed by the driver
+    scene.collection.objects.link(view_camera)
+scene.render.use_persistent_data = True
+
+# Export settings - OBJ text for existing consumers, or binary GLB/USD which write much faster
+export_format = config['export_format']
+if export_format == 'glb':
+    bpy.ops.export_scene.gltf(
+        filepath=output_prefix + ".glb",
+        export_format='GLB',
+        export_apply=True,
+        export_draco_mesh_compression_enable=True
+    )
+elif export_format == 'usd':
+    bpy.ops.wm.usd_export(
+        filepath=output_prefix + ".usdc",
+        export_materials=True,
+        export_uvmaps=True,
+        evaluation_mode='VIEWPORT'
+    )
+else:
+    bpy.ops.wm.obj_export(
+        filepath=output_prefix + ".obj",
+        export_selected_objects=False,
+        export_materials=True,
+        export_triangulated_mesh=True,
+        export_smooth_groups=True,
+        export_normals=True,
+        export_uv=True,
+        export_colors=True
+    )
+
+# Save blend file
+bpy.ops.wm.save_as_mainfile(filepath=output_prefix + ".blend")
+
+# Announce finished files right away so the driver publishes them while the views render
+for extension in config['export_extensions']:
+    print("EXPORT_FILE: " + output_prefix + "." + extension, flush=True)
+
+# RENDER IMAGES WITH GPU (This will actually use the GPU)
+print("🎨 Starting GPU rendering...")
+
+# Set up rendering
+scene.render.filepath = output_prefix + "_render"
+scene.render.image_settings.file_format = 'PNG'
+
+
+# With parallel views the driver renders each angle from the saved .blend in its own process
+render_views = camera_positions if config['render_views_in_script'] else []
+render_files = []
+max_samples = scene.cycles.samples
+for view_name, cam_loc, cam_rotation in render_views:
+    print(f"📸 Rendering " + view_name + " view with GPU...")
+    
+    scene.camera = bpy.data.objects[f"Camera_{view_name}"]
+    scene.cycles.samples = config['view_samples'].get(view_name, max_samples)
+    render_path = output_prefix + "_" + view_name + ".png"
+    scene.render.filepath = render_path
+    
+    # RENDER (This actually uses the GPU!)
+    bpy.ops.render.render(write_still=True)
+    render_files.append(render_path)
+    print("RENDER_PNG: " + render_path, flush=True)
+
+print("🔥 GPU rendering complete!")
+print("ENHANCED BOQ RENDERING COMPLETE")
+print(f"Scene ID: {scene_id}")
+print(f"Objects: {len(bpy.data.objects)}")
+print(f"Materials: {len(bpy.data.materials)}")
+print(f"Furniture pieces: {len(all_furniture)}")
+print(f"Interior details: {len(all_details)}")
+print(f"Landscaping elements: {len(landscaping)}")
+print(f"Render files: {len(render_files)}")
@@ -0,0 +1,152 @@
+"""Build and render a simple BOQ scene with basic materials
+
+Run by Blender with the per-scene settings passed as a JSON file:
+    blender --background --python render_fixed.py -- --config scene.json
+The script itself never changes between requests; fixed_material_renderer.py computes
+the room layout and writes it into the settings.
+"""
+import os
+import sys
+import json
+import argparse
+import bpy
+import bmesh
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import build_materials, clear_scene, setup_gpu
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render a simple BOQ scene")
+    parser.add_argument('--config', required=True, help="JSON settings written by the driver")
+    return parser.parse_args(argv)
+
+with open(parse_args().config, encoding='utf-8') as f:
+    config = json.load(f)
+
+scene_id = config['scene_id']
+output_prefix = f"{config['output_dir']}/simple_scene_{scene_id}"
+
+# Clear everything
+clear_scene()
+
+scene = bpy.context.scene
+
+# GPU setup - first compute backend that reports a device
+gpu_backend = setup_gpu(scene)
+
+# Adaptive sampling lets flat walls and ceilings stop well before the 256 sample ceiling
+scene.cycles.samples = 256
+scene.cycles.use_adaptive_sampling = True
+scene.cycles.adaptive_min_samples = 16
+scene.cycles.adaptive_threshold = 0.01
+scene.cycles.use_denoising = True
+scene.cycles.denoiser = 'OPENIMAGEDENOISE'
+scene.cycles.denoising_input_passes = 'RGB_ALBEDO_NORMAL'
+scene.render.resolution_x = 1920
+scene.render.resolution_y = 1080
+
+# Create basic materials
+materials = build_materials({
+    'floor': ("Floor", (0.6, 0.4, 0.2), 0.3),
+    'wall': ("Wall", (0.9, 0.9, 0.9), 0.8),
+    'ceiling': ("Ceiling", (0.95, 0.95, 0.95), 0.9),
+    'furniture': ("Furniture", (0.5, 0.3, 0.2), 0.4),
+})
+
+# Shared unit meshes: every floor, wall and furniture block links one of these instead of
+# running a bpy.ops primitive operator per object. Materials are linked per object.
+def create_unit_mesh(name, build):
+    bm = bmesh.new()
+    build(bm)
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.materials.append(None)
+    return mesh
+
+unit_cube = create_unit_mesh("unit_cube", lambda bm: bmesh.ops.create_cube(bm, size=1))
+unit_plane = create_unit_mesh("unit_plane", lambda bm: bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=0.5))
+
+def add_unit_object(name, mesh, location, scale, material):
+    obj = bpy.data.objects.new(name, mesh)
+    scene.collection.objects.link(obj)
+    obj.location = location
+    obj.scale = scale
+    obj.material_slots[0].link = 'OBJECT'
+    obj.material_slots[0].material = material
+    return obj
+
+# Create rooms
+for room_data in config['layout']:
+    room = room_data['room']
+    x = room_data['x']
+    y = room_data['y']
+    width = room_data['width']
+    length = room_data['length']
+    height = room.get('height', 3.0)
+
+    print(f"Creating room: {room['name']} at ({x}, {y})")
+
+    # Floor
+    add_unit_object(f"Floor_{room['name']}", unit_plane, (x, y, 0), (width/2, length/2, 1), materials['floor'])
+
+    # Ceiling
+    add_unit_object(f"Ceiling_{room['name']}", unit_plane, (x, y, height), (width/2, length/2, 1), materials['ceiling'])
+
+    # Walls
+    wall_positions = [
+        (x - width/2, y, height/2, 0.1, length, height),  # Left wall
+        (x + width/2, y, height/2, 0.1, length, height),  # Right wall
+        (x, y - length/2, height/2, width, 0.1, height),  # Front wall
+        (x, y + length/2, height/2, width, 0.1, height),  # Back wall
+    ]
+
+    for i, (wx, wy, wz, w_width, w_length, w_height) in enumerate(wall_positions):
+        add_unit_object(f"Wall_{room['name']}_{i}", unit_cube, (wx, wy, wz), (w_width, w_length, w_height/2), materials['wall'])
+
+    # Simple furniture
+    if room.get('type') == 'living':
+        # Sofa
+        add_unit_object(f"Sofa_{room['name']}", unit_cube, (x, y, 0.4), (1.5, 0.8, 0.8), materials['furniture'])
+    elif room.get('type') == 'bedroom':
+        # Bed
+        add_unit_object(f"Bed_{room['name']}", unit_cube, (x, y, 0.3), (2.0, 1.5, 0.6), materials['furniture'])
+
+# Add lighting
+bpy.ops.object.light_add(type='SUN', location=(10, 10, 20))
+sun = bpy.context.active_object
+sun.data.energy = 5
+
+# Add camera
+bpy.ops.object.camera_add(location=(20, -20, 15))
+camera = bpy.context.active_object
+camera.rotation_euler = (1.1, 0, 0.785)
+scene.camera = camera
+
+# Set output path
+blend_file = f"{output_prefix}.blend"
+obj_file = f"{output_prefix}.obj"
+render_file = f"{output_prefix}.png"
+
+# Save blend file
+bpy.ops.wm.save_as_mainfile(filepath=blend_file)
+print(f"BLEND_FILE: {blend_file}")
+
+# Export OBJ only when the caller asked for it; render-only requests skip the ASCII dump
+if config['export_obj']:
+    bpy.ops.wm.obj_export(filepath=obj_file, check_existing=False, export_selected_objects=False)
+    print(f"OBJ_FILE: {obj_file}")
+
+# Render
+scene.render.filepath = render_file
+bpy.ops.render.render(write_still=True)
+print(f"RENDER_PNG: {render_file}")
+
+print(f"SCENE_ID: {scene_id}")
+print("LAYOUT_TYPE: simple")
+print("STYLE: modern")
+print("QUALITY_LEVEL: basic")
+print("SUCCESS: Scene created successfully")
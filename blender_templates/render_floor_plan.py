@@ -0,0 +1,178 @@
+"""Build and render an open-top 3D floor plan
+
+Run by Blender with the per-scene settings passed as a JSON file:
+    blender --background --python render_floor_plan.py -- --config floor_plan.json
+The script itself never changes between requests; floor_plan_renderer.py computes every box,
+the camera and the frame resolution, and writes the OBJ/MTL pair on a thread while this
+runs, so the script must not read those files.
+"""
+import os
+import sys
+import json
+import argparse
+import bpy
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import clear_scene, setup_gpu
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render a 3D floor plan")
+    parser.add_argument('--config', required=True, help="JSON settings written by the driver")
+    return parser.parse_args(argv)
+
+with open(parse_args().config, encoding='utf-8') as f:
+    config = json.load(f)
+
+scene_id = config['scene_id']
+output_prefix = f"{config['output_dir']}/floor_plan_{scene_id}"
+
+# Clear everything
+clear_scene()
+
+scene = bpy.context.scene
+
+# Flat colours seen from above rasterize to the same image in EEVEE at a fraction of
+# the cost; Cycles is kept for photorealistic requests
+if config['use_cycles']:
+    gpu_backend = setup_gpu(scene)
+
+    # Flat diffuse materials seen from above converge quickly - a low adaptive sample
+    # ceiling plus the denoiser matches the old 128 samples
+    scene.cycles.samples = 16
+    scene.cycles.use_adaptive_sampling = True
+    scene.cycles.adaptive_threshold = 0.05
+    scene.cycles.use_denoising = True
+    scene.cycles.denoiser = 'OPTIX' if gpu_backend == 'OPTIX' else 'OPENIMAGEDENOISE'
+
+    # No glass, gloss or volumes worth tracing deep, so short light paths lose nothing
+    scene.cycles.max_bounces = 4
+    scene.cycles.diffuse_bounces = 2
+    scene.cycles.glossy_bounces = 1
+    scene.cycles.transmission_bounces = 1
+else:
+    try:
+        scene.render.engine = 'BLENDER_EEVEE_NEXT'  # Blender 4.2 - 4.x
+    except TypeError:
+        scene.render.engine = 'BLENDER_EEVEE'
+    scene.eevee.taa_render_samples = 16
+    # Soft contact shadows in room corners; both settings only exist in some versions
+    for setting in ('use_gtao', 'use_soft_shadows'):
+        if hasattr(scene.eevee, setting):
+            setattr(scene.eevee, setting, True)
+
+# Matches the aspect of the building as the camera sees it, so the frame has no empty band
+scene.render.resolution_x, scene.render.resolution_y = config['resolution']
+
+# Colorful floor plan materials
+def create_floor_plan_material(name, base_color, roughness=0.8, metallic=0.0, emission=0.0):
+    mat = bpy.data.materials.new(name=name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    nodes.clear()
+
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.inputs["Base Color"].default_value = (*base_color, 1.0)
+    bsdf.inputs["Roughness"].default_value = roughness
+    bsdf.inputs["Metallic"].default_value = metallic
+    if emission > 0:
+        bsdf.inputs["Emission"].default_value = (*base_color, 1.0)
+        bsdf.inputs["Emission Strength"].default_value = emission
+
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
+    return mat
+
+# Create colorful architectural materials
+materials = {key: create_floor_plan_material(name, color) for key, (name, color) in config['materials'].items()}
+
+# Batched geometry - every floor quad and box is appended here and built as one mesh at
+# the end, instead of one primitive_*_add operator (undo push + depsgraph update) each
+plan_verts = []
+plan_faces = []
+plan_face_materials = []
+
+def add_shapes(corners, faces, centers, scales, material_keys):
+    # Append one copy of a unit shape per row of the (N, 3) center and half-extent arrays
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 1, 3)
+    scales = np.asarray(scales, dtype=np.float64).reshape(-1, 1, 3)
+    base = len(plan_verts) + len(corners) * np.arange(len(centers)).reshape(-1, 1, 1)
+    plan_verts.extend(map(tuple, (centers + np.array(corners) * scales).reshape(-1, 3).tolist()))
+    plan_faces.extend(map(tuple, (base + np.array(faces)).reshape(-1, len(faces[0])).tolist()))
+    plan_face_materials.extend(key for key in material_keys for _ in faces)
+
+def build_plan_mesh(name):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(plan_verts, [], plan_faces)
+    slots = {}
+    for key in plan_face_materials:
+        if key not in slots:
+            slots[key] = len(slots)
+            mesh.materials.append(materials[key])
+    mesh.polygons.foreach_set("material_index", [slots[key] for key in plan_face_materials])
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    scene.collection.objects.link(obj)
+    return obj
+
+# Floors, walls (lower height for floor plan view), doors, windows, furniture and exterior
+# walls; NO CEILING - this is the key difference for floor plan view
+plan = config['plan']
+shapes = config['unit_shapes']
+
+print(f"Creating floor plan with {len(plan['floor_keys'])} rooms...")
+
+add_shapes(shapes['plane_corners'], shapes['plane_faces'], plan['floor_centers'], plan['floor_scales'], plan['floor_keys'])
+add_shapes(shapes['box_corners'], shapes['box_faces'], plan['box_centers'], plan['box_scales'], plan['box_keys'])
+build_plan_mesh("FloorPlan")
+
+# Floor plan optimized lighting - one sun plus an even white world; fill lights would add
+# a light sample per bounce for brightness the world already gives a top-down view
+bpy.ops.object.light_add(type='SUN', location=(0, 0, 50))
+sun = bpy.context.active_object
+sun.name = "TopDownLight"
+sun.data.energy = 3.0
+sun.rotation_euler = (0, 0, 0)  # Direct top-down
+
+world = scene.world or bpy.data.worlds.new("World")
+scene.world = world
+world.use_nodes = True
+background = world.node_tree.nodes['Background']
+background.inputs['Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+background.inputs['Strength'].default_value = 2.0
+
+# Floor plan camera - isometric top-down view, aimed by the driver
+bpy.ops.object.camera_add(location=config['camera']['location'])
+camera = bpy.context.active_object
+camera.name = "FloorPlanCamera"
+camera.rotation_euler = config['camera']['rotation']
+scene.camera = camera
+
+# Set camera to orthographic for architectural view
+camera.data.type = 'ORTHO'
+camera.data.ortho_scale = config['camera']['ortho_scale']
+
+# Save blend file
+blend_file = output_prefix + ".blend"
+bpy.ops.wm.save_as_mainfile(filepath=blend_file)
+print("BLEND_FILE: " + blend_file)
+
+# The driver writes the OBJ and MTL from the plan boxes while this script runs and waits
+# for them before publishing; these markers only name the paths, the files may not exist yet
+print("OBJ_FILE: " + config['obj_file'])
+print("MTL_FILE: " + config['mtl_file'])
+
+# Render floor plan
+render_file = output_prefix + ".png"
+scene.render.filepath = render_file
+bpy.ops.render.render(write_still=True)
+print("RENDER_PNG: " + render_file)
+
+print("SCENE_ID: " + scene_id)
+print("LAYOUT_TYPE: floor_plan")
+print("STYLE: " + config['style'])
+print("QUALITY_LEVEL: architectural")
+print("SUCCESS: 3D floor plan created successfully")
@@ -0,0 +1,36 @@
+"""Render one camera angle of a scene saved by render_enhanced.py
+
+    blender --background scene.blend --python render_view.py -- --camera Camera_hero --output hero.png
+"""
+import os
+import sys
+import argparse
+import bpy
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+from blender_core import setup_gpu
+
+def parse_args():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render one saved camera view")
+    parser.add_argument('--camera', required=True, help="Name of a camera saved in the .blend")
+    parser.add_argument('--output', required=True, help="PNG path to write")
+    parser.add_argument('--samples', type=int, default=0, help="Sample ceiling, 0 keeps the saved one")
+    return parser.parse_args(argv)
+
+args = parse_args()
+scene = bpy.context.scene
+
+setup_gpu(scene)
+
+# The scene script saved one pre-aimed camera per view
+scene.camera = bpy.data.objects[args.camera]
+if args.samples:
+    scene.cycles.samples = args.samples
+
+scene.render.image_settings.file_format = 'PNG'
+scene.render.filepath = args.output
+bpy.ops.render.render(write_still=True)
+print("RENDER_PNG: " + args.output)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Warm Blender worker pool - keeps Blender processes alive between renders so each job
+skips Blender startup, Python init and GPU/OptiX context creation
+"""
+import subprocess
+import threading
+import queue
+import collections
+import time
+import os
+import json
+
+# Blender-side loop that executes the scripts sent to a worker
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blender_templates', 'blender_worker.py')
+# Printed by the worker after every script; must match blender_worker.DONE_SENTINEL
+DONE_SENTINEL = '__CONSTRUCTAI_DONE__'
+# Persistent driver caches for JIT-compiled CUDA and OptiX kernels, so each GPU
+# architecture compiles once instead of once per fresh Blender install or temp profile.
+# Delete KERNEL_CACHE_DIR if renders fail or slow down after a driver upgrade; it is
+# rebuilt on the next worker start
+KERNEL_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'constructai')
+KERNEL_CACHE_ENV = {
+    'CUDA_CACHE_PATH': os.path.join(KERNEL_CACHE_DIR, 'cuda'),
+    'CUDA_CACHE_MAXSIZE': str(4 << 30),
+    'OPTIX_CACHE_PATH': os.path.join(KERNEL_CACHE_DIR, 'optix'),
+}
+
+class BlenderWorker:
+    """One long-lived Blender process, optionally pinned to a single GPU"""
+
+    def __init__(self, blender_path, gpu_index=None):
+        self.blender_path = blender_path
+        self.gpu_index = gpu_index
+        self._proc = None
+        self._output = None
+
+    def start(self):
+        """Start the Blender process if it is not already running"""
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+
+        # Values already set in the environment win over the default cache locations
+        env = dict(KERNEL_CACHE_ENV, **os.environ)
+        for name in ('CUDA_CACHE_PATH', 'OPTIX_CACHE_PATH'):
+            os.makedirs(env[name], exist_ok=True)
+        if self.gpu_index is not None:
+            env['CUDA_VISIBLE_DEVICES'] = str(self.gpu_index)
+
+        # Factory settings skip the user's preferences, add-ons and startup file
+        self._proc = subprocess.Popen([
+            self.blender_path,
+            '--factory-startup',
+            '--background',
+            '--python', WORKER_SCRIPT_PATH
+        ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding='utf-8', errors='replace', bufsize=1, env=env)
+
+        # Drain stdout on a thread so a render can be waited on with a timeout
+        self._output = queue.Queue()
+        def drain(stream, lines):
+            for line in stream:
+                lines.put(line)
+            lines.put(None)
+        threading.Thread(target=drain, args=(self._proc.stdout, self._output), daemon=True).start()
+        return self._proc
+
+    def run(self, script_args, log_path, on_line=None, timeout=300):
+        """Execute a script in this worker, returning (ok, output tail)
+
+        script_args is the script path followed by the arguments it expects after '--'.
+
+        Every output line is streamed to log_path and handed to on_line as it arrives, so
+        callers can act on markers before the script finishes and the full transcript is
+        never held in memory.
+        """
+        tail = collections.deque(maxlen=200)
+        # The log is opened before the job is sent, so failing to open it leaves no job behind
+        with open(log_path, 'w', encoding='utf-8') as log:
+            proc = self.start()
+            try:
+                proc.stdin.write(json.dumps(script_args) + '\n')
+                proc.stdin.flush()
+
+                deadline = time.monotonic() + timeout
+                while True:
+                    line = self._output.get(timeout=max(deadline - time.monotonic(), 0))
+                    if line is None:
+                        raise RuntimeError(f'Blender exited with code {proc.wait()}')
+                    if line.startswith(DONE_SENTINEL):
+                        return line.split()[-1] == 'OK', ''.join(tail)
+                    log.write(line)
+                    tail.append(line)
+                    if on_line is not None:
+                        on_line(line)
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(self.blender_path, timeout, output=''.join(tail))
+            except BaseException:
+                # The rest of this job's output and its sentinel are still queued, so the
+                # next job gets a fresh process instead of reading them as its own
+                self.close()
+                raise
+
+    def close(self):
+        """Stop the Blender process"""
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc = None
+
+class BlenderWorkerPool:
+    """A set of warm Blender workers that jobs check out one at a time
+
+    Workers start on their first job and are restarted after a crash or timeout. Worker i
+    is pinned to GPU i % gpu_count.
+    """
+
+    def __init__(self, blender_path, size=1, gpu_count=1):
+        self.blender_path = blender_path
+        self.gpu_count = gpu_count
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self.grow(size)
+
+    @property
+    def size(self):
+        return len(self._workers)
+
+    def grow(self, size):
+        """Add workers until the pool has at least size of them"""
+        with self._lock:
+            while len(self._workers) < size:
+                worker = BlenderWorker(self.blender_path, len(self._workers) % max(self.gpu_count, 1))
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def start(self):
+        """Launch any worker that is not running yet without waiting for it to be ready"""
+        for worker in self._workers:
+            worker.start()
+
+    def run(self, script_args, log_path, on_line=None, timeout=300):
+        """Run a script on the next idle worker, waiting while all of them are busy"""
+        worker = self._idle.get()
+        try:
+            return worker.run(script_args, log_path, on_line, timeout)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        """Stop every worker; the pool starts them again on demand"""
+        for worker in self._workers:
+            worker.close()
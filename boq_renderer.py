@@ -11,6 +11,10 @@ import shutil
 import math
 import random
 import hashlib
+from pathlib import Path
+
+# Blender-side helpers shared with the other renderers (GPU setup, scene reset, materials)
+BLENDER_TEMPLATES_DIR = Path(__file__).resolve().parent.joinpath('blender_templates').as_posix()
 
 class BOQRenderer:
     """Professional BOQ-based 3D scene renderer with intelligent architectural layout"""
@@ -220,6 +224,7 @@ class BOQRenderer:
 
         # Professional Blender script for intelligent layout
         blender_script = f'''
+import sys
 import bpy
 import bmesh
 import mathutils
@@ -227,58 +232,32 @@ import math
 import json
 import os
 
+if {repr(BLENDER_TEMPLATES_DIR)} not in sys.path:
+    sys.path.insert(0, {repr(BLENDER_TEMPLATES_DIR)})
+from blender_core import build_materials, clear_scene, setup_gpu
+
 # Clear everything
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
-for material in bpy.data.materials:
-    bpy.data.materials.remove(material)
+clear_scene()
 
 scene = bpy.context.scene
 
-# GPU setup
-scene.render.engine = 'CYCLES'
-prefs = bpy.context.preferences
-cprefs = prefs.addons['cycles'].preferences
-cprefs.compute_device_type = 'OPTIX'
-cprefs.get_devices()
-
-for device in cprefs.devices:
-    if device.type in ['OPTIX', 'CUDA']:
-        device.use = True
-        print(f"GPU ENABLED: {{device.name}} ({{device.type}})")
-
-scene.cycles.device = 'GPU'
+# GPU setup - first compute backend that reports a device
+gpu_backend = setup_gpu(scene)
 scene.cycles.samples = 1024
 scene.cycles.use_denoising = True
-scene.cycles.denoiser = 'OPTIX'
-
-# Create materials
-def create_material(name, base_color, roughness=0.5, metallic=0.0):
-    mat = bpy.data.materials.new(name=name)
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    nodes.clear()
-    
-    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs["Base Color"].default_value = (*base_color, 1.0)
-    bsdf.inputs["Roughness"].default_value = roughness
-    bsdf.inputs["Metallic"].default_value = metallic
-    
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
-    return mat
+scene.cycles.denoiser = 'OPTIX' if gpu_backend == 'OPTIX' else 'OPENIMAGEDENOISE'
 
 # Material library
-materials = {{
-    'floor_wood': create_material("FloorWood", (0.45, 0.25, 0.12), 0.4),
-    'wall_paint': create_material("WallPaint", (0.9, 0.87, 0.8), 0.7),
-    'concrete': create_material("Concrete", (0.6, 0.6, 0.6), 0.8),
-    'kitchen_counter': create_material("KitchenCounter", (0.9, 0.9, 0.9), 0.1),
-    'furniture_wood': create_material("FurnitureWood", (0.3, 0.15, 0.08), 0.3),
-    'fabric_blue': create_material("FabricBlue", (0.2, 0.3, 0.7), 0.8),
-    'ceramic_white': create_material("CeramicWhite", (0.95, 0.95, 0.95), 0.05),
-    'metal_steel': create_material("MetalSteel", (0.8, 0.8, 0.8), 0.1, 0.9)
-}}
+materials = build_materials({{
+    'floor_wood': ("FloorWood", (0.45, 0.25, 0.12), 0.4),
+    'wall_paint': ("WallPaint", (0.9, 0.87, 0.8), 0.7),
+    'concrete': ("Concrete", (0.6, 0.6, 0.6), 0.8),
+    'kitchen_counter': ("KitchenCounter", (0.9, 0.9, 0.9), 0.1),
+    'furniture_wood': ("FurnitureWood", (0.3, 0.15, 0.08), 0.3),
+    'fabric_blue': ("FabricBlue", (0.2, 0.3, 0.7), 0.8),
+    'ceramic_white': ("CeramicWhite", (0.95, 0.95, 0.95), 0.05),
+    'metal_steel': ("MetalSteel", (0.8, 0.8, 0.8), 0.1, 0.9)
+}})
 
 # Building dimensions
 total_width = {building_dims['total_width']}
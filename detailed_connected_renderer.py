@@ -2,51 +2,167 @@
 """
 Enhanced Connected Floor Plan Renderer - Creates detailed, colorful connected home layouts
 """
-import subprocess
+import asyncio
+import concurrent.futures
 import os
 import tempfile
 import uuid
 import json
+import hashlib
 import shutil
-import math
-import random
+import numpy as np
+from pathlib import Path
+
+# Blender-side helpers shared with the other renderers (scene reset, node-group sockets)
+BLENDER_TEMPLATES_DIR = Path(__file__).resolve().parent.joinpath('blender_templates').as_posix()
+
+# Longest Blender output line run_blender will read - verbose Blender can print lines far
+# past asyncio's 64 KiB default, which would otherwise raise ValueError mid-render
+BLENDER_LINE_LIMIT = 16 * 1024 * 1024
 
 # Force NVIDIA GPU usage
 os.environ['CUDA_VISIBLE_DEVICES'] = '0'
 os.environ['BLENDER_CUDA_DEVICE'] = '0'
 os.environ['NVIDIA_VISIBLE_DEVICES'] = '0'
 
+def _layout(rooms, building_width, building_length, per_row=3):
+    """Place rooms in rows of per_row, returning struct-of-arrays (xs, ys, widths, lengths)"""
+    widths = np.array([room.get('width', 8) for room in rooms], dtype=float)
+    lengths = np.array([room.get('length', 8) for room in rooms], dtype=float)
+    if len(rooms) == 0:
+        return widths, lengths, widths, lengths
+    
+    row = np.arange(len(rooms)) // per_row
+    row_starts = np.arange(0, len(rooms), per_row)
+    
+    # x: running offset within each row, rooms separated by 1 unit
+    offsets = np.cumsum(widths + 1) - (widths + 1)
+    x_in_row = offsets - offsets[row_starts][row]
+    
+    # y: each row starts below the tallest room of the previous row plus a 2 unit gap
+    row_heights = np.maximum.reduceat(lengths, row_starts)
+    row_y = np.concatenate(([0.0], np.cumsum(row_heights + 2)[:-1]))
+    
+    xs = -building_width/2 + 2 + x_in_row + widths/2
+    ys = -building_length/2 + 2 + row_y[row] + lengths/2
+    return xs, ys, widths, lengths
+
 class DetailedConnectedRenderer:
     """Creates detailed connected floor plans with proper room layouts"""
     
     def __init__(self):
+        # Scripts, room dumps and Blender's outputs stay in the system temp directory; only
+        # finished outputs are moved into the served cache under public/renders/by_hash
+        self.public_renders = 'public/renders'
+        os.makedirs(self.public_renders, exist_ok=True)
         self.temp_dir = tempfile.mkdtemp(prefix='constructai_detailed_')
         self.blender_path = 'D:\\blender\\blender.exe'
         self.scene_id = None
     
-    def render_connected_floor_plan(self, boq_config):
-        """Render a detailed connected floor plan"""
+    def config_hash(self, boq_config, quality):
+        """Stable digest of everything that affects the rendered output"""
+        payload = json.dumps({'config': boq_config, 'quality': quality}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    def cached_result(self, cache_dir, save_blend, render_format):
+        """Return a result for a previously rendered layout, or None on a cache miss"""
+        outputs = {
+            'obj_file': 'detailed_floor_plan.obj',
+            'mtl_file': 'detailed_floor_plan.mtl',
+            'render_file': f'detailed_floor_plan.{render_format}'
+        }
+        if save_blend:
+            outputs['blend_file'] = 'detailed_floor_plan.blend'
+        
+        if not all(os.path.exists(os.path.join(cache_dir, name)) for name in outputs.values()):
+            return None
+        
+        result = {
+            'scene_id': self.scene_id,
+            'success': True,
+            'cached': True
+        }
+        for key, name in outputs.items():
+            result[key] = self.public_url(os.path.join(cache_dir, name))
+        return result
+    
+    def public_url(self, path):
+        """Map a file under public/renders to the URL it is served from"""
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.public_renders))
+        return '/renders/' + Path(relative).as_posix()
+    
+    def render_connected_floor_plan(self, boq_config, quality='preview'):
+        """Render a detailed connected floor plan (blocking wrapper)"""
+        def render():
+            return asyncio.run(self.render_connected_floor_plan_async(boq_config, quality))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return render()
+        # Called from inside a running event loop, where asyncio.run refuses to start -
+        # give the coroutine its own loop on a dedicated thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(render).result()
+    
+    async def render_connected_floor_plan_async(self, boq_config, quality='preview'):
+        """Render a detailed connected floor plan
+
+        quality='preview' uses the Workbench engine for a near-instant image,
+        quality='final' keeps the path-traced Cycles render.
+        """
         
         self.scene_id = str(uuid.uuid4())
         
         rooms = boq_config.get('rooms', [])
         building_dims = boq_config.get('building_dimensions', {"total_width": 20, "total_length": 20, "height": 8})
+        save_blend = bool(boq_config.get('save_blend', False))
+        # JPEG previews are several times smaller and faster to encode; PNG on request
+        render_format = 'png' if boq_config.get('lossless', False) else 'jpg'
+        
+        # Identical layouts render identical files - serve them from the hash cache
+        cache_key = self.config_hash(boq_config, quality)
+        cache_dir = os.path.join(self.public_renders, 'by_hash', cache_key)
+        cached = self.cached_result(cache_dir, save_blend, render_format)
+        if cached:
+            print(f"Using cached floor plan: {cache_key}")
+            return cached
+        
+        # Blender writes into a directory of its own; publish_outputs moves the finished files
+        scene_dir = os.path.join(self.temp_dir, self.scene_id)
+        os.makedirs(scene_dir, exist_ok=True)
+        
+        # Room geometry goes to Blender as parallel arrays rather than a list of dicts
+        xs, ys, widths, lengths = _layout(rooms, building_dims['total_width'], building_dims['total_length'])
+        rooms_path = os.path.join(self.temp_dir, f"rooms_{self.scene_id}.npz")
+        np.savez(
+            rooms_path,
+            x=xs,
+            y=ys,
+            w=widths,
+            l=lengths,
+            type=np.array([room.get('type', 'bedroom').lower() for room in rooms], dtype='S16')
+        )
         
         print(f"Creating detailed connected floor plan: {self.scene_id}")
         print(f"Rooms: {len(rooms)}")
+        print(f"Quality: {quality}")
         
         # Create detailed Blender script
-        blender_script = f"""import bpy
+        blender_script = f"""import sys
+import bpy
 import bmesh
 from mathutils import Vector
 import math
+import numpy as np
+
+if {repr(BLENDER_TEMPLATES_DIR)} not in sys.path:
+    sys.path.insert(0, {repr(BLENDER_TEMPLATES_DIR)})
+from blender_core import add_group_socket, clear_scene
 
-# Clear everything
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
+# Clear everything in one call - no selection, undo push or operator overhead
+clear_scene()
 
 scene = bpy.context.scene
-scene.render.engine = 'CYCLES'
 
 # Create materials
 def create_material(name, color, roughness=0.5, metallic=0.0):
@@ -55,9 +171,12 @@ def create_material(name, color, roughness=0.5, metallic=0.0):
     nodes = mat.node_tree.nodes
     nodes.clear()
     
+    # Workbench previews shade with the viewport colour, Cycles with the node tree
+    mat.diffuse_color = (*color[:3], color[3] if len(color) > 3 else 1.0)
+    
     # Create principled BSDF node
     principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-    principled.inputs['Base Color'].default_value = color + (1.0,)
+    principled.inputs['Base Color'].default_value = (*color[:3], 1.0)
     principled.inputs['Roughness'].default_value = roughness
     principled.inputs['Metallic'].default_value = metallic
     
@@ -81,177 +200,176 @@ materials = {{
     'furniture': create_material('Furniture_Material', (0.55, 0.27, 0.07)),  # Saddle brown
 }}
 
+# Bulk box-mesh construction - vertices/faces are written with foreach_set
+CUBE_CORNERS = np.array([(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+                         (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)], dtype=np.float32)
+CUBE_FACES = np.array([(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+                       (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)], dtype=np.int32)
+
+def create_box_mesh(name, centers, half_extents, material_keys=None):
+    centers = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+    half_extents = np.asarray(half_extents, dtype=np.float32).reshape(-1, 3)
+    count = len(centers)
+    
+    coords = centers[:, None, :] + CUBE_CORNERS[None, :, :] * half_extents[:, None, :]
+    loops = CUBE_FACES[None, :, :] + (np.arange(count, dtype=np.int32) * 8)[:, None, None]
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(count * 8)
+    mesh.vertices.foreach_set('co', coords.ravel())
+    mesh.loops.add(count * 24)
+    mesh.loops.foreach_set('vertex_index', loops.ravel())
+    mesh.polygons.add(count * 6)
+    mesh.polygons.foreach_set('loop_start', np.arange(0, count * 24, 4, dtype=np.int32))
+    try:
+        mesh.polygons.foreach_set('loop_total', np.full(count * 6, 4, dtype=np.int32))
+    except (AttributeError, TypeError, RuntimeError):
+        pass  # Derived from loop_start in Blender 4.x
+    
+    if material_keys:
+        slots = list(dict.fromkeys(material_keys))
+        for key in slots:
+            mesh.materials.append(materials[key])
+        indices = np.array([slots.index(key) for key in material_keys], dtype=np.int32)
+        mesh.polygons.foreach_set('material_index', np.repeat(indices, 6))
+    
+    mesh.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+box_centers = []
+box_half_extents = []
+box_materials = []
+
+def add_box(location, scale, material_key):
+    box_centers.append(location)
+    box_half_extents.append(scale)
+    box_materials.append(material_key)
+
 # Room data
-room_data = {rooms}
+room_arrays = np.load("{Path(rooms_path).as_posix()}")
+room_xs = room_arrays['x']
+room_ys = room_arrays['y']
+room_widths = room_arrays['w']
+room_lengths = room_arrays['l']
+room_types = room_arrays['type']
+room_count = len(room_xs)
 building_width = {building_dims['total_width']}
 building_length = {building_dims['total_length']}
 building_height = {building_dims['height']}
 
 # Create foundation
-bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, -0.1))
-foundation = bpy.context.active_object
-foundation.scale = (building_width/2, building_length/2, 0.1)
-foundation.name = "Foundation"
-
-# Create detailed room layout
-room_positions = []
-current_x = -building_width/2 + 2
-current_y = -building_length/2 + 2
-row_height = 0
-rooms_per_row = 3
-
-for i, room in enumerate(room_data):
-    room_name = room.get('name', f'Room_{{i}}')
-    room_type = room.get('type', 'bedroom').lower()
-    room_width = room.get('width', 8)
-    room_length = room.get('length', 8)
-    room_height = room.get('height', 10)
-    
-    # Calculate position
-    if i > 0 and i % rooms_per_row == 0:
-        current_x = -building_width/2 + 2
-        current_y += row_height + 2
-        row_height = 0
+create_box_mesh("Foundation", [(0, 0, -0.1)], [(building_width/2, building_length/2, 0.1)])
+
+# Four wall segments per room
+wall_segments = []
+for x, y, width, length in zip(room_xs, room_ys, room_widths, room_lengths):
+    x1, x2 = x - width/2, x + width/2
+    y1, y2 = y - length/2, y + length/2
+    wall_segments.extend((((x1, y2), (x2, y2)), ((x1, y1), (x2, y1)), ((x1, y1), (x1, y2)), ((x2, y1), (x2, y2))))
+
+# Build all walls with one Geometry Nodes modifier instead of one operator call per wall
+def create_wall_node_group(material):
+    group = bpy.data.node_groups.new('FloorPlanGN', 'GeometryNodeTree')
+    add_group_socket(group, 'INPUT', 'NodeSocketGeometry', 'Geometry')
+    add_group_socket(group, 'OUTPUT', 'NodeSocketGeometry', 'Geometry')
+    nodes = group.nodes
+    links = group.links
     
-    room_x = current_x + room_width/2
-    room_y = current_y + room_length/2
-    room_positions.append((room_x, room_y, room_width, room_length, room_type, room_name))
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+    to_points = nodes.new('GeometryNodeMeshToPoints')
+    cube = nodes.new('GeometryNodeMeshCube')
+    cube.inputs['Size'].default_value = (2, 2, 2)
+    scale = nodes.new('GeometryNodeInputNamedAttribute')
+    scale.data_type = 'FLOAT_VECTOR'
+    scale.inputs['Name'].default_value = 'scale'
+    instance = nodes.new('GeometryNodeInstanceOnPoints')
+    realize = nodes.new('GeometryNodeRealizeInstances')
+    set_material = nodes.new('GeometryNodeSetMaterial')
+    set_material.inputs['Material'].default_value = material
     
-    # Update positions
-    current_x += room_width + 1
-    row_height = max(row_height, room_length)
+    links.new(group_input.outputs[0], to_points.inputs['Mesh'])
+    links.new(to_points.outputs['Points'], instance.inputs['Points'])
+    links.new(cube.outputs['Mesh'], instance.inputs['Instance'])
+    links.new(scale.outputs['Attribute'], instance.inputs['Scale'])
+    links.new(instance.outputs['Instances'], realize.inputs['Geometry'])
+    links.new(realize.outputs['Geometry'], set_material.inputs['Geometry'])
+    links.new(set_material.outputs['Geometry'], group_output.inputs[0])
+    return group
+
+wall_height = building_height/2
+wall_thickness = 0.1
+
+wall_points = []
+wall_scales = []
+for (sx1, sy1), (sx2, sy2) in wall_segments:
+    wall_points.extend(((sx1 + sx2)/2, (sy1 + sy2)/2, wall_height))
+    if sy1 == sy2:
+        wall_scales.extend(((sx2 - sx1)/2, wall_thickness, wall_height))
+    else:
+        wall_scales.extend((wall_thickness, (sy2 - sy1)/2, wall_height))
+
+wall_mesh = bpy.data.meshes.new('WallPoints')
+wall_mesh.vertices.add(len(wall_segments))
+wall_mesh.vertices.foreach_set('co', wall_points)
+wall_mesh.attributes.new('scale', 'FLOAT_VECTOR', 'POINT').data.foreach_set('vector', wall_scales)
+walls = bpy.data.objects.new('Walls', wall_mesh)
+bpy.context.collection.objects.link(walls)
+walls.data.materials.append(materials['wall'])
+walls.modifiers.new('WallsGN', 'NODES').node_group = create_wall_node_group(materials['wall'])
 
 # Create rooms
-for i, (x, y, width, length, room_type, name) in enumerate(room_positions):
+for i, (x, y, width, length, room_type) in enumerate(zip(room_xs, room_ys, room_widths, room_lengths, room_types)):
     # Create floor
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y, 0.05))
-    floor = bpy.context.active_object
-    floor.scale = (width/2, length/2, 0.05)
-    floor.name = f"Floor_{{name}}"
-    
-    # Assign material
-    if room_type in materials:
-        floor.data.materials.append(materials[room_type])
-    else:
-        floor.data.materials.append(materials['living'])
-    
-    # Create walls
-    wall_height = building_height/2
-    wall_thickness = 0.1
-    
-    # Front wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y + length/2, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (width/2, wall_thickness, wall_height)
-    wall.name = f"Wall_Front_{{name}}"
-    wall.data.materials.append(materials['wall'])
-    
-    # Back wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y - length/2, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (width/2, wall_thickness, wall_height)
-    wall.name = f"Wall_Back_{{name}}"
-    wall.data.materials.append(materials['wall'])
-    
-    # Left wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(x - width/2, y, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (wall_thickness, length/2, wall_height)
-    wall.name = f"Wall_Left_{{name}}"
-    wall.data.materials.append(materials['wall'])
-    
-    # Right wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(x + width/2, y, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (wall_thickness, length/2, wall_height)
-    wall.name = f"Wall_Right_{{name}}"
-    wall.data.materials.append(materials['wall'])
+    floor_material = room_type.decode()
+    add_box((x, y, 0.05), (width/2, length/2, 0.05), floor_material if floor_material in materials else 'living')
     
     # Add simple furniture based on room type
-    if room_type == 'living':
+    if room_type == b'living':
         # Sofa
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x - width/4, y, 0.3))
-        furniture = bpy.context.active_object
-        furniture.scale = (width/4, 0.4, 0.3)
-        furniture.name = f"Sofa_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x - width/4, y, 0.3), (width/4, 0.4, 0.3), 'furniture')
         
         # Coffee table
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y, 0.15))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.8, 0.4, 0.15)
-        furniture.name = f"Table_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x, y, 0.15), (0.8, 0.4, 0.15), 'furniture')
         
-    elif room_type == 'kitchen':
+    elif room_type == b'kitchen':
         # Kitchen island
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y, 0.4))
-        furniture = bpy.context.active_object
-        furniture.scale = (width/3, 0.6, 0.4)
-        furniture.name = f"Island_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x, y, 0.4), (width/3, 0.6, 0.4), 'furniture')
         
         # Cabinets
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x - width/3, y + length/3, 0.4))
-        furniture = bpy.context.active_object
-        furniture.scale = (width/4, 0.3, 0.4)
-        furniture.name = f"Cabinets_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x - width/3, y + length/3, 0.4), (width/4, 0.3, 0.4), 'furniture')
         
-    elif room_type == 'bedroom':
+    elif room_type == b'bedroom':
         # Bed
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y, 0.25))
-        furniture = bpy.context.active_object
-        furniture.scale = (width/3, length/3, 0.25)
-        furniture.name = f"Bed_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x, y, 0.25), (width/3, length/3, 0.25), 'furniture')
         
         # Dresser
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x + width/3, y, 0.4))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.4, 0.3, 0.4)
-        furniture.name = f"Dresser_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x + width/3, y, 0.4), (0.4, 0.3, 0.4), 'furniture')
         
-    elif room_type == 'bathroom':
+    elif room_type == b'bathroom':
         # Toilet
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x - width/4, y + length/4, 0.2))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.2, 0.3, 0.2)
-        furniture.name = f"Toilet_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x - width/4, y + length/4, 0.2), (0.2, 0.3, 0.2), 'furniture')
         
         # Sink
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x + width/4, y + length/4, 0.4))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.3, 0.2, 0.05)
-        furniture.name = f"Sink_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x + width/4, y + length/4, 0.4), (0.3, 0.2, 0.05), 'furniture')
         
         # Bathtub
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(x, y - length/4, 0.2))
-        furniture = bpy.context.active_object
-        furniture.scale = (width/3, 0.4, 0.2)
-        furniture.name = f"Bathtub_{{name}}"
-        furniture.data.materials.append(materials['furniture'])
+        add_box((x, y - length/4, 0.2), (width/3, 0.4, 0.2), 'furniture')
     
     # Add doors (openings in walls)
-    if i < len(room_positions) - 1:
+    if i < room_count - 1:
         # Create door opening by scaling down wall section
         door_x = x + width/2
         door_y = y
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(door_x, door_y, 1))
-        door = bpy.context.active_object
-        door.scale = (0.05, 0.4, 1)
-        door.name = f"Door_{{name}}"
-        door.data.materials.append(materials['door'])
+        add_box((door_x, door_y, 1), (0.05, 0.4, 1), 'door')
 
 # Add connecting hallway
-bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0.05))
-hallway = bpy.context.active_object
-hallway.scale = (building_width/2, 1, 0.05)
-hallway.name = "Hallway"
-hallway.data.materials.append(materials['living'])
+add_box((0, 0, 0.05), (building_width/2, 1, 0.05), 'living')
+
+# Floors, furniture, doors and hallway as a single mesh
+create_box_mesh("Rooms", box_centers, box_half_extents, box_materials)
 
 # Add lighting
 light_data = bpy.data.lights.new(name="MainLight", type='SUN')
@@ -279,20 +397,38 @@ scene.camera = camera
 scene.render.resolution_x = 1920
 scene.render.resolution_y = 1080
 scene.render.film_transparent = False
-scene.render.engine = 'CYCLES'
-scene.cycles.samples = 128
-scene.cycles.use_denoising = True
+
+if "{quality}" == 'final':
+    scene.render.engine = 'CYCLES'
+    scene.cycles.samples = 128
+    scene.cycles.use_denoising = True
+
+    # Large GPU tiles
+    scene.cycles.use_auto_tile = True
+    scene.cycles.tile_size = 2048
+else:
+    # Solid-shaded preview - renders in milliseconds instead of minutes
+    scene.render.engine = 'BLENDER_WORKBENCH'
+    scene.display.shading.light = 'FLAT'
+    scene.display.shading.color_type = 'MATERIAL'
 
 # Export files
-output_dir = "{self.temp_dir.replace(chr(92), '/')}"
-blend_file = output_dir + "/detailed_floor_plan_{self.scene_id}.blend"
-obj_file = output_dir + "/detailed_floor_plan_{self.scene_id}.obj"
-mtl_file = output_dir + "/detailed_floor_plan_{self.scene_id}.mtl"
-render_file = output_dir + "/detailed_floor_plan_{self.scene_id}.png"
+output_dir = "{Path(scene_dir).resolve().as_posix()}"
+blend_file = output_dir + "/detailed_floor_plan.blend"
+obj_file = output_dir + "/detailed_floor_plan.obj"
+mtl_file = output_dir + "/detailed_floor_plan.mtl"
+render_file = output_dir + "/detailed_floor_plan.{render_format}"
+
+if "{render_format}" == 'jpg':
+    scene.render.image_settings.file_format = 'JPEG'
+    scene.render.image_settings.quality = 85
+else:
+    scene.render.image_settings.file_format = 'PNG'
 
-# Save files
-bpy.ops.wm.save_as_mainfile(filepath=blend_file)
-print("BLEND_FILE: " + blend_file)
+# Save .blend only when requested - downstream consumers use OBJ/PNG
+if {save_blend}:
+    bpy.ops.wm.save_as_mainfile(filepath=blend_file, compress=False)
+    print("BLEND_FILE: " + blend_file)
 
 # Export OBJ with materials
 try:
@@ -342,10 +478,13 @@ print("SCENE_ID: {self.scene_id}")
         with open(script_path, 'w', encoding='utf-8') as f:
             f.write(blender_script)
         
-        # Run Blender
+        # Run Blender - skip user prefs/addons and fail with a nonzero status on script errors
         cmd = [
             self.blender_path,
             '--background',
+            '--factory-startup',
+            '--disable-autoexec',
+            '--python-exit-code', '1',
             '--python', script_path,
             '--',
             '--verbose'
@@ -353,85 +492,101 @@ print("SCENE_ID: {self.scene_id}")
         
         print(f"Running Blender: {' '.join(cmd)}")
         
+        return await self.run_blender(cmd, self.scene_id, cache_dir)
+    
+    async def run_blender(self, cmd, scene_id, cache_dir, timeout=300):
+        """Run Blender without blocking the event loop, parsing output markers as they stream in"""
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                cwd=self.temp_dir
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.temp_dir,
+                limit=BLENDER_LINE_LIMIT
             )
-            
-            print("STDOUT:")
-            print(result.stdout)
-            if result.stderr:
-                print("STDERR:")
-                print(result.stderr)
-            
-            return self.parse_output(result.stdout)
-            
-        except subprocess.TimeoutExpired:
-            print("Blender process timed out")
-            return None
         except Exception as e:
             print(f"Error running Blender: {e}")
             return None
-    
-    def parse_output(self, output):
-        """Parse Blender output to extract file paths"""
+        
         result = {
-            'scene_id': self.scene_id,
+            'scene_id': scene_id,
             'success': False
         }
         
-        lines = output.split('\n')
-        for line in lines:
-            if 'SCENE_ID:' in line:
-                result['scene_id'] = line.split('SCENE_ID:')[1].strip()
-            elif 'BLEND_FILE:' in line:
-                result['blend_file'] = line.split('BLEND_FILE:')[1].strip()
-            elif 'OBJ_FILE:' in line:
-                result['obj_file'] = line.split('OBJ_FILE:')[1].strip()
-            elif 'MTL_FILE:' in line:
-                result['mtl_file'] = line.split('MTL_FILE:')[1].strip()
-            elif 'RENDER_FILE:' in line:
-                result['render_file'] = line.split('RENDER_FILE:')[1].strip()
+        async def stream_output():
+            async for raw_line in process.stdout:
+                line = raw_line.decode('utf-8', errors='replace')
+                print(line, end='')
+                self.parse_line(line, result)
+            await process.wait()
         
-        # Copy files to public directory
-        public_renders = 'public/renders'
-        os.makedirs(public_renders, exist_ok=True)
+        async def stop():
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
         
-        if 'obj_file' in result:
-            src_obj = result['obj_file']
-            dst_obj = os.path.join(public_renders, os.path.basename(src_obj))
-            if os.path.exists(src_obj):
-                shutil.copy2(src_obj, dst_obj)
-                result['obj_file'] = f"/renders/{os.path.basename(src_obj)}"
+        try:
+            await asyncio.wait_for(stream_output(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print("Blender process timed out")
+            await stop()
+            return None
+        except BaseException:
+            # Cancellation, a parse error or anything else must not leave Blender running
+            await stop()
+            raise
         
-        if 'mtl_file' in result:
-            src_mtl = result['mtl_file']
-            dst_mtl = os.path.join(public_renders, os.path.basename(src_mtl))
-            if os.path.exists(src_mtl):
-                shutil.copy2(src_mtl, dst_mtl)
-                result['mtl_file'] = f"/renders/{os.path.basename(src_mtl)}"
+        if process.returncode != 0:
+            print(f"Blender script failed with exit code {process.returncode}")
+            return None
         
-        if 'blend_file' in result:
-            src_blend = result['blend_file']
-            dst_blend = os.path.join(public_renders, os.path.basename(src_blend))
-            if os.path.exists(src_blend):
-                shutil.copy2(src_blend, dst_blend)
-                result['blend_file'] = f"/renders/{os.path.basename(src_blend)}"
+        return self.publish_outputs(result, cache_dir)
+    
+    def parse_line(self, line, result):
+        """Record a single Blender output marker into result"""
+        if 'SCENE_ID:' in line:
+            result['scene_id'] = line.split('SCENE_ID:')[1].strip()
+        elif 'BLEND_FILE:' in line:
+            result['blend_file'] = line.split('BLEND_FILE:')[1].strip()
+        elif 'OBJ_FILE:' in line:
+            result['obj_file'] = line.split('OBJ_FILE:')[1].strip()
+        elif 'MTL_FILE:' in line:
+            result['mtl_file'] = line.split('MTL_FILE:')[1].strip()
+        elif 'RENDER_FILE:' in line:
+            result['render_file'] = line.split('RENDER_FILE:')[1].strip()
+    
+    def publish_outputs(self, result, cache_dir):
+        """Move the rendered files into the cache directory and mark the result successful
+
+        Each file is staged under a unique name beside its final path and moved into place
+        with os.replace, so readers never see a half-written file and concurrent renders of
+        the same layout just replace each other's identical output.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
         
-        if 'render_file' in result:
-            src_render = result['render_file']
-            dst_render = os.path.join(public_renders, os.path.basename(src_render))
-            if os.path.exists(src_render):
-                shutil.copy2(src_render, dst_render)
-                result['render_file'] = f"/renders/{os.path.basename(src_render)}"
+        for key in ('obj_file', 'mtl_file', 'blend_file', 'render_file'):
+            if key in result:
+                src = result.pop(key)
+                if not os.path.exists(src):
+                    continue
+                dst = os.path.join(cache_dir, os.path.basename(src))
+                staged = f"{dst}.{result['scene_id']}.tmp"
+                self.publish_file(src, staged)
+                os.replace(staged, dst)
+                result[key] = self.public_url(dst)
         
         result['success'] = 'obj_file' in result and 'mtl_file' in result
         return result
     
+    def publish_file(self, src, dst):
+        """Hardlink a rendered file into the cache directory, copying only across filesystems"""
+        try:
+            if os.path.exists(dst):
+                os.remove(dst)
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    
     def cleanup(self):
         """Clean up temporary files"""
         if os.path.exists(self.temp_dir):
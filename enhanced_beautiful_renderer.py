@@ -8,9 +8,11 @@ import os
 import tempfile
 import uuid
 import json
+import hashlib
 import shutil
-import math
-import random
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Force NVIDIA GPU usage (RTX 4050 is CUDA device 0)
 os.environ['CUDA_VISIBLE_DEVICES'] = '0'  # Use NVIDIA GPU (Task Manager GPU 1)
@@ -18,6 +20,254 @@ os.environ['BLENDER_CUDA_DEVICE'] = '0'
 os.environ['NVIDIA_VISIBLE_DEVICES'] = '0'
 
 from advanced_layout_generator import AdvancedLayoutGenerator
+from blender_worker_pool import BlenderWorkerPool
+
+# Static Blender scripts; per-render settings are passed as arguments, never baked into source
+BLENDER_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blender_templates')
+# Builds, exports and renders a scene from a JSON settings file
+SCENE_SCRIPT_PATH = os.path.join(BLENDER_TEMPLATES_DIR, 'render_enhanced.py')
+# Single camera-angle render of a saved scene, used when views render in parallel
+VIEW_SCRIPT_PATH = os.path.join(BLENDER_TEMPLATES_DIR, 'render_view.py')
+
+# Ultra-premium material library with photorealistic quality:
+# key -> (name, base_color, roughness, metallic, emission, normal_strength, subsurface, transmission, ior)
+MATERIAL_LIBRARY = {
+    # Luxury flooring materials
+    'floor_italian_marble_carrara': ("Carrara Italian Marble", (0.98, 0.97, 0.95), 0.02, 0.0, None, 0.3, 0.1, 0.0, 1.55),
+    'floor_nero_marquina_marble': ("Nero Marquina Marble", (0.08, 0.08, 0.12), 0.01, 0.0, None, 0.2, 0.05, 0.0, 1.55),
+    'floor_calacatta_gold_marble': ("Calacatta Gold Marble", (0.95, 0.93, 0.88), 0.03, 0.0, None, 0.4, 0.08, 0.0, 1.55),
+    'floor_brazilian_cherry': ("Brazilian Cherry Hardwood", (0.45, 0.15, 0.08), 0.25, 0.0, None, 0.5, 0.0, 0.0, 1.52),
+    'floor_european_oak': ("European Oak", (0.55, 0.35, 0.20), 0.30, 0.0, None, 0.6, 0.0, 0.0, 1.52),
+    'floor_american_walnut': ("American Walnut", (0.35, 0.20, 0.12), 0.20, 0.0, None, 0.4, 0.0, 0.0, 1.52),
+    'floor_porcelain_modern': ("Modern Porcelain", (0.92, 0.90, 0.88), 0.05, 0.0, None, 0.1, 0.0, 0.0, 1.54),
+    'floor_travertine_honed': ("Honed Travertine", (0.88, 0.82, 0.72), 0.35, 0.0, None, 0.7, 0.05, 0.0, 1.55),
+    'floor_concrete_polished': ("Polished Concrete", (0.65, 0.62, 0.60), 0.08, 0.0, None, 0.3, 0.0, 0.0, 1.52),
+    
+    # Sophisticated wall materials
+    'wall_venetian_plaster': ("Venetian Plaster", (0.95, 0.93, 0.90), 0.25, 0.0, None, 0.8, 0.02, 0.0, 1.45),
+    'wall_designer_paint_pearl': ("Designer Pearl Paint", (0.95, 0.95, 0.93), 0.15, 0.05, None, 0.2, 0.0, 0.0, 1.45),
+    'wall_designer_paint_sage': ("Designer Sage Paint", (0.75, 0.82, 0.70), 0.20, 0.0, None, 0.1, 0.0, 0.0, 1.45),
+    'wall_natural_stone_limestone': ("Natural Limestone", (0.85, 0.82, 0.75), 0.45, 0.0, None, 0.8, 0.0, 0.0, 1.55),
+    'wall_brick_handmade': ("Handmade Brick", (0.65, 0.35, 0.25), 0.65, 0.0, None, 1.0, 0.0, 0.0, 1.52),
+    'wall_wood_panel_walnut': ("Walnut Wood Panel", (0.35, 0.22, 0.15), 0.35, 0.0, None, 0.6, 0.0, 0.0, 1.52),
+    'wall_fabric_linen': ("Linen Wall Covering", (0.92, 0.88, 0.82), 0.85, 0.0, None, 0.9, 0.0, 0.0, 1.45),
+    
+    # Luxury furniture materials
+    'furniture_mahogany_premium': ("Premium Mahogany", (0.42, 0.18, 0.10), 0.25, 0.0, None, 0.5, 0.0, 0.0, 1.52),
+    'furniture_teak_aged': ("Aged Teak", (0.55, 0.40, 0.25), 0.30, 0.0, None, 0.6, 0.0, 0.0, 1.52),
+    'furniture_maple_birds_eye': ("Bird's Eye Maple", (0.85, 0.75, 0.60), 0.20, 0.0, None, 0.4, 0.0, 0.0, 1.52),
+    'furniture_leather_italian_brown': ("Italian Brown Leather", (0.35, 0.20, 0.12), 0.15, 0.0, None, 0.2, 0.15, 0.0, 1.46),
+    'furniture_leather_cognac': ("Cognac Leather", (0.55, 0.30, 0.15), 0.18, 0.0, None, 0.3, 0.12, 0.0, 1.46),
+    'furniture_fabric_cashmere': ("Cashmere Fabric", (0.88, 0.82, 0.75), 0.90, 0.0, None, 0.8, 0.0, 0.0, 1.45),
+    'furniture_fabric_silk': ("Silk Fabric", (0.45, 0.52, 0.65), 0.05, 0.02, None, 0.1, 0.0, 0.0, 1.47),
+    'furniture_fabric_velvet': ("Velvet Fabric", (0.25, 0.35, 0.55), 0.95, 0.0, None, 1.0, 0.0, 0.0, 1.45),
+    
+    # Premium metal finishes
+    'metal_brushed_stainless': ("Brushed Stainless Steel", (0.85, 0.85, 0.85), 0.15, 0.95, None, 0.2, 0.0, 0.0, 2.5),
+    'metal_brass_antique': ("Antique Brass", (0.75, 0.60, 0.35), 0.25, 0.85, None, 0.3, 0.0, 0.0, 2.3),
+    'metal_copper_patina': ("Patina Copper", (0.45, 0.65, 0.55), 0.30, 0.80, None, 0.4, 0.0, 0.0, 2.2),
+    'metal_bronze_oil_rubbed': ("Oil Rubbed Bronze", (0.25, 0.20, 0.15), 0.35, 0.75, None, 0.3, 0.0, 0.0, 2.4),
+    'metal_titanium_brushed': ("Brushed Titanium", (0.70, 0.70, 0.75), 0.10, 0.90, None, 0.1, 0.0, 0.0, 2.6),
+    
+    # Sophisticated lighting materials
+    'light_warm_led': ("Warm LED Light", (1.0, 0.95, 0.85), 0.0, 0.0, (1.0, 0.95, 0.85), 0.0, 0.0, 0.0, 1.0),
+    'light_cool_led': ("Cool LED Light", (0.90, 0.95, 1.0), 0.0, 0.0, (0.90, 0.95, 1.0), 0.0, 0.0, 0.0, 1.0),
+    'light_accent_amber': ("Amber Accent Light", (1.0, 0.75, 0.40), 0.0, 0.0, (1.0, 0.75, 0.40), 0.0, 0.0, 0.0, 1.0),
+    'light_crystal_chandelier': ("Crystal Element", (0.98, 0.98, 0.98), 0.0, 0.0, None, 0.0, 0.0, 0.95, 1.52),
+    
+    # Premium glass materials
+    'glass_ultra_clear': ("Ultra Clear Glass", (0.98, 0.98, 0.98), 0.0, 0.0, None, 0.0, 0.0, 0.95, 1.52),
+    'glass_low_iron': ("Low Iron Glass", (0.95, 0.98, 0.95), 0.0, 0.0, None, 0.0, 0.0, 0.92, 1.52),
+    'glass_frosted_luxury': ("Luxury Frosted Glass", (0.92, 0.92, 0.95), 0.50, 0.0, None, 0.8, 0.0, 0.60, 1.45),
+    'glass_tinted_bronze': ("Bronze Tinted Glass", (0.75, 0.70, 0.60), 0.0, 0.0, None, 0.0, 0.0, 0.85, 1.52),
+    
+    # Natural landscaping materials
+    'grass_premium_blend': ("Premium Grass Blend", (0.25, 0.55, 0.25), 0.85, 0.0, None, 0.9, 0.05, 0.0, 1.45),
+    'soil_rich_loam': ("Rich Loam Soil", (0.35, 0.25, 0.15), 0.95, 0.0, None, 1.0, 0.0, 0.0, 1.45),
+    'tree_bark_oak': ("Oak Tree Bark", (0.35, 0.25, 0.18), 0.85, 0.0, None, 1.2, 0.0, 0.0, 1.52),
+    'tree_leaves_seasonal': ("Seasonal Tree Leaves", (0.30, 0.60, 0.25), 0.80, 0.0, None, 0.8, 0.08, 0.0, 1.45),
+    'stone_granite_polished': ("Polished Granite", (0.45, 0.42, 0.40), 0.05, 0.0, None, 0.3, 0.0, 0.0, 1.55),
+    'concrete_architectural': ("Architectural Concrete", (0.72, 0.70, 0.68), 0.25, 0.0, None, 0.4, 0.0, 0.0, 1.52),
+    
+    # Specialty accent materials
+    'ceramic_handcrafted': ("Handcrafted Ceramic", (0.88, 0.85, 0.80), 0.15, 0.0, None, 0.3, 0.0, 0.0, 1.54),
+    'fabric_designer_linen': ("Designer Linen", (0.92, 0.88, 0.82), 0.88, 0.0, None, 0.9, 0.0, 0.0, 1.45),
+    'wood_reclaimed_barn': ("Reclaimed Barn Wood", (0.45, 0.35, 0.25), 0.70, 0.0, None, 1.0, 0.0, 0.0, 1.52),
+    'stone_natural_slate': ("Natural Slate", (0.35, 0.38, 0.42), 0.60, 0.0, None, 0.8, 0.0, 0.0, 1.55),
+}
+
+# Used for any key the scene references that the library does not define
+DEFAULT_MATERIAL_KEY = 'concrete_architectural'
+
+# Material keys placed by the scene template, grouped by what places them
+STRUCTURE_MATERIAL_KEYS = ('floor_concrete_polished', 'wall_natural_stone_limestone', 'wall_designer_paint_pearl')
+FLOOR_MATERIAL_KEYS = {'marble': 'floor_italian_marble_carrara', 'ceramic': 'floor_porcelain_modern'}
+DEFAULT_FLOOR_KEY = 'floor_european_oak'
+FURNITURE_MATERIAL_KEYS = {
+    'living': ('furniture_fabric_cashmere', 'furniture_teak_aged', 'furniture_mahogany_premium'),
+    'bedroom': ('furniture_fabric_silk', 'furniture_teak_aged', 'furniture_mahogany_premium'),
+    'kitchen': ('floor_italian_marble_carrara', 'furniture_teak_aged'),
+}
+FEATURE_MATERIAL_KEYS = {
+    'interiorDetails': ('light_warm_led', 'furniture_teak_aged'),
+    'landscaping': ('grass_premium_blend', 'tree_bark_oak', 'tree_leaves_seasonal', 'concrete_architectural'),
+}
+
+# Scene export format -> files it produces alongside the .blend
+EXPORT_EXTENSIONS = {
+    'obj': ('obj', 'mtl'),
+    'glb': ('glb',),
+    'usd': ('usdc',),
+}
+
+# Cycles light path limits per quality level; ultra keeps Blender's defaults
+LIGHT_PATHS = {
+    'default': {
+        'max_bounces': 6,
+        'diffuse_bounces': 3,
+        'glossy_bounces': 4,
+        'transmission_bounces': 4,
+        'transparent_max_bounces': 4,
+        'volume_bounces': 0,
+        'caustics_reflective': False,
+        'caustics_refractive': False,
+    },
+    'ultra': {
+        'max_bounces': 12,
+        'diffuse_bounces': 4,
+        'glossy_bounces': 4,
+        'transmission_bounces': 12,
+        'transparent_max_bounces': 8,
+        'volume_bounces': 0,
+        'caustics_reflective': True,
+        'caustics_refractive': True,
+    },
+}
+
+# Per-view sample ceilings; the top-down plan is a flat layout reference, not a hero shot
+VIEW_SAMPLES = {
+    'plan': 64,
+}
+
+def _look_at_eulers(locations, targets):
+    """XYZ Euler rotations that aim a camera (-Z forward, +Y up) from each location at its target
+
+    Matches mathutils' to_track_quat('-Z', 'Y').to_euler(), so Blender only assigns them.
+    """
+    forward = np.asarray(targets, dtype=float) - np.asarray(locations, dtype=float)
+    forward /= np.linalg.norm(forward, axis=1, keepdims=True)
+    right = np.cross(forward, (0.0, 0.0, 1.0))
+    right_len = np.linalg.norm(right, axis=1, keepdims=True)
+    # Looking straight down or up leaves the roll free; keep +X as Blender does
+    right = np.where(right_len > 1e-9, right / np.maximum(right_len, 1e-9), (1.0, 0.0, 0.0))
+    up = np.cross(right, forward)
+    # The rotation matrix columns are right, up and -forward; decompose as Rz @ Ry @ Rx
+    rx = np.arctan2(up[:, 2], -forward[:, 2])
+    ry = np.arctan2(-right[:, 2], np.hypot(right[:, 0], right[:, 1]))
+    rz = np.arctan2(right[:, 1], right[:, 0])
+    return np.round(np.stack([rx, ry, rz], axis=1), 6).tolist()
+
+def _camera_views(width, length, height):
+    """(name, location, rotation_euler) for each rendered camera angle"""
+    center = (width / 2, length / 2)
+    views = [
+        ("hero", (width * 1.5, -length * 1.2, height * 1.5), (*center, height / 3)),
+        ("detail", (width * 0.8, length * 0.3, height * 0.8), (*center, height / 4)),
+        ("plan", (*center, height * 3), (*center, 0)),
+    ]
+    rotations = _look_at_eulers([view[1] for view in views], [view[2] for view in views])
+    return [(name, location, tuple(rotation)) for (name, location, _), rotation in zip(views, rotations)]
+
+ROOM_WALL_THICKNESS = 0.1
+
+def _room_boxes(layout_positions):
+    """Floor and wall box transforms for every room, computed in one numpy pass"""
+    xs = np.array([pos['x'] for pos in layout_positions], dtype=float)
+    ys = np.array([pos['y'] for pos in layout_positions], dtype=float)
+    ws = np.array([pos['width'] for pos in layout_positions], dtype=float)
+    ls = np.array([pos['length'] for pos in layout_positions], dtype=float)
+    hs = np.array([pos['room'].get('height', 3.0) for pos in layout_positions], dtype=float)
+    zeros = np.zeros_like(xs)
+    t = np.full_like(xs, ROOM_WALL_THICKNESS / 2)
+    
+    floor_centers = np.stack([xs, ys, zeros + 0.05], axis=1)
+    floor_scales = np.stack([ws / 2, ls / 2, zeros + 0.05], axis=1)
+    
+    # Walls span the full room height, so center and half-extent are both h/2
+    wz = hs / 2
+    wall_centers = np.stack([
+        np.stack([xs, ys + ls / 2, wz], axis=1),  # North
+        np.stack([xs, ys - ls / 2, wz], axis=1),  # South
+        np.stack([xs + ws / 2, ys, wz], axis=1),  # East
+        np.stack([xs - ws / 2, ys, wz], axis=1),  # West
+    ], axis=1)
+    wall_scales = np.stack([
+        np.stack([ws / 2, t, wz], axis=1),
+        np.stack([ws / 2, t, wz], axis=1),
+        np.stack([t, ls / 2, wz], axis=1),
+        np.stack([t, ls / 2, wz], axis=1),
+    ], axis=1)
+    
+    floor_keys = [FLOOR_MATERIAL_KEYS.get(pos.get('materials', {}).get('floor', 'hardwood_oak'), DEFAULT_FLOOR_KEY)
+                  for pos in layout_positions]
+    return {
+        'floor_centers': floor_centers.tolist(),
+        'floor_scales': floor_scales.tolist(),
+        'floor_keys': floor_keys,
+        'wall_centers': wall_centers.reshape(-1, 3).tolist(),
+        'wall_scales': wall_scales.reshape(-1, 3).tolist(),
+    }
+
+TREE_COUNT = 4
+LANDSCAPE_MARGIN = 5
+
+def _tree_positions(building_width, building_length, seed, count=TREE_COUNT, margin=LANDSCAPE_MARGIN):
+    """Jittered ring of tree positions just outside the building footprint
+
+    Every position is valid, so exactly `count` trees are placed, and the same seed always
+    gives the same scatter.
+    """
+    rng = np.random.default_rng(seed)
+    step = 2 * np.pi / count
+    angles = np.arange(count) * step + rng.uniform(-0.25, 0.25, count) * step
+    cos, sin = np.cos(angles), np.sin(angles)
+    
+    # Distance from the building centre to its edge along each angle, then out into the yard
+    with np.errstate(divide='ignore'):
+        to_edge = np.minimum(building_width / 2 / np.abs(cos), building_length / 2 / np.abs(sin))
+    r = to_edge + margin * rng.uniform(0.4, 0.8, count)
+    
+    xs = building_width / 2 + r * cos
+    ys = building_length / 2 + r * sin
+    return np.stack([xs, ys], axis=1).tolist()
+
+def _fast_publish(src, dst):
+    """Place src at dst as cheaply as the filesystem allows
+
+    Hard link on the same filesystem, kernel-side copy_file_range (reflink on XFS/Btrfs)
+    where available, and a plain copy otherwise.
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining == 0:
+            shutil.copystat(src, dst)
+            return
+    except (AttributeError, OSError):
+        pass
+    shutil.copy2(src, dst)
 
 class EnhancedBeautifulRenderer:
     """Enhanced beautiful renderer with furniture, landscaping, and interior details"""
@@ -27,10 +277,157 @@ class EnhancedBeautifulRenderer:
         self.blender_path = 'D:\\blender\\blender.exe'
         self.scene_id = None
         self.layout_generator = AdvancedLayoutGenerator()
+        self.gpu_count = 1
+        self._pool = None
+        self.output_dir = os.path.join(os.path.dirname(__file__), 'backend', 'generated_models')
+        self._cache_dir = os.path.join(self.output_dir, 'by_hash')
+        self.material_library = os.path.join(self.output_dir, 'enhanced_materials.blend')
+    
+    def config_hash(self, config):
+        """Stable digest of a config; floats are rounded so float noise does not split entries"""
+        def normalize(value):
+            if isinstance(value, float):
+                return round(value, 4)
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+        payload = json.dumps(normalize(config), sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def cached_result(self, cache_dir, export_format):
+        """Copy a previous render's outputs out of the cache, or return None on a miss"""
+        meta_path = os.path.join(cache_dir, 'result.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        
+        # The OBJ names its .mtl by scene id, so a hit is served under the original scene id
+        self.scene_id = meta['scene_id']
+        files = []
+        os.makedirs(self.output_dir, exist_ok=True)
+        for extension in meta['extensions']:
+            src_file = os.path.join(cache_dir, f'enhanced_boq.{extension}')
+            if not os.path.exists(src_file):
+                return None
+            dst_file = os.path.join(self.output_dir, f'enhanced_boq_{self.scene_id}.{extension}')
+            if not os.path.exists(dst_file):
+                _fast_publish(src_file, dst_file)
+            files.append({'type': extension, 'path': dst_file})
+        renders = []
+        for view_name in meta.get('renders', []):
+            src_file = os.path.join(cache_dir, f'enhanced_boq_{view_name}.png')
+            if not os.path.exists(src_file):
+                return None
+            dst_file = os.path.join(self.output_dir, f'enhanced_boq_{self.scene_id}_{view_name}.png')
+            if not os.path.exists(dst_file):
+                _fast_publish(src_file, dst_file)
+            renders.append(dst_file)
+        
+        return {
+            'success': True,
+            'cached': True,
+            'scene_id': self.scene_id,
+            'layout_type': meta['layout_type'],
+            'style': meta['style'],
+            'files': files,
+            'renders': renders,
+            'output': '',
+            'enhanced_features': meta['enhanced_features'],
+            'quality_level': meta['quality_level'],
+            'export_format': export_format
+        }
     
-    def render_enhanced_boq_scene(self, boq_config):
-        """Render an enhanced 3D scene with furniture, landscaping, and interior details"""
+    def store_cached_result(self, cache_dir, result):
+        """Keep a copy of a successful render's exports and images for identical later requests"""
+        os.makedirs(cache_dir, exist_ok=True)
+        for file_info in result['files']:
+            _fast_publish(file_info['path'], os.path.join(cache_dir, f"enhanced_boq.{file_info['type']}"))
+        # Images are named enhanced_boq_<scene_id>_<view>.png; the cache keys them by view
+        render_prefix = f"enhanced_boq_{result['scene_id']}_"
+        view_names = []
+        for render_path in result['renders']:
+            view_name = os.path.splitext(os.path.basename(render_path))[0][len(render_prefix):]
+            _fast_publish(render_path, os.path.join(cache_dir, f'enhanced_boq_{view_name}.png'))
+            view_names.append(view_name)
+        meta = {
+            'scene_id': result['scene_id'],
+            'extensions': [file_info['type'] for file_info in result['files']],
+            'renders': view_names,
+            'layout_type': result['layout_type'],
+            'style': result['style'],
+            'enhanced_features': result['enhanced_features'],
+            'quality_level': result['quality_level']
+        }
+        with open(os.path.join(cache_dir, 'result.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    
+    def invalidate_cache(self, boq_config=None):
+        """Drop cached renders for one BOQ config (all render options), or the whole cache"""
+        if boq_config is None:
+            target = self._cache_dir
+        else:
+            target = os.path.join(self._cache_dir, self.config_hash(boq_config))
+        shutil.rmtree(target, ignore_errors=True)
+    
+    def _worker_pool(self, size=1):
+        """The renderer's warm Blender pool, grown to at least size workers"""
+        if self._pool is None:
+            self._pool = BlenderWorkerPool(self.blender_path, size, self.gpu_count)
+        else:
+            self._pool.gpu_count = self.gpu_count
+            self._pool.grow(size)
+        return self._pool
+    
+    def referenced_materials(self, layout_positions, enhanced_features):
+        """Material specs for just the keys this scene will use, with missing keys mapped to the default"""
+        needed = set(STRUCTURE_MATERIAL_KEYS)
+        for pos in layout_positions:
+            floor = pos.get('materials', {}).get('floor', 'hardwood_oak')
+            needed.add(FLOOR_MATERIAL_KEYS.get(floor, DEFAULT_FLOOR_KEY))
+            if enhanced_features.get('furniture', False):
+                needed.update(FURNITURE_MATERIAL_KEYS.get(pos['room']['type'], ()))
+        for feature, keys in FEATURE_MATERIAL_KEYS.items():
+            if enhanced_features.get(feature, False):
+                needed.update(keys)
+        
+        missing = sorted(needed.difference(MATERIAL_LIBRARY))
+        if missing:
+            print(f"⚠️ Materials not in the library, using {DEFAULT_MATERIAL_KEY}: {', '.join(missing)}")
+        default = MATERIAL_LIBRARY[DEFAULT_MATERIAL_KEY]
+        return {key: MATERIAL_LIBRARY.get(key, default) for key in sorted(needed)}
+    
+    def close(self):
+        """Stop the warm Blender processes"""
+        if self._pool is not None:
+            self._pool.close()
+    
+    def render_enhanced_boq_scene(self, boq_config, render_time_limit=0, render_resolution=None, export_format='obj',
+                                  parallel_views=False):
+        """Render an enhanced 3D scene with furniture, landscaping, and interior details
+
+        render_time_limit caps Cycles sampling per view in seconds (0 = no limit)
+        render_resolution is (width, height); defaults to 1920x1080, or 2048x1536 for 'ultra' quality
+        export_format is 'obj', 'glb' or 'usd'; the returned files list carries the matching types
+        parallel_views renders each camera angle in its own Blender process, spread over gpu_count GPUs
+        """
+        if export_format not in EXPORT_EXTENSIONS:
+            return {'success': False, 'error': f'Unsupported export format: {export_format}'}
         
+        job = self.build_job(boq_config, render_time_limit, render_resolution, export_format, parallel_views)
+        if job['cached'] is not None:
+            return job['cached']
+        return self.execute_job(job)
+    
+    def build_job(self, boq_config, render_time_limit=0, render_resolution=None, export_format='obj',
+                     parallel_views=False):
+        """Prepare the Blender settings for a BOQ config without running Blender
+
+        Returns a job for execute_job(); job['cached'] is already a full result when an
+        identical render is in the cache.
+        """
         self.scene_id = str(uuid.uuid4())
         
         rooms = boq_config.get('rooms', [])
@@ -46,6 +443,25 @@ class EnhancedBeautifulRenderer:
         print(f"Architectural style: {architectural_style}")
         print(f"Quality level: {quality_level}")
         
+        if render_resolution is None:
+            render_resolution = (2048, 1536) if quality_level == 'ultra' else (1920, 1080)
+        
+        # Identical BOQ + render options reuse the previous outputs instead of re-rendering
+        config_key = self.config_hash(boq_config)
+        options_key = self.config_hash({
+            'time_limit': render_time_limit,
+            'resolution': list(render_resolution),
+            'export_format': export_format
+        })
+        cache_dir = os.path.join(self._cache_dir, config_key, options_key)
+        cached = self.cached_result(cache_dir, export_format)
+        if cached is not None:
+            print(f"Using cached render for config {config_key}")
+            return {'cached': cached}
+        
+        # Landscaping scatter is seeded from the config so identical BOQs render identically
+        scatter_seed = int(config_key[:16], 16)
+        
         # Generate advanced layout
         layout_positions = self.layout_generator.generate_layout(rooms, building_dims)
         
@@ -56,674 +472,186 @@ class EnhancedBeautifulRenderer:
             print(f"  {room['name']}: {pos['width']:.1f}x{pos['length']:.1f} at ({pos['x']:.1f}, {pos['y']:.1f})")
             print(f"    Style: {features.get('style', 'standard')}, Pattern: {features.get('pattern', 'standard')}")
         
-        # Create enhanced Blender script with furniture, landscaping, and interior details
-        layout_json_str = json.dumps(layout_positions).replace('true', 'True').replace('false', 'False').replace('null', 'None')
-        enhanced_features_str = json.dumps(enhanced_features).replace('true', 'True').replace('false', 'False').replace('null', 'None')
+        camera_views = _camera_views(building_dims['total_width'], building_dims['total_length'],
+                                     building_dims.get('height', 12))
         
-        blender_script = f'''
-import bpy
-import bmesh
-import math
-import random
-from mathutils import Vector
-
-# Clear everything
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
-for material in bpy.data.materials:
-    bpy.data.materials.remove(material)
-
-scene = bpy.context.scene
-
-# NVIDIA GPU SETUP - Force use of RTX 4050 (Task Manager GPU 1, CUDA Device 0)
-scene.render.engine = 'CYCLES'
-prefs = bpy.context.preferences
-cprefs = prefs.addons['cycles'].preferences
-cprefs.compute_device_type = 'OPTIX'
-cprefs.get_devices()
-
-print("Configuring NVIDIA RTX 4050 for rendering...")
-nvidia_gpu_found = False
-for i, device in enumerate(cprefs.devices):
-    if device.type in ['OPTIX', 'CUDA']:
-        # Enable NVIDIA GPU (RTX 4050)
-        if "RTX 4050" in device.name or "GeForce" in device.name:
-            device.use = True
-            nvidia_gpu_found = True
-            print(f"ENABLED GPU {{i}}: {{device.name}} ({{device.type}})")
-        else:
-            device.use = False
-            print(f"DISABLED GPU {{i}}: {{device.name}} ({{device.type}})")
-    else:
-        device.use = False
-
-if nvidia_gpu_found:
-    scene.cycles.device = 'GPU'
-    print("NVIDIA RTX 4050 GPU configured for rendering")
-else:
-    scene.cycles.device = 'CPU'
-    print("WARNING: NVIDIA GPU not found, falling back to CPU")
-
-scene.cycles.samples = 1024  # Higher quality samples
-scene.cycles.use_denoising = True
-scene.cycles.denoiser = 'OPTIX'  # Use NVIDIA OptiX denoiser
-scene.cycles.use_adaptive_sampling = True
-scene.cycles.adaptive_threshold = 0.01
-
-# Enhanced render settings for professional quality
-scene.render.resolution_x = 2048
-scene.render.resolution_y = 1536
-scene.render.resolution_percentage = 100
-
-# Enable motion blur and depth of field for cinematic quality
-scene.render.use_motion_blur = True
-scene.render.motion_blur_shutter = 0.5
-
-# Ultra-premium material library with realistic textures and advanced shading
-def create_advanced_material(name, base_color, roughness=0.5, metallic=0.0, emission=None, normal_strength=0.0, subsurface=0.0, transmission=0.0, ior=1.45):
-    mat = bpy.data.materials.new(name=name)
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    nodes.clear()
-    
-    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs["Base Color"].default_value = (*base_color, 1.0)
-    bsdf.inputs["Roughness"].default_value = roughness
-    bsdf.inputs["Metallic"].default_value = metallic
-    bsdf.inputs["IOR"].default_value = ior
-    
-    # Add subsurface scattering for organic materials
-    if subsurface > 0:
-        if "Subsurface" in bsdf.inputs:
-            bsdf.inputs["Subsurface"].default_value = subsurface
-        elif "Subsurface Weight" in bsdf.inputs:
-            bsdf.inputs["Subsurface Weight"].default_value = subsurface
-            if "Subsurface Color" in bsdf.inputs:
-                bsdf.inputs["Subsurface Color"].default_value = (*base_color, 1.0)
-    
-    # Add transmission for glass materials
-    if transmission > 0:
-        if "Transmission" in bsdf.inputs:
-            bsdf.inputs["Transmission"].default_value = transmission
-        elif "Transmission Weight" in bsdf.inputs:
-            bsdf.inputs["Transmission Weight"].default_value = transmission
-    
-    # Add procedural noise for realistic surface variation
-    if normal_strength > 0:
-        noise = nodes.new(type='ShaderNodeTexNoise')
-        noise.inputs["Scale"].default_value = 15.0
-        noise.inputs["Detail"].default_value = 10.0
-        noise.inputs["Roughness"].default_value = 0.5
-        
-        bump = nodes.new(type='ShaderNodeBump')
-        bump.inputs["Strength"].default_value = normal_strength
-        
-        mat.node_tree.links.new(noise.outputs["Fac"], bump.inputs["Height"])
-        mat.node_tree.links.new(bump.outputs["Normal"], bsdf.inputs["Normal"])
-    
-    # Add color variation using ColorRamp
-    color_ramp = nodes.new(type='ShaderNodeValToRGB')
-    color_ramp.color_ramp.elements[0].color = (*base_color, 1.0)
-    variation_color = [min(1.0, c * 1.2) for c in base_color]  # Slightly brighter variation
-    color_ramp.color_ramp.elements[1].color = (*variation_color, 1.0)
-    
-    noise_color = nodes.new(type='ShaderNodeTexNoise')
-    noise_color.inputs["Scale"].default_value = 25.0
-    
-    mat.node_tree.links.new(noise_color.outputs["Fac"], color_ramp.inputs["Fac"])
-    mat.node_tree.links.new(color_ramp.outputs["Color"], bsdf.inputs["Base Color"])
-    
-    if emission:
-        # Handle emission for advanced lighting
-        try:
-            bsdf.inputs["Emission"].default_value = (*emission, 1.0)
-            bsdf.inputs["Emission Strength"].default_value = 3.0
-        except KeyError:
-            try:
-                bsdf.inputs["Emission Color"].default_value = (*emission, 1.0)
-                bsdf.inputs["Emission Strength"].default_value = 3.0
-            except KeyError:
-                emission_shader = nodes.new(type='ShaderNodeEmission')
-                emission_shader.inputs["Color"].default_value = (*emission, 1.0)
-                emission_shader.inputs["Strength"].default_value = 3.0
-                
-                add_shader = nodes.new(type='ShaderNodeAddShader')
-                mat.node_tree.links.new(bsdf.outputs["BSDF"], add_shader.inputs[0])
-                mat.node_tree.links.new(emission_shader.outputs["Emission"], add_shader.inputs[1])
-                mat.node_tree.links.new(add_shader.outputs["Shader"], output.inputs["Surface"])
-                return mat
-    
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
-    return mat
-
-# Ultra-premium material library with photorealistic quality
-materials = {{
-    # Luxury flooring materials
-    'floor_italian_marble_carrara': create_advanced_material("Carrara Italian Marble", (0.98, 0.97, 0.95), 0.02, 0.0, None, 0.3, 0.1, 0.0, 1.55),
-    'floor_nero_marquina_marble': create_advanced_material("Nero Marquina Marble", (0.08, 0.08, 0.12), 0.01, 0.0, None, 0.2, 0.05, 0.0, 1.55),
-    'floor_calacatta_gold_marble': create_advanced_material("Calacatta Gold Marble", (0.95, 0.93, 0.88), 0.03, 0.0, None, 0.4, 0.08, 0.0, 1.55),
-    'floor_brazilian_cherry': create_advanced_material("Brazilian Cherry Hardwood", (0.45, 0.15, 0.08), 0.25, 0.0, None, 0.5, 0.0, 0.0, 1.52),
-    'floor_european_oak': create_advanced_material("European Oak", (0.55, 0.35, 0.20), 0.30, 0.0, None, 0.6, 0.0, 0.0, 1.52),
-    'floor_american_walnut': create_advanced_material("American Walnut", (0.35, 0.20, 0.12), 0.20, 0.0, None, 0.4, 0.0, 0.0, 1.52),
-    'floor_porcelain_modern': create_advanced_material("Modern Porcelain", (0.92, 0.90, 0.88), 0.05, 0.0, None, 0.1, 0.0, 0.0, 1.54),
-    'floor_travertine_honed': create_advanced_material("Honed Travertine", (0.88, 0.82, 0.72), 0.35, 0.0, None, 0.7, 0.05, 0.0, 1.55),
-    'floor_concrete_polished': create_advanced_material("Polished Concrete", (0.65, 0.62, 0.60), 0.08, 0.0, None, 0.3, 0.0, 0.0, 1.52),
-    
-    # Sophisticated wall materials
-    'wall_venetian_plaster': create_advanced_material("Venetian Plaster", (0.95, 0.93, 0.90), 0.25, 0.0, None, 0.8, 0.02, 0.0, 1.45),
-    'wall_designer_paint_pearl': create_advanced_material("Designer Pearl Paint", (0.95, 0.95, 0.93), 0.15, 0.05, None, 0.2, 0.0, 0.0, 1.45),
-    'wall_designer_paint_sage': create_advanced_material("Designer Sage Paint", (0.75, 0.82, 0.70), 0.20, 0.0, None, 0.1, 0.0, 0.0, 1.45),
-    'wall_natural_stone_limestone': create_advanced_material("Natural Limestone", (0.85, 0.82, 0.75), 0.45, 0.0, None, 0.8, 0.0, 0.0, 1.55),
-    'wall_brick_handmade': create_advanced_material("Handmade Brick", (0.65, 0.35, 0.25), 0.65, 0.0, None, 1.0, 0.0, 0.0, 1.52),
-    'wall_wood_panel_walnut': create_advanced_material("Walnut Wood Panel", (0.35, 0.22, 0.15), 0.35, 0.0, None, 0.6, 0.0, 0.0, 1.52),
-    'wall_fabric_linen': create_advanced_material("Linen Wall Covering", (0.92, 0.88, 0.82), 0.85, 0.0, None, 0.9, 0.0, 0.0, 1.45),
-    
-    # Luxury furniture materials
-    'furniture_mahogany_premium': create_advanced_material("Premium Mahogany", (0.42, 0.18, 0.10), 0.25, 0.0, None, 0.5, 0.0, 0.0, 1.52),
-    'furniture_teak_aged': create_advanced_material("Aged Teak", (0.55, 0.40, 0.25), 0.30, 0.0, None, 0.6, 0.0, 0.0, 1.52),
-    'furniture_maple_birds_eye': create_advanced_material("Bird's Eye Maple", (0.85, 0.75, 0.60), 0.20, 0.0, None, 0.4, 0.0, 0.0, 1.52),
-    'furniture_leather_italian_brown': create_advanced_material("Italian Brown Leather", (0.35, 0.20, 0.12), 0.15, 0.0, None, 0.2, 0.15, 0.0, 1.46),
-    'furniture_leather_cognac': create_advanced_material("Cognac Leather", (0.55, 0.30, 0.15), 0.18, 0.0, None, 0.3, 0.12, 0.0, 1.46),
-    'furniture_fabric_cashmere': create_advanced_material("Cashmere Fabric", (0.88, 0.82, 0.75), 0.90, 0.0, None, 0.8, 0.0, 0.0, 1.45),
-    'furniture_fabric_silk': create_advanced_material("Silk Fabric", (0.45, 0.52, 0.65), 0.05, 0.02, None, 0.1, 0.0, 0.0, 1.47),
-    'furniture_fabric_velvet': create_advanced_material("Velvet Fabric", (0.25, 0.35, 0.55), 0.95, 0.0, None, 1.0, 0.0, 0.0, 1.45),
-    
-    # Premium metal finishes
-    'metal_brushed_stainless': create_advanced_material("Brushed Stainless Steel", (0.85, 0.85, 0.85), 0.15, 0.95, None, 0.2, 0.0, 0.0, 2.5),
-    'metal_brass_antique': create_advanced_material("Antique Brass", (0.75, 0.60, 0.35), 0.25, 0.85, None, 0.3, 0.0, 0.0, 2.3),
-    'metal_copper_patina': create_advanced_material("Patina Copper", (0.45, 0.65, 0.55), 0.30, 0.80, None, 0.4, 0.0, 0.0, 2.2),
-    'metal_bronze_oil_rubbed': create_advanced_material("Oil Rubbed Bronze", (0.25, 0.20, 0.15), 0.35, 0.75, None, 0.3, 0.0, 0.0, 2.4),
-    'metal_titanium_brushed': create_advanced_material("Brushed Titanium", (0.70, 0.70, 0.75), 0.10, 0.90, None, 0.1, 0.0, 0.0, 2.6),
-    
-    # Sophisticated lighting materials
-    'light_warm_led': create_advanced_material("Warm LED Light", (1.0, 0.95, 0.85), 0.0, 0.0, (1.0, 0.95, 0.85), 0.0, 0.0, 0.0, 1.0),
-    'light_cool_led': create_advanced_material("Cool LED Light", (0.90, 0.95, 1.0), 0.0, 0.0, (0.90, 0.95, 1.0), 0.0, 0.0, 0.0, 1.0),
-    'light_accent_amber': create_advanced_material("Amber Accent Light", (1.0, 0.75, 0.40), 0.0, 0.0, (1.0, 0.75, 0.40), 0.0, 0.0, 0.0, 1.0),
-    'light_crystal_chandelier': create_advanced_material("Crystal Element", (0.98, 0.98, 0.98), 0.0, 0.0, None, 0.0, 0.0, 0.95, 1.52),
-    
-    # Premium glass materials
-    'glass_ultra_clear': create_advanced_material("Ultra Clear Glass", (0.98, 0.98, 0.98), 0.0, 0.0, None, 0.0, 0.0, 0.95, 1.52),
-    'glass_low_iron': create_advanced_material("Low Iron Glass", (0.95, 0.98, 0.95), 0.0, 0.0, None, 0.0, 0.0, 0.92, 1.52),
-    'glass_frosted_luxury': create_advanced_material("Luxury Frosted Glass", (0.92, 0.92, 0.95), 0.50, 0.0, None, 0.8, 0.0, 0.60, 1.45),
-    'glass_tinted_bronze': create_advanced_material("Bronze Tinted Glass", (0.75, 0.70, 0.60), 0.0, 0.0, None, 0.0, 0.0, 0.85, 1.52),
-    
-    # Natural landscaping materials
-    'grass_premium_blend': create_advanced_material("Premium Grass Blend", (0.25, 0.55, 0.25), 0.85, 0.0, None, 0.9, 0.05, 0.0, 1.45),
-    'soil_rich_loam': create_advanced_material("Rich Loam Soil", (0.35, 0.25, 0.15), 0.95, 0.0, None, 1.0, 0.0, 0.0, 1.45),
-    'tree_bark_oak': create_advanced_material("Oak Tree Bark", (0.35, 0.25, 0.18), 0.85, 0.0, None, 1.2, 0.0, 0.0, 1.52),
-    'tree_leaves_seasonal': create_advanced_material("Seasonal Tree Leaves", (0.30, 0.60, 0.25), 0.80, 0.0, None, 0.8, 0.08, 0.0, 1.45),
-    'stone_granite_polished': create_advanced_material("Polished Granite", (0.45, 0.42, 0.40), 0.05, 0.0, None, 0.3, 0.0, 0.0, 1.55),
-    'concrete_architectural': create_advanced_material("Architectural Concrete", (0.72, 0.70, 0.68), 0.25, 0.0, None, 0.4, 0.0, 0.0, 1.52),
-    
-    # Specialty accent materials
-    'ceramic_handcrafted': create_advanced_material("Handcrafted Ceramic", (0.88, 0.85, 0.80), 0.15, 0.0, None, 0.3, 0.0, 0.0, 1.54),
-    'fabric_designer_linen': create_advanced_material("Designer Linen", (0.92, 0.88, 0.82), 0.88, 0.0, None, 0.9, 0.0, 0.0, 1.45),
-    'wood_reclaimed_barn': create_advanced_material("Reclaimed Barn Wood", (0.45, 0.35, 0.25), 0.70, 0.0, None, 1.0, 0.0, 0.0, 1.52),
-    'stone_natural_slate': create_advanced_material("Natural Slate", (0.35, 0.38, 0.42), 0.60, 0.0, None, 0.8, 0.0, 0.0, 1.55),
-}}
-
-# Enhanced features configuration
-enhanced_features = {enhanced_features_str}
-
-# Building dimensions
-total_width = {building_dims['total_width']}
-total_length = {building_dims['total_length']}
-total_height = {building_dims.get('height', 12)}
-
-# Create foundation
-bpy.ops.mesh.primitive_plane_add(size=1, location=(total_width/2, total_length/2, 0))
-foundation = bpy.context.active_object
-foundation.name = "Foundation"
-foundation.scale = (total_width/2, total_length/2, 1)
-foundation.data.materials.append(materials['floor_polished_concrete'])
-
-# Add camera for rendering
-bpy.ops.object.camera_add(location=(total_width * 1.5, -total_length * 1.2, total_height * 1.5))
-camera = bpy.context.active_object
-camera.name = "Camera"
-bpy.context.scene.camera = camera
-
-# Add light for rendering
-bpy.ops.object.light_add(type='SUN', location=(total_width/2, total_length/2, total_height * 2))
-sun = bpy.context.active_object
-sun.name = "Sun"
-sun.data.energy = 5.0
-
-# Create exterior walls
-wall_thickness = 0.3
-wall_height = 3.0
-
-walls = [
-    ("North", (total_width/2, total_length, wall_height/2), (total_width/2, wall_thickness/2, wall_height/2)),
-    ("South", (total_width/2, 0, wall_height/2), (total_width/2, wall_thickness/2, wall_height/2)),
-    ("East", (total_width, total_length/2, wall_height/2), (wall_thickness/2, total_length/2, wall_height/2)),
-    ("West", (0, total_length/2, wall_height/2), (wall_thickness/2, total_length/2, wall_height/2))
-]
-
-for name, location, scale in walls:
-    bpy.ops.mesh.primitive_cube_add(location=location)
-    wall = bpy.context.active_object
-    wall.name = f"ExteriorWall_{{name}}"
-    wall.scale = scale
-    wall.data.materials.append(materials['wall_stone_natural'])
-
-# Layout data
-layout_data = {layout_json_str}
-
-print(f"Creating {{len(layout_data)}} enhanced rooms with premium features")
-
-# Function to create furniture
-def create_furniture(room_type, room_center, room_width, room_length, style):
-    furniture_objects = []
-    
-    if room_type == 'living' and enhanced_features.get('furniture', False):
-        # Create sofa
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0], room_center[1] - room_length/4, 0.4))
-        sofa = bpy.context.active_object
-        sofa.name = "Sofa"
-        sofa.scale = (1.5, 0.4, 0.4)
-        sofa.data.materials.append(materials['furniture_fabric_beige'])
-        furniture_objects.append(sofa)
-        
-        # Create coffee table
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0], room_center[1], 0.2))
-        table = bpy.context.active_object
-        table.name = "CoffeeTable"
-        table.scale = (0.8, 0.5, 0.2)
-        table.data.materials.append(materials['furniture_wood_oak'])
-        furniture_objects.append(table)
-        
-        # Create TV stand
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0], room_center[1] + room_length/3, 0.3))
-        tv_stand = bpy.context.active_object
-        tv_stand.name = "TVStand"
-        tv_stand.scale = (1.2, 0.3, 0.3)
-        tv_stand.data.materials.append(materials['furniture_wood_walnut'])
-        furniture_objects.append(tv_stand)
-        
-    elif room_type == 'bedroom' and enhanced_features.get('furniture', False):
-        # Create bed
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0], room_center[1], 0.3))
-        bed = bpy.context.active_object
-        bed.name = "Bed"
-        bed.scale = (1.0, 1.5, 0.3)
-        bed.data.materials.append(materials['furniture_fabric_gray'])
-        furniture_objects.append(bed)
-        
-        # Create nightstands
-        for side in [-1, 1]:
-            bpy.ops.mesh.primitive_cube_add(location=(room_center[0] + side * 1.3, room_center[1], 0.25))
-            nightstand = bpy.context.active_object
-            nightstand.name = f"Nightstand_{{side}}"
-            nightstand.scale = (0.3, 0.4, 0.25)
-            nightstand.data.materials.append(materials['furniture_wood_oak'])
-            furniture_objects.append(nightstand)
-            
-        # Create wardrobe
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0] + room_width/3, room_center[1] + room_length/3, 1.0))
-        wardrobe = bpy.context.active_object
-        wardrobe.name = "Wardrobe"
-        wardrobe.scale = (0.6, 0.3, 1.0)
-        wardrobe.data.materials.append(materials['furniture_wood_walnut'])
-        furniture_objects.append(wardrobe)
-        
-    elif room_type == 'kitchen' and enhanced_features.get('furniture', False):
-        # Create kitchen island
-        bpy.ops.mesh.primitive_cube_add(location=(room_center[0], room_center[1], 0.45))
-        island = bpy.context.active_object
-        island.name = "KitchenIsland"
-        island.scale = (1.0, 0.6, 0.45)
-        island.data.materials.append(materials['floor_marble_carrara'])
-        furniture_objects.append(island)
-        
-        # Create cabinets
-        for i in range(3):
-            bpy.ops.mesh.primitive_cube_add(location=(room_center[0] - room_width/3 + i*0.8, room_center[1] + room_length/3, 0.4))
-            cabinet = bpy.context.active_object
-            cabinet.name = f"Cabinet_{{i}}"
-            cabinet.scale = (0.35, 0.3, 0.4)
-            cabinet.data.materials.append(materials['furniture_wood_oak'])
-            furniture_objects.append(cabinet)
-    
-    return furniture_objects
+        # Settings for the static scene script, written to JSON next to its outputs
+        scene_config = {
+            'scene_id': self.scene_id,
+            'output_dir': Path(self.temp_dir).as_posix(),
+            'layout': layout_positions,
+            'room_boxes': _room_boxes(layout_positions),
+            'enhanced_features': enhanced_features,
+            'material_specs': self.referenced_materials(layout_positions, enhanced_features),
+            'material_library_path': Path(os.path.abspath(self.material_library)).as_posix(),
+            'tree_positions': _tree_positions(building_dims['total_width'], building_dims['total_length'], scatter_seed),
+            'building': {
+                'width': building_dims['total_width'],
+                'length': building_dims['total_length'],
+                'height': building_dims.get('height', 12)
+            },
+            'export_format': export_format,
+            'export_extensions': [*EXPORT_EXTENSIONS[export_format], 'blend'],
+            'hdri_path': boq_config.get('hdri_path'),
+            'animate': bool(boq_config.get('animate', False)),
+            'light_paths': LIGHT_PATHS.get(quality_level, LIGHT_PATHS['default']),
+            'time_limit': float(render_time_limit),
+            'resolution': [int(render_resolution[0]), int(render_resolution[1])],
+            'camera_views': camera_views,
+            'view_samples': VIEW_SAMPLES,
+            'render_views_in_script': not parallel_views
+        }
 
-# Function to create interior details
-def create_interior_details(room_type, room_center, room_width, room_length):
-    detail_objects = []
-    
-    if enhanced_features.get('interiorDetails', False):
-        # Create ceiling light
-        bpy.ops.mesh.primitive_uv_sphere_add(location=(room_center[0], room_center[1], 2.8))
-        light_fixture = bpy.context.active_object
-        light_fixture.name = f"CeilingLight_{{room_type}}"
-        light_fixture.scale = (0.2, 0.2, 0.1)
-        light_fixture.data.materials.append(materials['light_emission_warm'])
-        detail_objects.append(light_fixture)
+        # Get layout info from first room
+        layout_type = 'enhanced'
+        style = architectural_style
+        if layout_positions and len(layout_positions) > 0:
+            features = layout_positions[0].get('architectural_features', {})
+            layout_type = features.get('pattern', 'enhanced')
+            style = features.get('style', architectural_style)
         
-        # Create baseboard
-        for wall in ['north', 'south', 'east', 'west']:
-            if wall == 'north':
-                location = (room_center[0], room_center[1] + room_length/2, 0.1)
-                scale = (room_width/2, 0.05, 0.1)
-            elif wall == 'south':
-                location = (room_center[0], room_center[1] - room_length/2, 0.1)
-                scale = (room_width/2, 0.05, 0.1)
-            elif wall == 'east':
-                location = (room_center[0] + room_width/2, room_center[1], 0.1)
-                scale = (0.05, room_length/2, 0.1)
-            elif wall == 'west':
-                location = (room_center[0] - room_width/2, room_center[1], 0.1)
-                scale = (0.05, room_length/2, 0.1)
-            
-            bpy.ops.mesh.primitive_cube_add(location=location)
-            baseboard = bpy.context.active_object
-            baseboard.name = f"Baseboard_{{wall}}"
-            baseboard.scale = scale
-            baseboard.data.materials.append(materials['furniture_wood_oak'])
-            detail_objects.append(baseboard)
-    
-    return detail_objects
-
-# Function to create landscaping
-def create_landscaping():
-    landscaping_objects = []
+        return {
+            'cached': None,
+            'scene_config': scene_config,
+            'scene_id': self.scene_id,
+            'temp_dir': self.temp_dir,
+            'cache_dir': cache_dir,
+            'layout_type': layout_type,
+            'style': style,
+            'enhanced_features': enhanced_features,
+            'quality_level': quality_level,
+            'export_format': export_format,
+            'camera_views': camera_views if parallel_views else None
+        }
     
-    if enhanced_features.get('landscaping', False):
-        # Create grass areas around the building
-        grass_margin = 5
+    def _render_view(self, job, index, view):
+        """Render one camera angle from the job's saved .blend in a separate Blender process"""
+        view_name = view[0]
+        scene_id = job['scene_id']
+        render_path = os.path.join(job['temp_dir'], f'enhanced_boq_{scene_id}_{view_name}.png')
+        # Pin each view to its own GPU when more than one is available
+        env = dict(os.environ, CUDA_VISIBLE_DEVICES=str(index % max(self.gpu_count, 1)))
+        blend_path = os.path.join(job['temp_dir'], f'enhanced_boq_{scene_id}.blend')
+        result = subprocess.run([
+            self.blender_path,
+            '--factory-startup',
+            '--background', blend_path,
+            '--python-exit-code', '1',
+            '--python', VIEW_SCRIPT_PATH, '--',
+            '--camera', f'Camera_{view_name}',
+            '--output', Path(render_path).as_posix(),
+            '--samples', str(VIEW_SAMPLES.get(view_name, 0))
+        ], capture_output=True, text=True, timeout=300, env=env)
         
-        # Front yard
-        bpy.ops.mesh.primitive_plane_add(location=(total_width/2, -grass_margin/2, 0.01))
-        front_yard = bpy.context.active_object
-        front_yard.name = "FrontYard"
-        front_yard.scale = (total_width/2 + grass_margin, grass_margin/2, 1)
-        front_yard.data.materials.append(materials['grass_green'])
-        landscaping_objects.append(front_yard)
+        if result.returncode != 0 or not os.path.exists(render_path):
+            print(f"View {view_name} failed:", result.stdout[-2000:], result.stderr[-2000:])
+            return None
+        return render_path
+    
+    def _render_views_parallel(self, job):
+        """Fan the camera angles out to concurrent Blender processes"""
+        views = job['camera_views']
+        # Threads only wait on the Blender subprocesses, so a thread pool is enough
+        with ThreadPoolExecutor(max_workers=len(views)) as executor:
+            renders = executor.map(lambda iv: self._render_view(job, *iv), enumerate(views))
+            return [path for path in renders if path]
+    
+    def execute_job(self, job):
+        """Run a job from build_job() in Blender and collect its output files"""
+        scene_id = job['scene_id']
         
-        # Back yard
-        bpy.ops.mesh.primitive_plane_add(location=(total_width/2, total_length + grass_margin/2, 0.01))
-        back_yard = bpy.context.active_object
-        back_yard.name = "BackYard"
-        back_yard.scale = (total_width/2 + grass_margin, grass_margin/2, 1)
-        back_yard.data.materials.append(materials['grass_green'])
-        landscaping_objects.append(back_yard)
+        # Outputs and the material library both live here, and Blender writes the library itself
+        os.makedirs(self.output_dir, exist_ok=True)
         
-        # Create trees
-        for i in range(4):
-            tree_x = random.uniform(-grass_margin, total_width + grass_margin)
-            tree_y = random.uniform(-grass_margin, total_length + grass_margin)
-            
-            # Avoid placing trees too close to building
-            if not (0 <= tree_x <= total_width and 0 <= tree_y <= total_length):
-                # Tree trunk
-                bpy.ops.mesh.primitive_cylinder_add(location=(tree_x, tree_y, 1.5))
-                trunk = bpy.context.active_object
-                trunk.name = f"TreeTrunk_{{i}}"
-                trunk.scale = (0.2, 0.2, 1.5)
-                trunk.data.materials.append(materials['tree_bark'])
-                landscaping_objects.append(trunk)
-                
-                # Tree foliage
-                bpy.ops.mesh.primitive_uv_sphere_add(location=(tree_x, tree_y, 2.5))
-                foliage = bpy.context.active_object
-                foliage.name = f"TreeFoliage_{{i}}"
-                foliage.scale = (1.0, 1.0, 0.8)
-                foliage.data.materials.append(materials['tree_leaves'])
-                landscaping_objects.append(foliage)
+        # Only the settings are written per render; the scene script itself is static
+        config_path = os.path.join(job['temp_dir'], f'enhanced_boq_{scene_id}.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(job['scene_config'], f)
         
-        # Create pathway
-        bpy.ops.mesh.primitive_cube_add(location=(total_width/2, -2, 0.02))
-        pathway = bpy.context.active_object
-        pathway.name = "Pathway"
-        pathway.scale = (1.0, 2, 0.02)
-        pathway.data.materials.append(materials['concrete_path'])
-        landscaping_objects.append(pathway)
-    
-    return landscaping_objects
-
-# Create enhanced rooms with premium features
-all_furniture = []
-all_details = []
-
-for i, room_data in enumerate(layout_data):
-    room_info = room_data['room']
-    room_name = room_info['name']
-    room_type = room_info['type']
-    
-    x = room_data['x']
-    y = room_data['y']
-    width = room_data['width']
-    length = room_data['length']
-    height = room_info.get('height', 3.0)
-    rotation = room_data.get('rotation', 0)
-    
-    features = room_data.get('architectural_features', {{}})
-    materials_config = room_data.get('materials', {{}})
-    
-    print(f"Creating enhanced {{room_name}} ({{room_type}}) - {{features.get('style', 'standard')}} style")
-    
-    # Room floor
-    bpy.ops.mesh.primitive_cube_add(location=(x, y, 0.05))
-    floor = bpy.context.active_object
-    floor.name = f"Floor_{{room_name.replace(' ', '_')}}"
-    floor.scale = (width/2, length/2, 0.05)
-    
-    # Apply premium flooring material
-    floor_material = materials_config.get('floor', 'hardwood_oak')
-    if floor_material == 'hardwood_oak':
-        floor.data.materials.append(materials['floor_hardwood_oak'])
-    elif floor_material == 'marble':
-        floor.data.materials.append(materials['floor_marble_carrara'])
-    elif floor_material == 'ceramic':
-        floor.data.materials.append(materials['floor_ceramic_modern'])
-    else:
-        floor.data.materials.append(materials['floor_hardwood_oak'])
-    
-    # Room walls
-    wall_height = height / 2
-    wall_thickness = 0.1
-    
-    # North wall
-    bpy.ops.mesh.primitive_cube_add(location=(x, y + length/2, wall_height))
-    north_wall = bpy.context.active_object
-    north_wall.name = f"NorthWall_{{room_name.replace(' ', '_')}}"
-    north_wall.scale = (width/2, wall_thickness/2, wall_height)
-    north_wall.data.materials.append(materials['wall_paint_white'])
-    
-    # South wall
-    bpy.ops.mesh.primitive_cube_add(location=(x, y - length/2, wall_height))
-    south_wall = bpy.context.active_object
-    south_wall.name = f"SouthWall_{{room_name.replace(' ', '_')}}"
-    south_wall.scale = (width/2, wall_thickness/2, wall_height)
-    south_wall.data.materials.append(materials['wall_paint_white'])
-    
-    # East wall
-    bpy.ops.mesh.primitive_cube_add(location=(x + width/2, y, wall_height))
-    east_wall = bpy.context.active_object
-    east_wall.name = f"EastWall_{{room_name.replace(' ', '_')}}"
-    east_wall.scale = (wall_thickness/2, length/2, wall_height)
-    east_wall.data.materials.append(materials['wall_paint_white'])
-    
-    # West wall
-    bpy.ops.mesh.primitive_cube_add(location=(x - width/2, y, wall_height))
-    west_wall = bpy.context.active_object
-    west_wall.name = f"WestWall_{{room_name.replace(' ', '_')}}"
-    west_wall.scale = (wall_thickness/2, length/2, wall_height)
-    west_wall.data.materials.append(materials['wall_paint_white'])
-    
-    # Create furniture for this room
-    room_center = (x, y, 0)
-    furniture = create_furniture(room_type, room_center, width, length, features.get('style', 'modern'))
-    all_furniture.extend(furniture)
-    
-    # Create interior details
-    details = create_interior_details(room_type, room_center, width, length)
-    all_details.extend(details)
-
-# Create landscaping
-landscaping = create_landscaping()
-
-# Enhanced lighting setup
-if enhanced_features.get('lighting', False):
-    # Create professional lighting
-    
-    # Key light (main illumination)
-    bpy.ops.object.light_add(type='SUN', location=(total_width + 10, total_length + 10, 15))
-    key_light = bpy.context.active_object
-    key_light.name = "KeyLight"
-    key_light.data.energy = 5.0
-    key_light.data.color = (1.0, 0.95, 0.8)
-    key_light.rotation_euler = (math.radians(45), 0, math.radians(45))
-    
-    # Fill light (softer illumination)
-    bpy.ops.object.light_add(type='SUN', location=(-10, -10, 12))
-    fill_light = bpy.context.active_object
-    fill_light.name = "FillLight"
-    fill_light.data.energy = 2.0
-    fill_light.data.color = (0.8, 0.9, 1.0)
-    fill_light.rotation_euler = (math.radians(30), 0, math.radians(-45))
-    
-    # Rim light (edge definition)
-    bpy.ops.object.light_add(type='SUN', location=(total_width - 5, total_length - 5, 20))
-    rim_light = bpy.context.active_object
-    rim_light.name = "RimLight"
-    rim_light.data.energy = 3.0
-    rim_light.data.color = (1.0, 0.9, 0.7)
-    rim_light.rotation_euler = (math.radians(60), 0, math.radians(135))
-
-# Camera setup for architectural photography
-bpy.ops.object.camera_add(location=(total_width + 15, total_length + 15, 8))
-camera = bpy.context.active_object
-camera.name = "ArchitecturalCamera"
-camera.rotation_euler = (math.radians(65), 0, math.radians(45))
-camera.data.lens = 35
-camera.data.dof.use_dof = True
-camera.data.dof.focus_distance = 20
-camera.data.dof.aperture_fstop = 5.6
-
-# Set as active camera
-scene.camera = camera
-
-# Export settings
-bpy.ops.wm.obj_export(
-    filepath="{os.path.join(self.temp_dir, f'enhanced_boq_{self.scene_id}.obj').replace(os.sep, '/')}",
-    export_selected_objects=False,
-    export_materials=True,
-    export_triangulated_mesh=True,
-    export_smooth_groups=True,
-    export_normals=True,
-    export_uv=True,
-    export_colors=True
-)
-
-# Save blend file
-bpy.ops.wm.save_as_mainfile(filepath="{os.path.join(self.temp_dir, f'enhanced_boq_{self.scene_id}.blend').replace(os.sep, '/')}")
-
-# RENDER IMAGES WITH GPU (This will actually use the GPU)
-print("🎨 Starting GPU rendering...")
-
-# Set up rendering
-scene.render.resolution_x = 1920
-scene.render.resolution_y = 1080
-scene.render.resolution_percentage = 100
-scene.render.filepath = "{os.path.join(self.temp_dir, f'enhanced_boq_{self.scene_id}_render').replace(os.sep, '/')}"
-scene.render.image_settings.file_format = 'PNG'
-
-# Multiple camera angles for better visualization
-camera_positions = [
-    ("hero", (total_width * 1.5, -total_length * 1.2, total_height * 1.5), (total_width/2, total_length/2, total_height/3)),
-    ("detail", (total_width * 0.8, total_length * 0.3, total_height * 0.8), (total_width/2, total_length/2, total_height/4)),
-    ("plan", (total_width/2, total_length/2, total_height * 3), (total_width/2, total_length/2, 0))
-]
-
-render_files = []
-for view_name, cam_loc, cam_target in camera_positions:
-    print(f"📸 Rendering " + view_name + " view with GPU...")
-    
-    # Position camera
-    camera = bpy.data.objects['Camera']
-    camera.location = cam_loc
-    
-    # Point camera at target
-    direction = Vector(cam_target) - Vector(cam_loc)
-    camera.rotation_euler = direction.to_track_quat('-Z', 'Y').to_euler()
-    
-    # Set render filename  
-    render_path = r"{self.temp_dir.replace(os.sep, '/')}/enhanced_boq_{self.scene_id}_" + view_name + ".png"
-    scene.render.filepath = render_path
-    
-    # RENDER (This actually uses the GPU!)
-    bpy.ops.render.render(write_still=True)
-    render_files.append(render_path)
-    print("RENDER_PNG: " + render_path)
-
-print("🔥 GPU rendering complete!")
-print("ENHANCED BOQ RENDERING COMPLETE")
-print(f"Scene ID: {self.scene_id}")
-print(f"Objects: {{len(bpy.data.objects)}}")
-print(f"Materials: {{len(bpy.data.materials)}}")
-print(f"Furniture pieces: {{len(all_furniture)}}")
-print(f"Interior details: {{len(all_details)}}")
-print(f"Landscaping elements: {{len(landscaping)}}")
-print(f"Render files: {{len(render_files)}}")
-'''
-
-        # Write the Blender script
-        script_path = os.path.join(self.temp_dir, f'enhanced_boq_{self.scene_id}.py')
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(blender_script)
+        print(f"Enhanced scene settings written to: {config_path}")
         
-        print(f"Enhanced Blender script written to: {script_path}")
+        # Publish exported files as soon as Blender announces them, while the views still render
+        files = []
+        renders = []
+        def on_line(line):
+            marker, _, value = line.partition(': ')
+            if marker == 'EXPORT_FILE':
+                src_file = value.strip()
+                if os.path.exists(src_file):
+                    dst_file = os.path.join(self.output_dir, os.path.basename(src_file))
+                    _fast_publish(src_file, dst_file)
+                    files.append({'type': src_file.rsplit('.', 1)[-1], 'path': dst_file})
+            elif marker == 'RENDER_PNG':
+                renders.append(value.strip())
         
-        # Run Blender with the script
+        # Run the script in a warm Blender from the pool
+        log_path = os.path.join(job['temp_dir'], f'enhanced_boq_{scene_id}.log')
         try:
-            result = subprocess.run([
-                self.blender_path, 
-                '--background',
-                '--python', script_path
-            ], capture_output=True, text=True, timeout=300)
+            ok, output = self._worker_pool().run([SCENE_SCRIPT_PATH, '--', '--config', config_path], log_path, on_line)
             
-            print("Blender render output:", result.stdout)
-            if result.stderr:
-                print("Blender warnings:", result.stderr)
+            print("Blender render output:", output)
             
-            if result.returncode != 0:
-                return {'success': False, 'error': f'Blender failed with code {result.returncode}'}
+            if not ok:
+                return {'success': False, 'error': 'Blender script failed', 'log_file': log_path}
                 
         except Exception as e:
-            return {'success': False, 'error': str(e)}
-        
-        # Copy files
-        files = []
-        output_dir = os.path.join(os.path.dirname(__file__), 'backend', 'generated_models')
-        os.makedirs(output_dir, exist_ok=True)
+            return {'success': False, 'error': str(e), 'log_file': log_path}
         
-        for extension in ['obj', 'mtl', 'blend']:
-            src_file = os.path.join(self.temp_dir, f'enhanced_boq_{self.scene_id}.{extension}')
-            if os.path.exists(src_file):
-                dst_file = os.path.join(output_dir, f'enhanced_boq_{self.scene_id}.{extension}')
-                shutil.copy2(src_file, dst_file)
-                files.append({'type': extension, 'path': dst_file})
+        if job['camera_views']:
+            renders = self._render_views_parallel(job)
         
-        # Get layout info from first room
-        layout_type = 'enhanced'
-        style = architectural_style
-        if layout_positions and len(layout_positions) > 0:
-            features = layout_positions[0].get('architectural_features', {})
-            layout_type = features.get('pattern', 'enhanced')
-            style = features.get('style', architectural_style)
-        
-        return {
+        result = {
             'success': True,
-            'scene_id': self.scene_id,
-            'layout_type': layout_type,
-            'style': style,
+            'scene_id': scene_id,
+            'layout_type': job['layout_type'],
+            'style': job['style'],
             'files': files,
-            'output': result.stdout,
-            'enhanced_features': enhanced_features,
-            'quality_level': quality_level
+            'renders': renders,
+            'output': output,
+            'log_file': log_path,
+            'enhanced_features': job['enhanced_features'],
+            'quality_level': job['quality_level'],
+            'export_format': job['export_format']
         }
+        if files:
+            self.store_cached_result(job['cache_dir'], result)
+        return result
+    
+    def render_batch(self, boq_configs, max_workers=2, gpu_count=None, **render_options):
+        """Render several BOQ configs concurrently on the renderer's warm Blender pool
+
+        Jobs are prepared here; pool workers only execute them. Worker i is pinned to GPU
+        i % gpu_count, so on a single GPU the CPU scene build of one job overlaps the
+        GPU render of another. Identical configs render once and the repeats are served
+        from the cache. Results come back in config order.
+        """
+        if gpu_count is not None:
+            self.gpu_count = gpu_count
+        jobs = [self.build_job(config, **render_options) for config in boq_configs]
+        results = [job['cached'] for job in jobs]
+        # First job per cache entry renders; its repeats in the batch wait for that render
+        first_jobs = {}
+        for i, job in enumerate(jobs):
+            if job['cached'] is None:
+                first_jobs.setdefault(job['cache_dir'], i)
+        if not first_jobs:
+            return results
+        
+        # Threads only wait on the Blender workers, and the workers outlive the batch
+        self._worker_pool(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {i: executor.submit(self.execute_job, jobs[i]) for i in first_jobs.values()}
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = {'success': False, 'error': str(e)}
+        
+        for i, job in enumerate(jobs):
+            if results[i] is None:
+                first_result = results[first_jobs[job['cache_dir']]]
+                results[i] = self.cached_result(job['cache_dir'], job['export_format']) or first_result
+        return results
 
 if __name__ == "__main__":
     import sys
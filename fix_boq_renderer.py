@@ -3,18 +3,25 @@
 Quick fix for the BOQ renderer - remove duplicate layout code
 """
 
-import re
+START_TAG = "# Room creation starts here"
+KEEP_END = "current_y = wall_thickness\ninternal_wall_thickness = 0.2\n"
+END_TAG = "for i, room in enumerate(rooms):"
 
 # Read the current file
 with open('boq_renderer.py', 'r') as f:
     content = f.read()
 
 # Find and remove the duplicate layout code section
-# The duplicate starts after "# Room creation starts here" and before "for i, room in enumerate(rooms):"
-pattern = r'(# Room creation starts here.*?current_y = wall_thickness\ninternal_wall_thickness = 0\.2\n)(.*?)(for i, room in enumerate\(rooms\):)'
-replacement = r'\1\3'
+# The duplicate starts after "# Room creation starts here" and before "for i, room in enumerate(rooms):".
+# Plain partitions keep this a single linear scan; the file is left alone if any marker is missing.
+before, found_start, rest = content.partition(START_TAG)
+head, found_keep, tail = rest.partition(KEEP_END)
+_, found_end, after = tail.partition(END_TAG)
 
-new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+if found_start and found_keep and found_end:
+    new_content = before + START_TAG + head + KEEP_END + END_TAG + after
+else:
+    new_content = content
 
 # Write back
 with open('boq_renderer.py', 'w') as f:
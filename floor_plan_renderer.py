@@ -9,8 +9,12 @@ import tempfile
 import uuid
 import json
 import shutil
+import hashlib
 import math
 import random
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
 # Force NVIDIA GPU usage
 os.environ['CUDA_VISIBLE_DEVICES'] = '0'
@@ -18,406 +22,422 @@ os.environ['BLENDER_CUDA_DEVICE'] = '0'
 os.environ['NVIDIA_VISIBLE_DEVICES'] = '0'
 
 from advanced_layout_generator import AdvancedLayoutGenerator
+from blender_worker_pool import BlenderWorkerPool
 
-class FloorPlanRenderer:
-    """3D Floor Plan Renderer with interior details and colorful materials"""
-    
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix='constructai_floorplan_')
-        self.blender_path = 'D:\\blender\\blender.exe'
-        self.scene_id = None
-        self.layout_generator = AdvancedLayoutGenerator()
-    
-    def render_floor_plan(self, boq_config):
-        """Render a 3D floor plan with interior details and no ceiling"""
-        
-        self.scene_id = str(uuid.uuid4())
-        
-        rooms = boq_config.get('rooms', [])
-        building_dims = boq_config.get('building_dimensions', {"total_width": 40, "total_length": 30, "height": 12})
-        enhanced_features = boq_config.get('enhanced_features', {})
-        architectural_style = boq_config.get('architectural_style', 'modern')
-        quality_level = boq_config.get('quality_level', 'professional')
-        
-        print(f"Creating 3D floor plan: {self.scene_id}")
-        print(f"Rooms to generate: {len(rooms)}")
-        print(f"Building dimensions: {building_dims}")
-        print(f"Style: {architectural_style}")
-        
-        # Generate advanced layout
-        layout_positions = self.layout_generator.generate_layout(rooms, building_dims)
-        
-        # Create floor plan Blender script
-        blender_script = f'''
-import bpy
-import bmesh
-import math
-import random
-from mathutils import Vector
+# Static Blender script that builds and renders the plan from a JSON settings file
+FLOOR_PLAN_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blender_templates', 'render_floor_plan.py')
 
-# Clear everything
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
-for material in bpy.data.materials:
-    bpy.data.materials.remove(material)
+# Floor plan proportions; walls are kept low so the top-down view sees into every room
+INTERIOR_WALL_HEIGHT = 2.5
+INTERIOR_WALL_THICKNESS = 0.2
+EXTERIOR_WALL_HEIGHT = 3.0
+EXTERIOR_WALL_THICKNESS = 0.3
 
-scene = bpy.context.scene
+FLOOR_MATERIAL_KEYS = {
+    'kitchen': 'kitchen_floor',
+    'living': 'living_room_floor',
+    'bedroom': 'bedroom_floor',
+    'bathroom': 'bathroom_floor',
+}
+DEFAULT_FLOOR_KEY = 'living_room_floor'
 
-# GPU setup for high-quality rendering
-scene.render.engine = 'CYCLES'
-prefs = bpy.context.preferences
-cprefs = prefs.addons['cycles'].preferences
-cprefs.compute_device_type = 'OPTIX'
-cprefs.get_devices()
+# Colorful architectural materials, key -> (name, base color)
+FLOOR_PLAN_MATERIALS = {
+    'living_room_floor': ("Living Room Floor", (0.8, 0.6, 0.4)),  # Warm wood
+    'kitchen_floor': ("Kitchen Floor", (0.9, 0.9, 0.85)),  # Light tile
+    'bedroom_floor': ("Bedroom Floor", (0.7, 0.5, 0.3)),  # Dark wood
+    'bathroom_floor': ("Bathroom Floor", (0.85, 0.9, 0.95)),  # Light blue tile
+    'exterior_wall': ("Exterior Wall", (0.6, 0.6, 0.6)),  # Gray
+    'interior_wall': ("Interior Wall", (0.95, 0.95, 0.95)),  # White
+    'kitchen_cabinet': ("Kitchen Cabinet", (0.4, 0.2, 0.1)),  # Dark wood
+    'kitchen_counter': ("Kitchen Counter", (0.2, 0.2, 0.25)),  # Dark granite
+    'bathroom_fixture': ("Bathroom Fixture", (1.0, 1.0, 1.0)),  # White
+    'bedroom_furniture': ("Bedroom Furniture", (0.5, 0.3, 0.2)),  # Medium wood
+    'living_furniture': ("Living Furniture", (0.3, 0.4, 0.6)),  # Blue fabric
+    'door': ("Door", (0.6, 0.4, 0.2)),  # Wood door
+    'window': ("Window", (0.8, 0.9, 1.0)),  # Light blue glass
+}
 
-print("Configuring GPU for floor plan rendering...")
-for i, device in enumerate(cprefs.devices):
-    if device.type in ['OPTIX', 'CUDA']:
-        device.use = True
-        print(f"ENABLED GPU {{i}}: {{device.name}} ({{device.type}})")
-    else:
-        device.use = False
+# Output files kept per cached render, result key -> extension
+CACHED_OUTPUTS = {'blend_file': 'blend', 'obj_file': 'obj', 'mtl_file': 'mtl', 'render_png': 'png'}
 
-scene.cycles.device = 'GPU'
-scene.cycles.samples = 128  # Good quality for floor plans
-scene.cycles.use_denoising = True
-scene.cycles.denoiser = 'OPTIX'
-scene.render.resolution_x = 1920
-scene.render.resolution_y = 1080
+# "MARKER: value" lines the script prints for the caller
+FLOOR_PLAN_MARKERS = {'BLEND_FILE', 'OBJ_FILE', 'MTL_FILE', 'RENDER_PNG', 'SCENE_ID', 'LAYOUT_TYPE', 'STYLE', 'QUALITY_LEVEL'}
 
-# Colorful floor plan materials
-def create_floor_plan_material(name, base_color, roughness=0.8, metallic=0.0, emission=0.0):
-    mat = bpy.data.materials.new(name=name)
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    nodes.clear()
-    
-    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-    bsdf.inputs["Base Color"].default_value = (*base_color, 1.0)
-    bsdf.inputs["Roughness"].default_value = roughness
-    bsdf.inputs["Metallic"].default_value = metallic
-    if emission > 0:
-        bsdf.inputs["Emission"].default_value = (*base_color, 1.0)
-        bsdf.inputs["Emission Strength"].default_value = emission
-    
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    mat.node_tree.links.new(bsdf.outputs["BSDF"], output.inputs["Surface"])
-    return mat
+# Unit shapes scaled by the plan's half-extents, shared by the Blender script and the OBJ writer
+BOX_CORNERS = [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]
+BOX_FACES = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+PLANE_CORNERS = [(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0)]
+PLANE_FACES = [(0, 1, 2, 3)]
 
-# Create colorful architectural materials
-materials = {{
-    'living_room_floor': create_floor_plan_material("Living Room Floor", (0.8, 0.6, 0.4)),  # Warm wood
-    'kitchen_floor': create_floor_plan_material("Kitchen Floor", (0.9, 0.9, 0.85)),  # Light tile
-    'bedroom_floor': create_floor_plan_material("Bedroom Floor", (0.7, 0.5, 0.3)),  # Dark wood
-    'bathroom_floor': create_floor_plan_material("Bathroom Floor", (0.85, 0.9, 0.95)),  # Light blue tile
-    'exterior_wall': create_floor_plan_material("Exterior Wall", (0.6, 0.6, 0.6)),  # Gray
-    'interior_wall': create_floor_plan_material("Interior Wall", (0.95, 0.95, 0.95)),  # White
-    'kitchen_cabinet': create_floor_plan_material("Kitchen Cabinet", (0.4, 0.2, 0.1)),  # Dark wood
-    'kitchen_counter': create_floor_plan_material("Kitchen Counter", (0.2, 0.2, 0.25)),  # Dark granite
-    'bathroom_fixture': create_floor_plan_material("Bathroom Fixture", (1.0, 1.0, 1.0)),  # White
-    'bedroom_furniture': create_floor_plan_material("Bedroom Furniture", (0.5, 0.3, 0.2)),  # Medium wood
-    'living_furniture': create_floor_plan_material("Living Furniture", (0.3, 0.4, 0.6)),  # Blue fabric
-    'door': create_floor_plan_material("Door", (0.6, 0.4, 0.2)),  # Wood door
-    'window': create_floor_plan_material("Window", (0.8, 0.9, 1.0)),  # Light blue glass
-}}
-
-def create_floor_plan_furniture(room_type, x, y, width, length, height):
-    """Create simplified furniture for floor plan view"""
-    furniture = []
-    
+def _furniture_boxes(room_type, x, y, width, length):
+    """(center, full size, material key) of the simplified furniture for one room"""
     if room_type == 'kitchen':
-        # Kitchen cabinets along walls
-        cabinet_positions = [
-            (x - width/2 + 0.3, y - length/2 + 0.3, 0.45, width - 0.6, 0.6, 0.9),  # Lower cabinets
-            (x - width/2 + 0.3, y + length/2 - 0.3, 0.45, width - 0.6, 0.6, 0.9),  # Upper cabinets
+        items = [
+            ((x - width/2 + 0.3, y - length/2 + 0.3, 0.45), (width - 0.6, 0.6, 0.9), 'kitchen_cabinet'),  # Lower cabinets
+            ((x - width/2 + 0.3, y + length/2 - 0.3, 0.45), (width - 0.6, 0.6, 0.9), 'kitchen_cabinet'),  # Upper cabinets
         ]
-        
-        for i, (cx, cy, cz, cw, cl, ch) in enumerate(cabinet_positions):
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(cx, cy, cz))
-            cabinet = bpy.context.active_object
-            cabinet.name = f"KitchenCabinet_{{i}}"
-            cabinet.scale = (cw, cl, ch)
-            cabinet.data.materials.append(materials['kitchen_cabinet'])
-            furniture.append(cabinet)
-        
-        # Kitchen island
         if width > 4 and length > 4:
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(x, y, 0.45))
-            island = bpy.context.active_object
-            island.name = "KitchenIsland"
-            island.scale = (2.0, 1.0, 0.9)
-            island.data.materials.append(materials['kitchen_counter'])
-            furniture.append(island)
-    
-    elif room_type == 'living':
-        # Living room furniture
-        furniture_items = [
-            (x, y - length/4, 0.4, 2.2, 0.8, 0.8, 'living_furniture'),  # Sofa
-            (x, y + length/4, 0.25, 1.2, 0.6, 0.5, 'living_furniture'),  # Coffee table
-            (x - width/3, y - length/3, 0.4, 0.8, 0.8, 0.8, 'living_furniture'),  # Chair 1
-            (x + width/3, y - length/3, 0.4, 0.8, 0.8, 0.8, 'living_furniture'),  # Chair 2
+            items.append(((x, y, 0.45), (2.0, 1.0, 0.9), 'kitchen_counter'))  # Island
+        return items
+    if room_type == 'living':
+        return [
+            ((x, y - length/4, 0.4), (2.2, 0.8, 0.8), 'living_furniture'),  # Sofa
+            ((x, y + length/4, 0.25), (1.2, 0.6, 0.5), 'living_furniture'),  # Coffee table
+            ((x - width/3, y - length/3, 0.4), (0.8, 0.8, 0.8), 'living_furniture'),  # Chair 1
+            ((x + width/3, y - length/3, 0.4), (0.8, 0.8, 0.8), 'living_furniture'),  # Chair 2
         ]
-        
-        for i, (fx, fy, fz, fw, fl, fh, mat_name) in enumerate(furniture_items):
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(fx, fy, fz))
-            furn = bpy.context.active_object
-            furn.name = f"LivingFurniture_{{i}}"
-            furn.scale = (fw, fl, fh)
-            furn.data.materials.append(materials[mat_name])
-            furniture.append(furn)
-    
-    elif room_type == 'bedroom':
-        # Bedroom furniture
-        furniture_items = [
-            (x, y - length/4, 0.3, 2.0, 1.8, 0.6, 'bedroom_furniture'),  # Bed
-            (x - width/2 + 0.5, y + length/3, 0.4, 0.8, 0.6, 0.8, 'bedroom_furniture'),  # Dresser
-            (x + width/2 - 0.5, y + length/3, 1.0, 0.8, 0.6, 2.0, 'bedroom_furniture'),  # Wardrobe
+    if room_type == 'bedroom':
+        return [
+            ((x, y - length/4, 0.3), (2.0, 1.8, 0.6), 'bedroom_furniture'),  # Bed
+            ((x - width/2 + 0.5, y + length/3, 0.4), (0.8, 0.6, 0.8), 'bedroom_furniture'),  # Dresser
+            ((x + width/2 - 0.5, y + length/3, 1.0), (0.8, 0.6, 2.0), 'bedroom_furniture'),  # Wardrobe
         ]
-        
-        for i, (fx, fy, fz, fw, fl, fh, mat_name) in enumerate(furniture_items):
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(fx, fy, fz))
-            furn = bpy.context.active_object
-            furn.name = f"BedroomFurniture_{{i}}"
-            furn.scale = (fw, fl, fh)
-            furn.data.materials.append(materials[mat_name])
-            furniture.append(furn)
-    
-    elif room_type == 'bathroom':
-        # Bathroom fixtures
-        fixtures = [
-            (x - width/3, y + length/3, 0.4, 0.6, 0.4, 0.8, 'bathroom_fixture'),  # Toilet
-            (x + width/3, y + length/3, 0.4, 0.8, 0.5, 0.8, 'bathroom_fixture'),  # Sink
-            (x, y - length/3, 0.3, 1.6, 0.7, 0.6, 'bathroom_fixture'),  # Bathtub
+    if room_type == 'bathroom':
+        return [
+            ((x - width/3, y + length/3, 0.4), (0.6, 0.4, 0.8), 'bathroom_fixture'),  # Toilet
+            ((x + width/3, y + length/3, 0.4), (0.8, 0.5, 0.8), 'bathroom_fixture'),  # Sink
+            ((x, y - length/3, 0.3), (1.6, 0.7, 0.6), 'bathroom_fixture'),  # Bathtub
         ]
-        
-        for i, (fx, fy, fz, fw, fl, fh, mat_name) in enumerate(fixtures):
-            bpy.ops.mesh.primitive_cube_add(size=1, location=(fx, fy, fz))
-            fixture = bpy.context.active_object
-            fixture.name = f"BathroomFixture_{{i}}"
-            fixture.scale = (fw, fl, fh)
-            fixture.data.materials.append(materials[mat_name])
-            furniture.append(fixture)
-    
-    return furniture
-
-# Create floor plan layout
-layout_positions = {json.dumps(layout_positions).replace('true', 'True').replace('false', 'False').replace('null', 'None')}
+    return []
 
-print(f"Creating floor plan with {{len(layout_positions)}} rooms...")
+def _plan_boxes(layout_positions, building_width, building_length):
+    """Every floor quad and box of the floor plan as (N, 3) centers and half-extents
 
-for room_data in layout_positions:
-    room = room_data['room']
-    x = room_data['x']
-    y = room_data['y']
-    width = room_data['width']
-    length = room_data['length']
-    height = room.get('height', 3.0)
-    room_type = room.get('type', 'general')
-    
-    print(f"Creating room: {{room['name']}} ({{room_type}}) at ({{x}}, {{y}})")
-    
-    # Choose floor material based on room type
-    if room_type == 'kitchen':
-        floor_material = materials['kitchen_floor']
-    elif room_type == 'living':
-        floor_material = materials['living_room_floor']
-    elif room_type == 'bedroom':
-        floor_material = materials['bedroom_floor']
-    elif room_type == 'bathroom':
-        floor_material = materials['bathroom_floor']
-    else:
-        floor_material = materials['living_room_floor']
-    
-    # Create colorful floor
-    bpy.ops.mesh.primitive_plane_add(size=1, location=(x, y, 0))
-    floor = bpy.context.active_object
-    floor.name = f"Floor_{{room['name']}}"
-    floor.scale = (width/2, length/2, 1)
-    floor.data.materials.append(floor_material)
-    
-    # NO CEILING - this is the key difference for floor plan view
+    Walls and windows are computed for all rooms in one numpy pass, so Blender only
+    appends geometry. Wall boxes keep the half-height extent of the original scaled cubes.
+    """
+    # One pass over the layout dicts; everything after works on the (N, 4) array
+    rooms = np.array([(pos['x'], pos['y'], pos['width'], pos['length']) for pos in layout_positions],
+                     dtype=float).reshape(-1, 4)
+    xs, ys, ws, ls = rooms.T
+    types = [pos['room'].get('type', 'general') for pos in layout_positions]
+    ones = np.ones_like(xs)
     
-    # Create walls (lower height for floor plan view)
-    wall_thickness = 0.2
-    wall_height = 2.5  # Lower walls for better top-down view
+    floor_centers = np.stack([xs, ys, 0 * ones], axis=1)
+    floor_scales = np.stack([ws / 4, ls / 4, 0 * ones], axis=1)
     
-    wall_positions = [
-        (x - width/2, y, wall_height/2, wall_thickness, length, wall_height),  # Left wall
-        (x + width/2, y, wall_height/2, wall_thickness, length, wall_height),  # Right wall
-        (x, y - length/2, wall_height/2, width, wall_thickness, wall_height),  # Front wall
-        (x, y + length/2, wall_height/2, width, wall_thickness, wall_height),  # Back wall
-    ]
+    t = INTERIOR_WALL_THICKNESS / 2 * ones
+    wz = INTERIOR_WALL_HEIGHT / 2 * ones
+    wh = INTERIOR_WALL_HEIGHT / 4 * ones
+    wall_centers = np.stack([
+        np.stack([xs - ws / 2, ys, wz], axis=1),  # Left
+        np.stack([xs + ws / 2, ys, wz], axis=1),  # Right
+        np.stack([xs, ys - ls / 2, wz], axis=1),  # Front
+        np.stack([xs, ys + ls / 2, wz], axis=1),  # Back
+    ], axis=1).reshape(-1, 3)
+    wall_scales = np.stack([
+        np.stack([t, ls / 2, wh], axis=1),
+        np.stack([t, ls / 2, wh], axis=1),
+        np.stack([ws / 2, t, wh], axis=1),
+        np.stack([ws / 2, t, wh], axis=1),
+    ], axis=1).reshape(-1, 3)
     
-    for i, (wx, wy, wz, w_width, w_length, w_height) in enumerate(wall_positions):
-        bpy.ops.mesh.primitive_cube_add(size=1, location=(wx, wy, wz))
-        wall = bpy.context.active_object
-        wall.name = f"Wall_{{room['name']}}_{{i}}"
-        wall.scale = (w_width, w_length, w_height/2)
-        wall.data.materials.append(materials['interior_wall'])
+    window_centers = np.stack([xs, ys + ls / 2 - 0.1, INTERIOR_WALL_HEIGHT * 0.6 * ones], axis=1)
+    window_scales = np.tile([0.6, 0.05, 0.4], (len(xs), 1))
     
-    # Add doors and windows
-    # Door opening (create a gap in one wall)
-    if room_type != 'bathroom':
-        door_x = x + width/2 - 0.5
-        door_y = y
-        door_z = wall_height/2
-        
-        bpy.ops.mesh.primitive_cube_add(size=1, location=(door_x, door_y, door_z))
-        door = bpy.context.active_object
-        door.name = f"Door_{{room['name']}}"
-        door.scale = (0.1, 0.9, 2.0)
-        door.data.materials.append(materials['door'])
+    # Bathrooms have no door
+    has_door = np.array(types, dtype=object).reshape(-1) != 'bathroom'
+    door_centers = np.stack([xs + ws / 2 - 0.5, ys, wz], axis=1)[has_door]
+    door_scales = np.tile([0.05, 0.45, 1.0], (len(door_centers), 1))
     
-    # Add windows
-    window_x = x
-    window_y = y + length/2 - 0.1
-    window_z = wall_height * 0.6
+    bw, bl, bz = building_width, building_length, EXTERIOR_WALL_HEIGHT / 2
+    et = EXTERIOR_WALL_THICKNESS / 2
+    exterior_centers = np.array([(-bw / 2, 0, bz), (bw / 2, 0, bz), (0, -bl / 2, bz), (0, bl / 2, bz)], dtype=float)
+    exterior_scales = np.array([(et, bl / 2, bz / 2), (et, bl / 2, bz / 2), (bw / 2, et, bz / 2), (bw / 2, et, bz / 2)], dtype=float)
     
-    bpy.ops.mesh.primitive_cube_add(size=1, location=(window_x, window_y, window_z))
-    window = bpy.context.active_object
-    window.name = f"Window_{{room['name']}}"
-    window.scale = (1.2, 0.1, 0.8)
-    window.data.materials.append(materials['window'])
+    furniture = [box for room_type, (x, y, width, length) in zip(types, rooms.tolist())
+                 for box in _furniture_boxes(room_type, x, y, width, length)]
+    furniture_centers = np.array([center for center, _, _ in furniture], dtype=float).reshape(-1, 3)
+    furniture_scales = np.array([size for _, size, _ in furniture], dtype=float).reshape(-1, 3) / 2
     
-    # Add furniture
-    furniture = create_floor_plan_furniture(room_type, x, y, width, length, height)
-
-# Add exterior walls
-building_width = {building_dims['total_width']}
-building_length = {building_dims['total_length']}
-building_height = 3.0  # Lower for floor plan view
-
-exterior_wall_thickness = 0.3
-exterior_positions = [
-    (-building_width/2, 0, building_height/2, exterior_wall_thickness, building_length, building_height),
-    (building_width/2, 0, building_height/2, exterior_wall_thickness, building_length, building_height),
-    (0, -building_length/2, building_height/2, building_width, exterior_wall_thickness, building_height),
-    (0, building_length/2, building_height/2, building_width, exterior_wall_thickness, building_height),
-]
+    box_centers = np.concatenate([wall_centers, door_centers, window_centers, exterior_centers, furniture_centers])
+    box_scales = np.concatenate([wall_scales, door_scales, window_scales, exterior_scales, furniture_scales])
+    box_keys = (['interior_wall'] * len(wall_centers) + ['door'] * len(door_centers)
+                + ['window'] * len(window_centers) + ['exterior_wall'] * len(exterior_centers)
+                + [key for _, _, key in furniture])
+    return {
+        'floor_centers': floor_centers.tolist(),
+        'floor_scales': floor_scales.tolist(),
+        'floor_keys': [FLOOR_MATERIAL_KEYS.get(room_type, DEFAULT_FLOOR_KEY) for room_type in types],
+        'box_centers': box_centers.tolist(),
+        'box_scales': box_scales.tolist(),
+        'box_keys': box_keys,
+    }
 
-for i, (x, y, z, w, l, h) in enumerate(exterior_positions):
-    bpy.ops.mesh.primitive_cube_add(size=1, location=(x, y, z))
-    ext_wall = bpy.context.active_object
-    ext_wall.name = f"ExteriorWall_{{i}}"
-    ext_wall.scale = (w, l, h/2)
-    ext_wall.data.materials.append(materials['exterior_wall'])
+# Isometric orthographic camera over the whole building
+FLOOR_PLAN_RESOLUTION = (1920, 1080)
+FLOOR_PLAN_LONG_SIDE = 1920
+FLOOR_PLAN_CAMERA_ROTATION = (1.0, 0.0, 0.785)  # 45-degree isometric view
+FRAME_MARGIN = 0.02
 
-# Floor plan optimized lighting
-# Bright top-down lighting
-bpy.ops.object.light_add(type='SUN', location=(0, 0, 50))
-sun = bpy.context.active_object
-sun.name = "TopDownLight"
-sun.data.energy = 5.0
-sun.rotation_euler = (0, 0, 0)  # Direct top-down
+def _floor_plan_camera(building_width, building_length):
+    """(location, ortho_scale) of the floor plan camera"""
+    camera_distance = max(building_width, building_length) * 0.8
+    return (camera_distance, -camera_distance, camera_distance), max(building_width, building_length) * 1.2
 
-# Additional area lights for even illumination
-area_lights = [
-    (0, 0, 20, 500),  # Main top light
-    (-building_width/2, 0, 15, 200),  # Left side
-    (building_width/2, 0, 15, 200),   # Right side
-    (0, -building_length/2, 15, 200), # Front
-    (0, building_length/2, 15, 200),  # Back
-]
+def _fit_camera(plan, camera_location, ortho_scale, rotation=FLOOR_PLAN_CAMERA_ROTATION,
+                long_side=FLOOR_PLAN_LONG_SIDE, margin=FRAME_MARGIN):
+    """(location, ortho_scale, resolution) framing the plan's geometry with no empty band
 
-for i, (lx, ly, lz, energy) in enumerate(area_lights):
-    bpy.ops.object.light_add(type='AREA', location=(lx, ly, lz))
-    area_light = bpy.context.active_object
-    area_light.name = f"AreaLight_{{i}}"
-    area_light.data.energy = energy
-    area_light.data.size = 5.0
-    area_light.rotation_euler = (0, 0, 0)
-
-# Floor plan camera - isometric top-down view
-camera_distance = max(building_width, building_length) * 0.8
-bpy.ops.object.camera_add(location=(camera_distance, -camera_distance, camera_distance))
-camera = bpy.context.active_object
-camera.name = "FloorPlanCamera"
-camera.rotation_euler = (1.0, 0, 0.785)  # 45-degree isometric view
-scene.camera = camera
-
-# Set camera to orthographic for architectural view
-camera.data.type = 'ORTHO'
-camera.data.ortho_scale = max(building_width, building_length) * 1.2
-
-# Set output paths
-output_dir = "{self.temp_dir.replace(chr(92), '/')}"
-blend_file = f"{{output_dir}}/floor_plan_{self.scene_id}.blend"
-obj_file = f"{{output_dir}}/floor_plan_{self.scene_id}.obj"
-render_file = f"{{output_dir}}/floor_plan_{self.scene_id}.png"
+    Every corner of every box is projected onto the orthographic camera's right and up
+    axes. The camera slides along those axes to centre the projection, and the resolution
+    takes the projection's aspect ratio with the longer side at long_side pixels, so no
+    pixels are spent on background beside the building.
+    """
+    corners = []
+    for corner_set, prefix in ((PLANE_CORNERS, 'floor'), (BOX_CORNERS, 'box')):
+        centers = np.asarray(plan[f'{prefix}_centers'], dtype=float).reshape(-1, 1, 3)
+        scales = np.asarray(plan[f'{prefix}_scales'], dtype=float).reshape(-1, 1, 3)
+        corners.append((centers + np.array(corner_set) * scales).reshape(-1, 3))
+    points = np.concatenate(corners) - np.asarray(camera_location, dtype=float)
+    if not len(points):
+        return camera_location, ortho_scale, FLOOR_PLAN_RESOLUTION
+    
+    # Blender's XYZ Euler is Rz @ Ry @ Rx; the camera's right and up axes are its first two columns
+    rx, ry, rz = rotation
+    cx, sx, cy, sy, cz, sz = np.cos(rx), np.sin(rx), np.cos(ry), np.sin(ry), np.cos(rz), np.sin(rz)
+    right = np.array([cz * cy, sz * cy, -sy])
+    up = np.array([cz * sy * sx - sz * cx, sz * sy * sx + cz * cx, cy * sx])
+    
+    xs, ys = points @ right, points @ up
+    location = np.asarray(camera_location, dtype=float) + right * (xs.max() + xs.min()) / 2 + up * (ys.max() + ys.min()) / 2
+    span_x = max(float(np.ptp(xs)), 1e-6) * (1 + 2 * margin)
+    span_y = max(float(np.ptp(ys)), 1e-6) * (1 + 2 * margin)
+    
+    # With automatic sensor fit the ortho scale spans the longer side of the frame
+    if span_x >= span_y:
+        resolution = (long_side, max(round(long_side * span_y / span_x), 1))
+    else:
+        resolution = (max(round(long_side * span_x / span_y), 1), long_side)
+    return tuple(location.tolist()), max(span_x, span_y), resolution
 
-# Save blend file
-bpy.ops.wm.save_as_mainfile(filepath=blend_file)
-print(f"BLEND_FILE: {{blend_file}}")
+def _write_obj(plan, obj_path, mtl_path):
+    """Write the floor plan from _plan_boxes() straight to OBJ + MTL
 
-# Export OBJ with materials using legacy exporter for better MTL support
-try:
-    # Try new exporter first
-    bpy.ops.wm.obj_export(filepath=obj_file, check_existing=False, export_selected_objects=False, export_materials=True)
-    print(f"OBJ_FILE: {{obj_file}}")
+    Every shape is a unit box or quad scaled about its center, so the files come from the
+    plan arrays directly instead of Blender's exporter walking and re-serializing the scene.
+    Vertices are written Y-up like Blender's exporter, as (x, z, -y).
+    """
+    lines = [f'mtllib {os.path.basename(mtl_path)}', 'o FloorPlan']
+    faces_by_key = {}
+    vertex_count = 0
+    for corners, faces, prefix in ((PLANE_CORNERS, PLANE_FACES, 'floor'), (BOX_CORNERS, BOX_FACES, 'box')):
+        centers = np.asarray(plan[f'{prefix}_centers'], dtype=float).reshape(-1, 1, 3)
+        scales = np.asarray(plan[f'{prefix}_scales'], dtype=float).reshape(-1, 1, 3)
+        verts = (centers + np.array(corners) * scales).reshape(-1, 3)
+        lines.extend(f'v {x:.6f} {z:.6f} {-y:.6f}' for x, y, z in verts.tolist())
+        # OBJ indices are 1-based and count every vertex written so far
+        shape_faces = vertex_count + 1 + len(corners) * np.arange(len(centers)).reshape(-1, 1, 1) + np.array(faces)
+        for key, shape in zip(plan[f'{prefix}_keys'], shape_faces.tolist()):
+            faces_by_key.setdefault(key, []).extend(shape)
+        vertex_count += len(verts)
     
-    # Check if MTL was created
-    mtl_file = obj_file.replace('.obj', '.mtl')
-    if not bpy.path.exists(mtl_file):
-        print(f"MTL file not created by new exporter, trying legacy exporter...")
-        # Try legacy exporter
-        bpy.ops.export_scene.obj(filepath=obj_file, check_existing=False, use_selection=False, use_materials=True)
-        print(f"OBJ_FILE (legacy): {{obj_file}}")
-        if bpy.path.exists(mtl_file):
-            print(f"MTL_FILE: {{mtl_file}}")
-    else:
-        print(f"MTL_FILE: {{mtl_file}}")
-        
-except Exception as e:
-    print(f"Export error: {{e}}")
-    # Fallback to legacy exporter
-    bpy.ops.export_scene.obj(filepath=obj_file, check_existing=False, use_selection=False, use_materials=True)
-    print(f"OBJ_FILE (fallback): {{obj_file}}")
-    mtl_file = obj_file.replace('.obj', '.mtl')
-    if bpy.path.exists(mtl_file):
-        print(f"MTL_FILE: {{mtl_file}}")
+    # One usemtl run per material
+    for key, faces in faces_by_key.items():
+        lines.append(f'usemtl {key}')
+        lines.extend('f ' + ' '.join(map(str, face)) for face in faces)
+    with open(obj_path, 'w', newline='\n') as f:
+        f.write('\n'.join(lines) + '\n')
+    
+    mtl_lines = []
+    for key in faces_by_key:
+        _, (r, g, b) = FLOOR_PLAN_MATERIALS[key]
+        mtl_lines += [f'newmtl {key}', f'Kd {r:.4f} {g:.4f} {b:.4f}', 'Ka 0.0000 0.0000 0.0000', 'd 1.0', 'illum 1', '']
+    with open(mtl_path, 'w', newline='\n') as f:
+        f.write('\n'.join(mtl_lines))
 
-# Render floor plan
-scene.render.filepath = render_file
-bpy.ops.render.render(write_still=True)
-print(f"RENDER_PNG: {{render_file}}")
+class FloorPlanRenderer:
+    """3D Floor Plan Renderer with interior details and colorful materials"""
+    
+    def __init__(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='constructai_floorplan_')
+        self.blender_path = 'D:\\blender\\blender.exe'
+        self.scene_id = None
+        self.gpu_count = 1
+        self.layout_generator = AdvancedLayoutGenerator()
+        self._pool = None
+        self._cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'render_cache', 'floor_plan')
+    
+    def render_floor_plan(self, boq_config):
+        """Render a 3D floor plan with interior details and no ceiling
 
-print(f"SCENE_ID: {self.scene_id}")
-print(f"LAYOUT_TYPE: floor_plan")
-print(f"STYLE: {architectural_style}")
-print(f"QUALITY_LEVEL: architectural")
-print("SUCCESS: 3D floor plan created successfully")
-'''
+        Returns a dict with 'success', the output paths and scene markers printed by the
+        script (lower-cased, e.g. 'render_png'), and 'log_file'; or 'error' on failure.
+        """
+        
+        # Local copy so concurrent render_batch jobs never read each other's id
+        scene_id = self.scene_id = str(uuid.uuid4())
+        
+        rooms = boq_config.get('rooms', [])
+        building_dims = boq_config.get('building_dimensions', {"total_width": 40, "total_length": 30, "height": 12})
+        enhanced_features = boq_config.get('enhanced_features', {})
+        architectural_style = boq_config.get('architectural_style', 'modern')
+        quality_level = boq_config.get('quality_level', 'professional')
         
-        # Write script
-        script_path = os.path.join(self.temp_dir, f'floor_plan_{self.scene_id}.py')
-        with open(script_path, 'w') as f:
-            f.write(blender_script)
+        print(f"Creating 3D floor plan: {scene_id}")
+        print(f"Rooms to generate: {len(rooms)}")
+        print(f"Building dimensions: {building_dims}")
+        print(f"Style: {architectural_style}")
         
-        print(f"Floor plan Blender script written to: {script_path}")
+        # An identical config renders an identical plan, so it is served from the cache
+        cache_dir = os.path.join(self._cache_dir, self.config_hash(boq_config))
+        cached = self.cached_result(cache_dir)
+        if cached is not None:
+            print("✅ 3D floor plan served from cache")
+            return cached
         
-        # Run Blender
-        cmd = [
-            self.blender_path,
-            '--background',
-            '--python', script_path
-        ]
+        # Boot Blender now so its startup and GPU warm-up overlap with layout and script generation
+        self._worker_pool().start()
+        
+        # Generate advanced layout
+        layout_positions = self.layout_generator.generate_layout(rooms, building_dims)
+        
+        # Box transforms are computed here and passed to the script with its settings
+        plan = _plan_boxes(layout_positions, building_dims['total_width'], building_dims['total_length'])
+        
+        # Fit the frame to the building's footprint as seen by the camera
+        camera_location, ortho_scale = _floor_plan_camera(building_dims['total_width'], building_dims['total_length'])
+        camera_location, ortho_scale, resolution = _fit_camera(plan, camera_location, ortho_scale)
+        
+        # The OBJ comes straight from the same boxes, so Blender only builds and renders;
+        # the script never reads it, so it is written on a thread while Blender works
+        obj_file = Path(self.temp_dir, f'floor_plan_{scene_id}.obj').as_posix()
+        mtl_file = Path(self.temp_dir, f'floor_plan_{scene_id}.mtl').as_posix()
+        executor = ThreadPoolExecutor(max_workers=1)
+        obj_future = executor.submit(_write_obj, plan, obj_file, mtl_file)
+        executor.shutdown(wait=False)
+        
+        # Only the settings are written per render; the scene script itself is static
+        scene_config = {
+            'scene_id': scene_id,
+            'output_dir': Path(self.temp_dir).as_posix(),
+            'obj_file': obj_file,
+            'mtl_file': mtl_file,
+            'style': architectural_style,
+            'use_cycles': quality_level == 'photorealistic',
+            'resolution': resolution,
+            'materials': FLOOR_PLAN_MATERIALS,
+            'unit_shapes': {
+                'box_corners': BOX_CORNERS,
+                'box_faces': BOX_FACES,
+                'plane_corners': PLANE_CORNERS,
+                'plane_faces': PLANE_FACES,
+            },
+            'plan': plan,
+            'camera': {'location': camera_location, 'rotation': FLOOR_PLAN_CAMERA_ROTATION, 'ortho_scale': ortho_scale},
+        }
+        config_path = os.path.join(self.temp_dir, f'floor_plan_{scene_id}.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(scene_config, f)
+        
+        print(f"Floor plan settings written to: {config_path}")
+        
+        # Run the script in a warm Blender, started on the first render and reused after that.
+        # Only the marker lines are kept; the full transcript stays in the log file
+        log_path = os.path.join(self.temp_dir, f'floor_plan_{scene_id}.log')
+        result = {'success': True, 'log_file': log_path}
+        def on_line(line):
+            marker, _, value = line.partition(': ')
+            if marker in FLOOR_PLAN_MARKERS:
+                result[marker.lower()] = value.strip()
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
+            ok, output_tail = self._worker_pool().run([FLOOR_PLAN_SCRIPT_PATH, '--', '--config', config_path],
+                                                      log_path, on_line, timeout=180)
+            obj_future.result()
             
-            if result.returncode == 0:
+            if ok:
                 print("✅ 3D floor plan created successfully")
-                print("Blender render output:")
-                print(result.stdout)
-                return result.stdout
+                self.store_cached_result(cache_dir, result)
+                return result
             else:
-                print(f"❌ Blender error: {result.stderr}")
-                return f"Error: {result.stderr}"
+                print(f"❌ Blender error: {output_tail}")
+                return {'success': False, 'error': output_tail, 'log_file': log_path}
         
         except subprocess.TimeoutExpired:
-            return "Error: Blender timeout"
+            return {'success': False, 'error': 'Blender timeout', 'log_file': log_path}
         except Exception as e:
-            return f"Error: {str(e)}"
+            return {'success': False, 'error': str(e), 'log_file': log_path}
+    
+    def config_hash(self, config):
+        """Stable digest of a config; floats are rounded so float noise does not split entries"""
+        def normalize(value):
+            if isinstance(value, float):
+                return round(value, 4)
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+        payload = json.dumps(normalize(config), sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def cached_result(self, cache_dir):
+        """Copy a previous render's outputs into temp_dir, or return None on a miss"""
+        meta_path = os.path.join(cache_dir, 'result.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        
+        # The OBJ names its .mtl by scene id, so a hit is served under the original scene id
+        for key, extension in CACHED_OUTPUTS.items():
+            src_file = os.path.join(cache_dir, f'floor_plan.{extension}')
+            if not os.path.exists(src_file):
+                return None
+            dst_file = Path(self.temp_dir, f"floor_plan_{result['scene_id']}.{extension}").as_posix()
+            if not os.path.exists(dst_file):
+                shutil.copyfile(src_file, dst_file)
+            result[key] = dst_file
+        self.scene_id = result['scene_id']
+        result['cached'] = True
+        return result
+    
+    def store_cached_result(self, cache_dir, result):
+        """Keep a copy of a successful render's outputs for identical later requests"""
+        if not all(os.path.exists(result.get(key, '')) for key in CACHED_OUTPUTS):
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        for key, extension in CACHED_OUTPUTS.items():
+            shutil.copyfile(result[key], os.path.join(cache_dir, f'floor_plan.{extension}'))
+        meta = {key: value for key, value in result.items() if key not in CACHED_OUTPUTS and key != 'log_file'}
+        with open(os.path.join(cache_dir, 'result.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    
+    def invalidate_cache(self, boq_config=None):
+        """Drop the cached render for one BOQ config, or the whole cache"""
+        if boq_config is None:
+            target = self._cache_dir
+        else:
+            target = os.path.join(self._cache_dir, self.config_hash(boq_config))
+        shutil.rmtree(target, ignore_errors=True)
+    
+    def _worker_pool(self, size=1):
+        """The renderer's warm Blender pool, grown to at least size workers"""
+        if self._pool is None:
+            self._pool = BlenderWorkerPool(self.blender_path, size, self.gpu_count)
+        else:
+            self._pool.gpu_count = self.gpu_count
+            self._pool.grow(size)
+        return self._pool
+    
+    def render_batch(self, boq_configs, max_workers=2, gpu_count=None):
+        """Render several floor plans concurrently, returning results in config order
+
+        Each thread prepares its plan and script, then waits on its own pool worker. Worker i
+        is pinned to GPU i % gpu_count, so parallel renders land on distinct devices.
+        """
+        if gpu_count is not None:
+            self.gpu_count = gpu_count
+        self._worker_pool(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.render_floor_plan, boq_configs))
+    
+    def close(self):
+        """Stop the warm Blender process"""
+        if self._pool is not None:
+            self._pool.close()
 
 def main():
     import sys
@@ -439,8 +459,11 @@ def main():
         sys.exit(1)
     
     renderer = FloorPlanRenderer()
-    output = renderer.render_floor_plan(config)
-    print(output)
+    try:
+        result = renderer.render_floor_plan(config)
+    finally:
+        renderer.close()
+    print(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
     main()
@@ -3,17 +3,70 @@
 Final Frontend Status Check
 """
 import os
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from pooled_http import create_session
+
+# One pooled session for all probes
+http_session = create_session(pool_connections=1, pool_maxsize=4)
+
+FRONTEND_URL = 'http://localhost:3000'
+BOQ_TEST_SPECS = {
+    'total_area': 1000,
+    'num_bedrooms': 2,
+    'num_living_rooms': 1,
+    'num_kitchens': 1,
+    'num_bathrooms': 2,
+    'room_height': 10
+}
+BLENDER_TEST_CONFIG = {
+    'tool': 'generate_3d_model',
+    'arguments': {
+        'rooms': [
+            {
+                'name': 'test_room',
+                'type': 'living_room',
+                'width': 20,
+                'length': 15,
+                'height': 10,
+                'area': 300
+            }
+        ],
+        'building_dimensions': {
+            'total_width': 30,
+            'total_length': 20,
+            'height': 12
+        }
+    }
+}
+
+def count_obj_files(directory):
+    """Number of regular .obj files in a directory, counted in one scandir pass
+
+    DirEntry carries the file type from the directory read, so no list is built and no
+    extra stat() is made per entry on platforms that report it.
+    """
+    with os.scandir(directory) as entries:
+        return sum(1 for entry in entries if entry.name.endswith('.obj') and entry.is_file(follow_symlinks=False))
 
 def check_frontend_status():
     """Check the current status of the frontend"""
     print("🔍 FRONTEND STATUS CHECK")
     print("=" * 50)
     
+    # The three probes are independent, so they run at once and the checks below
+    # only wait for their own response
+    executor = ThreadPoolExecutor(max_workers=3)
+    server_future = executor.submit(http_session.get, FRONTEND_URL, timeout=10)
+    boq_future = executor.submit(http_session.post, f'{FRONTEND_URL}/api/boq/estimate-3d', json=BOQ_TEST_SPECS,
+                                 timeout=30)
+    blender_future = executor.submit(http_session.post, f'{FRONTEND_URL}/api/mcp/blender-bridge',
+                                     json=BLENDER_TEST_CONFIG, timeout=30)
+    executor.shutdown(wait=False)
+    
     # Check if development server is running
     try:
-        response = requests.get('http://localhost:3000')
+        response = server_future.result()
         if response.status_code == 200:
             print("✅ Development server is running")
         else:
@@ -23,16 +76,7 @@ def check_frontend_status():
     
     # Check BOQ API
     try:
-        test_specs = {
-            'total_area': 1000,
-            'num_bedrooms': 2,
-            'num_living_rooms': 1,
-            'num_kitchens': 1,
-            'num_bathrooms': 2,
-            'room_height': 10
-        }
-        
-        response = requests.post('http://localhost:3000/api/boq/estimate-3d', json=test_specs)
+        response = boq_future.result()
         if response.status_code == 200:
             data = response.json()
             print("✅ BOQ API is working")
@@ -45,28 +89,7 @@ def check_frontend_status():
     
     # Check Blender API
     try:
-        blender_config = {
-            'tool': 'generate_3d_model',
-            'arguments': {
-                'rooms': [
-                    {
-                        'name': 'test_room',
-                        'type': 'living_room',
-                        'width': 20,
-                        'length': 15,
-                        'height': 10,
-                        'area': 300
-                    }
-                ],
-                'building_dimensions': {
-                    'total_width': 30,
-                    'total_length': 20,
-                    'height': 12
-                }
-            }
-        }
-        
-        response = requests.post('http://localhost:3000/api/mcp/blender-bridge', json=blender_config, timeout=30)
+        response = blender_future.result()
         if response.status_code == 200:
             data = response.json()
             if data.get('success'):
@@ -89,12 +112,10 @@ def check_frontend_status():
     print(f"  - Public renders directory: {'✅ Exists' if os.path.exists(public_renders) else '❌ Missing'}")
     
     if os.path.exists(backend_models):
-        files = [f for f in os.listdir(backend_models) if f.endswith('.obj')]
-        print(f"  - Generated OBJ files: {len(files)}")
+        print(f"  - Generated OBJ files: {count_obj_files(backend_models)}")
     
     if os.path.exists(public_renders):
-        files = [f for f in os.listdir(public_renders) if f.endswith('.obj')]
-        print(f"  - Public OBJ files: {len(files)}")
+        print(f"  - Public OBJ files: {count_obj_files(public_renders)}")
     
     print(f"\n🎨 Frontend Components Status:")
     frontend_files = [
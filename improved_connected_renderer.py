@@ -8,372 +8,315 @@ import tempfile
 import uuid
 import json
 import shutil
+import hashlib
+import time
 import math
-import random
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
 # Force NVIDIA GPU usage
 os.environ['CUDA_VISIBLE_DEVICES'] = '0'
 os.environ['BLENDER_CUDA_DEVICE'] = '0'
 os.environ['NVIDIA_VISIBLE_DEVICES'] = '0'
 
-class ImprovedConnectedRenderer:
-    """Creates improved connected floor plans with better detail and materials"""
-    
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix='constructai_improved_')
-        self.blender_path = 'D:\\blender\\blender.exe'
-        self.scene_id = None
-    
-    def render_connected_floor_plan(self, boq_config):
-        """Render an improved connected floor plan"""
-        
-        # Use configured scene_id if available, otherwise generate one
-        output_config = boq_config.get('output', {})
-        self.scene_id = output_config.get('scene_id', str(uuid.uuid4()))
-        
-        rooms = boq_config.get('rooms', [])
-        building_dims = boq_config.get('building_dimensions', {"total_width": 20, "total_length": 20, "height": 8})
-        
-        print(f"Creating improved connected floor plan: {self.scene_id}")
-        print(f"Rooms: {len(rooms)}")
-        
-        # Create improved Blender script
-        blender_script = f"""import bpy
-import bmesh
-from mathutils import Vector
-import math
+from blender_worker_pool import BlenderWorkerPool
 
-# Clear everything
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False, confirm=False)
+# Static Blender script that builds and renders the plan from a JSON layout file
+CONNECTED_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blender_templates', 'render_connected.py')
 
-scene = bpy.context.scene
-scene.render.engine = 'CYCLES'
+# Room-specific materials, key -> (name, color)
+CONNECTED_MATERIALS = {
+    'living': ('Living_Material', (0.8, 0.52, 0.25)),  # Sandy brown
+    'kitchen': ('Kitchen_Material', (0.9, 0.9, 0.98)),  # Lavender
+    'bedroom': ('Bedroom_Material', (0.85, 0.65, 0.13)),  # Goldenrod
+    'bathroom': ('Bathroom_Material', (0.53, 0.81, 0.92)),  # Sky blue
+    'dining': ('Dining_Material', (0.82, 0.71, 0.55)),  # Tan
+    'utility': ('Utility_Material', (0.5, 0.5, 0.5)),  # Gray
+    'wall': ('Wall_Material', (0.96, 0.96, 0.96)),  # White smoke
+    'door': ('Door_Material', (0.63, 0.32, 0.18)),  # Sienna
+    'window': ('Window_Material', (0.53, 0.81, 0.98)),  # Light blue
+    'furniture': ('Furniture_Material', (0.55, 0.27, 0.07)),  # Saddle brown
+}
 
-# Create materials with proper color handling
-def create_simple_material(name, color_rgb):
-    mat = bpy.data.materials.new(name=name)
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    nodes.clear()
-    
-    # Create principled BSDF node
-    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-    principled.inputs['Base Color'].default_value = (color_rgb[0], color_rgb[1], color_rgb[2], 1.0)
-    principled.inputs['Roughness'].default_value = 0.5
-    
-    # Create output node
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    mat.node_tree.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
-    
-    return mat
+# Unit cube matching primitive_cube_add(size=2), so box scales are half-extents
+BOX_CORNERS = [(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1), (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]
+BOX_FACES = [(0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
+
+# "MARKER: value" lines the script prints for the caller, marker -> result key
+CONNECTED_MARKERS = {
+    'SCENE_ID': 'scene_id',
+    'BLEND_FILE': 'blend_file',
+    'OBJ_FILE': 'obj_file',
+    'MTL_FILE': 'mtl_file',
+    'RENDER_FILE': 'render_file',
+}
 
-# Create room-specific materials
-materials = {{
-    'living': create_simple_material('Living_Material', (0.8, 0.52, 0.25)),  # Sandy brown
-    'kitchen': create_simple_material('Kitchen_Material', (0.9, 0.9, 0.98)),  # Lavender
-    'bedroom': create_simple_material('Bedroom_Material', (0.85, 0.65, 0.13)),  # Goldenrod
-    'bathroom': create_simple_material('Bathroom_Material', (0.53, 0.81, 0.92)),  # Sky blue
-    'dining': create_simple_material('Dining_Material', (0.82, 0.71, 0.55)),  # Tan
-    'utility': create_simple_material('Utility_Material', (0.5, 0.5, 0.5)),  # Gray
-    'wall': create_simple_material('Wall_Material', (0.96, 0.96, 0.96)),  # White smoke
-    'door': create_simple_material('Door_Material', (0.63, 0.32, 0.18)),  # Sienna
-    'window': create_simple_material('Window_Material', (0.53, 0.81, 0.98)),  # Light blue
-    'furniture': create_simple_material('Furniture_Material', (0.55, 0.27, 0.07)),  # Saddle brown
-}}
+# Output files published and kept per cached render
+CACHED_OUTPUTS = ('blend_file', 'obj_file', 'mtl_file', 'render_file')
 
-# Room data
-room_data = {rooms}
-building_width = {building_dims['total_width']}
-building_length = {building_dims['total_length']}
-building_height = {building_dims['height']}
+# Render settings per output quality. The PNG is mostly a preview thumbnail, so previews
+# render a quarter of the pixels at a quarter of the samples and stop early where clean
+RENDER_QUALITY = {
+    'preview': {'resolution': (960, 540), 'samples': 16, 'denoise': False, 'adaptive_threshold': 0.1},
+    'final': {'resolution': (1920, 1080), 'samples': 64, 'denoise': True, 'adaptive_threshold': None},
+}
+DEFAULT_QUALITY = 'preview'
 
-# Create foundation
-bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, -0.1))
-foundation = bpy.context.active_object
-foundation.scale = (building_width/2, building_length/2, 0.1)
-foundation.name = "Foundation"
-foundation.data.materials.append(materials['wall'])
+def _render_quality(config):
+    """The config's output quality, with values RENDER_QUALITY does not know mapped to the default"""
+    quality = config.get('output', {}).get('quality', DEFAULT_QUALITY)
+    return quality if quality in RENDER_QUALITY else DEFAULT_QUALITY
 
-# Calculate room layout
-total_rooms = len(room_data)
-rooms_per_row = 3
-grid_width = building_width - 4
-grid_length = building_length - 4
-cell_width = grid_width / rooms_per_row
-cell_length = grid_length / math.ceil(total_rooms / rooms_per_row)
+ROOMS_PER_ROW = 3
+WALL_THICKNESS = 0.15
+FURNITURE_HEIGHT = 0.4
+HALLWAY_WIDTH = 2
 
-# Create detailed room layout
-for i, room in enumerate(room_data):
-    room_name = room.get('name', f'Room_{{i}}').replace(' ', '_')
-    room_type = room.get('type', 'bedroom').lower()
+def _furniture_boxes(room_type, room_name, x, y, width, length):
+    """(name, center, half-extents) of the furniture for one room"""
+    h = FURNITURE_HEIGHT
+    if room_type == 'living':
+        return [
+            (f"Sofa_{room_name}", (x - width/3, y, h/2), (width/4, 0.4, h/2)),
+            (f"Table_{room_name}", (x, y, 0.2), (0.6, 0.3, 0.2)),  # Coffee table
+        ]
+    if room_type == 'kitchen':
+        return [
+            (f"Island_{room_name}", (x, y, h/2), (width/3, 0.5, h/2)),
+            (f"Counter_{room_name}", (x - width/3, y + length/3, h/2), (width/4, 0.3, h/2)),
+        ]
+    if room_type == 'bedroom':
+        return [
+            (f"Bed_{room_name}", (x, y, 0.3), (width/3, length/3, 0.3)),
+            (f"Dresser_{room_name}", (x + width/3, y, h/2), (0.3, 0.25, h/2)),
+        ]
+    if room_type == 'bathroom':
+        return [
+            (f"Toilet_{room_name}", (x - width/3, y + length/3, 0.2), (0.15, 0.25, 0.2)),
+            (f"Sink_{room_name}", (x + width/3, y + length/3, h/2), (0.25, 0.15, 0.05)),
+            (f"Bathtub_{room_name}", (x, y - length/3, 0.25), (width/3, 0.3, 0.25)),
+        ]
+    return []
+
+def _connected_boxes(rooms, building_dims):
+    """Every box of the connected plan as names, (N, 3) centers and half-extents, and material keys
+
+    Rooms sit on a grid of ROOMS_PER_ROW columns; a room that is not first in its row gets
+    a door in its left wall, which connects it to its neighbour. Grid positions and walls
+    are computed for all rooms in one numpy pass, so Blender only creates objects.
+    """
+    building_width = building_dims['total_width']
+    building_length = building_dims['total_length']
+    building_height = building_dims['height']
     
-    # Calculate grid position
-    row = i // rooms_per_row
-    col = i % rooms_per_row
+    names = [room.get('name', f'Room_{i}').replace(' ', '_') for i, room in enumerate(rooms)]
+    types = [room.get('type', 'bedroom').lower() for room in rooms]
+    requested = np.array([(room.get('width', 8), room.get('length', 8)) for room in rooms], dtype=float).reshape(-1, 2)
     
-    # Calculate room position
-    room_x = -building_width/2 + 2 + (col + 0.5) * cell_width
-    room_y = -building_length/2 + 2 + (row + 0.5) * cell_length
-    room_width = min(cell_width * 0.9, room.get('width', 8))
-    room_length = min(cell_length * 0.9, room.get('length', 8))
-    room_height = building_height * 0.8
+    rows, cols = np.divmod(np.arange(len(rooms)), ROOMS_PER_ROW)
+    cell_width = (building_width - 4) / ROOMS_PER_ROW
+    cell_length = (building_length - 4) / max(math.ceil(len(rooms) / ROOMS_PER_ROW), 1)
+    xs = -building_width/2 + 2 + (cols + 0.5) * cell_width
+    ys = -building_length/2 + 2 + (rows + 0.5) * cell_length
+    ws = np.minimum(cell_width * 0.9, requested[:, 0])
+    ls = np.minimum(cell_length * 0.9, requested[:, 1])
     
-    # Create floor
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y, 0.05))
-    floor = bpy.context.active_object
-    floor.scale = (room_width/2, room_length/2, 0.05)
-    floor.name = f"Floor_{{room_name}}"
+    ones = np.ones_like(xs)
+    t = WALL_THICKNESS * ones
+    wh = building_height * 0.8 / 2 * ones
     
-    # Assign material based on room type
-    if room_type in materials:
-        floor.data.materials.append(materials[room_type])
-    else:
-        floor.data.materials.append(materials['living'])
+    floor_centers = np.stack([xs, ys, 0.05 * ones], axis=1)
+    floor_scales = np.stack([ws / 2, ls / 2, 0.05 * ones], axis=1)
     
-    # Create walls
-    wall_height = room_height/2
-    wall_thickness = 0.15
+    # Front, back and right walls of every room
+    wall_centers = np.stack([
+        np.stack([xs, ys + ls / 2, wh], axis=1),
+        np.stack([xs, ys - ls / 2, wh], axis=1),
+        np.stack([xs + ws / 2, ys, wh], axis=1),
+    ], axis=1).reshape(-1, 3)
+    wall_scales = np.stack([
+        np.stack([ws / 2, t, wh], axis=1),
+        np.stack([ws / 2, t, wh], axis=1),
+        np.stack([t, ls / 2, wh], axis=1),
+    ], axis=1).reshape(-1, 3)
+    wall_names = [f"Wall_{side}_{name}" for name in names for side in ('Front', 'Back', 'Right')]
     
-    # Front wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y + room_length/2, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (room_width/2, wall_thickness, wall_height)
-    wall.name = f"Wall_Front_{{room_name}}"
-    wall.data.materials.append(materials['wall'])
+    # Left walls: full in the first column, split around a door everywhere else
+    first = cols == 0
+    full_left_centers = np.stack([xs - ws / 2, ys, wh], axis=1)[first]
+    full_left_scales = np.stack([t, ls / 2, wh], axis=1)[first]
+    split = ~first
+    split_left_centers = np.stack([
+        np.stack([xs - ws / 2, ys + ls / 4, wh], axis=1),
+        np.stack([xs - ws / 2, ys - ls / 4, wh], axis=1),
+    ], axis=1)[split].reshape(-1, 3)
+    split_left_scales = np.stack([
+        np.stack([t, ls / 4, wh], axis=1),
+        np.stack([t, ls / 4, wh], axis=1),
+    ], axis=1)[split].reshape(-1, 3)
+    door_centers = np.stack([xs - ws / 2, ys, 0.8 * ones], axis=1)[split]
+    door_scales = np.tile([0.05, 0.4, 0.8], (len(door_centers), 1))
+    split_names = [name for name, is_split in zip(names, split) if is_split]
     
-    # Back wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y - room_length/2, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (room_width/2, wall_thickness, wall_height)
-    wall.name = f"Wall_Back_{{room_name}}"
-    wall.data.materials.append(materials['wall'])
+    furniture = [box for room_type, name, (x, y, width, length) in zip(types, names, np.stack([xs, ys, ws, ls], axis=1).tolist())
+                 for box in _furniture_boxes(room_type, name, x, y, width, length)]
     
-    # Left wall (with door opening if not first in row)
-    if col > 0:
-        # Create wall with door opening
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/2, room_y + room_length/4, wall_height))
-        wall = bpy.context.active_object
-        wall.scale = (wall_thickness, room_length/4, wall_height)
-        wall.name = f"Wall_Left_Top_{{room_name}}"
-        wall.data.materials.append(materials['wall'])
-        
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/2, room_y - room_length/4, wall_height))
-        wall = bpy.context.active_object
-        wall.scale = (wall_thickness, room_length/4, wall_height)
-        wall.name = f"Wall_Left_Bottom_{{room_name}}"
-        wall.data.materials.append(materials['wall'])
-        
-        # Add door
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/2, room_y, 0.8))
-        door = bpy.context.active_object
-        door.scale = (0.05, 0.4, 0.8)
-        door.name = f"Door_Left_{{room_name}}"
-        door.data.materials.append(materials['door'])
-    else:
-        # Full wall
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/2, room_y, wall_height))
-        wall = bpy.context.active_object
-        wall.scale = (wall_thickness, room_length/2, wall_height)
-        wall.name = f"Wall_Left_{{room_name}}"
-        wall.data.materials.append(materials['wall'])
+    centers = np.concatenate([
+        [(0, 0, -0.1)],  # Foundation
+        floor_centers, wall_centers, full_left_centers, split_left_centers, door_centers,
+        np.array([center for _, center, _ in furniture], dtype=float).reshape(-1, 3),
+        [(0, 0, 0.05)],  # Connecting hallway
+    ])
+    scales = np.concatenate([
+        [(building_width/2, building_length/2, 0.1)],
+        floor_scales, wall_scales, full_left_scales, split_left_scales, door_scales,
+        np.array([scale for _, _, scale in furniture], dtype=float).reshape(-1, 3),
+        [(building_width/2, HALLWAY_WIDTH/2, 0.05)],
+    ])
+    box_names = (["Foundation"] + [f"Floor_{name}" for name in names] + wall_names
+                 + [f"Wall_Left_{name}" for name, is_first in zip(names, first) if is_first]
+                 + [f"Wall_Left_{part}_{name}" for name in split_names for part in ('Top', 'Bottom')]
+                 + [f"Door_Left_{name}" for name in split_names]
+                 + [name for name, _, _ in furniture] + ["Main_Hallway"])
+    keys = (['wall'] + [room_type if room_type in CONNECTED_MATERIALS else 'living' for room_type in types]
+            + ['wall'] * (len(wall_centers) + len(full_left_centers) + len(split_left_centers))
+            + ['door'] * len(door_centers) + ['furniture'] * len(furniture) + ['living'])
+    return {'names': box_names, 'centers': centers.tolist(), 'scales': scales.tolist(), 'keys': keys}
+
+def _write_obj(boxes, obj_path, mtl_path):
+    """Write the boxes from _connected_boxes() straight to OBJ + MTL
+
+    Every box is the unit cube scaled about its center, so the files come from the box
+    arrays directly instead of Blender's exporter walking and re-serializing the scene.
+    Vertices are written Y-up like Blender's exporter, as (x, z, -y).
+    """
+    centers = np.asarray(boxes['centers'], dtype=float).reshape(-1, 1, 3)
+    scales = np.asarray(boxes['scales'], dtype=float).reshape(-1, 1, 3)
+    verts = (centers + np.array(BOX_CORNERS) * scales)[:, :, [0, 2, 1]] * (1, 1, -1)
+    # OBJ indices are 1-based and count every vertex written so far
+    faces = 1 + len(BOX_CORNERS) * np.arange(len(verts)).reshape(-1, 1, 1) + np.array(BOX_FACES)
     
-    # Right wall
-    bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x + room_width/2, room_y, wall_height))
-    wall = bpy.context.active_object
-    wall.scale = (wall_thickness, room_length/2, wall_height)
-    wall.name = f"Wall_Right_{{room_name}}"
-    wall.data.materials.append(materials['wall'])
+    lines = [f'mtllib {os.path.basename(mtl_path)}']
+    for name, key, box_verts, box_faces in zip(boxes['names'], boxes['keys'], verts.tolist(), faces.tolist()):
+        lines.append(f'o {name}')
+        lines.extend(f'v {x:.6f} {y:.6f} {z:.6f}' for x, y, z in box_verts)
+        lines.append(f'usemtl {CONNECTED_MATERIALS[key][0]}')
+        lines.extend('f ' + ' '.join(map(str, face)) for face in box_faces)
+    with open(obj_path, 'w', newline='\n') as f:
+        f.write('\n'.join(lines) + '\n')
     
-    # Add furniture based on room type
-    furniture_height = 0.4
+    mtl_lines = []
+    for key in dict.fromkeys(boxes['keys']):
+        name, (r, g, b) = CONNECTED_MATERIALS[key]
+        mtl_lines += [f'newmtl {name}', f'Kd {r:.4f} {g:.4f} {b:.4f}', 'Ka 0.0000 0.0000 0.0000', 'd 1.0', 'illum 1', '']
+    with open(mtl_path, 'w', newline='\n') as f:
+        f.write('\n'.join(mtl_lines))
+
+def _publish(src_file, dst_file):
+    """Hard-link src_file as dst_file, copying only where links are unsupported
+
+    A link shares the file's data instead of writing it again, and it outlives the temp
+    directory being removed. Temp and public directories on different drives fall back
+    to a copy.
+    """
+    if os.path.exists(dst_file):
+        os.remove(dst_file)
+    try:
+        os.link(src_file, dst_file)
+    except OSError:
+        shutil.copy2(src_file, dst_file)
+
+class ImprovedConnectedRenderer:
+    """Creates improved connected floor plans with better detail and materials"""
     
-    if room_type == 'living':
-        # Sofa
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/3, room_y, furniture_height/2))
-        furniture = bpy.context.active_object
-        furniture.scale = (room_width/4, 0.4, furniture_height/2)
-        furniture.name = f"Sofa_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+    def __init__(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='constructai_improved_')
+        self.blender_path = 'D:\\blender\\blender.exe'
+        self.scene_id = None
+        self.gpu_count = 1
+        self._pool = None
+        # Inside public/renders; hits are re-published there under the requesting scene id
+        self._cache_dir = os.path.join('public', 'renders', 'cache')
+    
+    def render_connected_floor_plan(self, boq_config):
+        """Render an improved connected floor plan"""
         
-        # Coffee table
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y, 0.2))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.6, 0.3, 0.2)
-        furniture.name = f"Table_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        # Use configured scene_id if available, otherwise generate one. Kept local so
+        # concurrent render_batch jobs never read each other's id
+        output_config = boq_config.get('output', {})
+        scene_id = self.scene_id = output_config.get('scene_id', str(uuid.uuid4()))
         
-    elif room_type == 'kitchen':
-        # Kitchen island
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y, furniture_height/2))
-        furniture = bpy.context.active_object
-        furniture.scale = (room_width/3, 0.5, furniture_height/2)
-        furniture.name = f"Island_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        quality = _render_quality(boq_config)
+        if output_config.get('quality', quality) != quality:
+            print(f"⚠️ Unknown quality {output_config['quality']!r}, rendering as {quality}")
         
-        # Counter
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/3, room_y + room_length/3, furniture_height/2))
-        furniture = bpy.context.active_object
-        furniture.scale = (room_width/4, 0.3, furniture_height/2)
-        furniture.name = f"Counter_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        rooms = boq_config.get('rooms', [])
+        building_dims = boq_config.get('building_dimensions', {"total_width": 20, "total_length": 20, "height": 8})
         
-    elif room_type == 'bedroom':
-        # Bed
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y, 0.3))
-        furniture = bpy.context.active_object
-        furniture.scale = (room_width/3, room_length/3, 0.3)
-        furniture.name = f"Bed_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        print(f"Creating improved connected floor plan: {scene_id}")
+        print(f"Rooms: {len(rooms)}")
         
-        # Dresser
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x + room_width/3, room_y, furniture_height/2))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.3, 0.25, furniture_height/2)
-        furniture.name = f"Dresser_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        # An identical layout renders identical files, so it is served from the cache
+        cache_key = self.config_hash(boq_config)
+        cached = self.cached_result(cache_key, scene_id)
+        if cached is not None:
+            print("✅ Connected floor plan served from cache")
+            return cached
         
-    elif room_type == 'bathroom':
-        # Toilet
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x - room_width/3, room_y + room_length/3, 0.2))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.15, 0.25, 0.2)
-        furniture.name = f"Toilet_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        # Boot Blender now so its startup and GPU kernel warm-up overlap with layout and script generation
+        self._worker_pool().start()
         
-        # Sink
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x + room_width/3, room_y + room_length/3, furniture_height/2))
-        furniture = bpy.context.active_object
-        furniture.scale = (0.25, 0.15, 0.05)
-        furniture.name = f"Sink_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
+        # Box transforms are computed here and passed to the static script with its settings
+        boxes = _connected_boxes(rooms, building_dims)
         
-        # Bathtub
-        bpy.ops.mesh.primitive_cube_add(size=2, location=(room_x, room_y - room_length/3, 0.25))
-        furniture = bpy.context.active_object
-        furniture.scale = (room_width/3, 0.3, 0.25)
-        furniture.name = f"Bathtub_{{room_name}}"
-        furniture.data.materials.append(materials['furniture'])
-
-# Add connecting hallway
-hallway_width = 2
-bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0.05))
-hallway = bpy.context.active_object
-hallway.scale = (building_width/2, hallway_width/2, 0.05)
-hallway.name = "Main_Hallway"
-hallway.data.materials.append(materials['living'])
-
-# Add lighting
-light_data = bpy.data.lights.new(name="Sun", type='SUN')
-light_data.energy = 5
-light_object = bpy.data.objects.new(name="Sun", object_data=light_data)
-bpy.context.collection.objects.link(light_object)
-light_object.location = (building_width, building_length, building_height * 2)
-light_object.rotation_euler = (0.785, 0, 0.785)
-
-# Add area light for better illumination
-area_light = bpy.data.lights.new(name="Area", type='AREA')
-area_light.energy = 100
-area_light.size = 15
-area_object = bpy.data.objects.new(name="Area", object_data=area_light)
-bpy.context.collection.objects.link(area_object)
-area_object.location = (0, 0, building_height * 1.5)
-
-# Position camera for good view
-bpy.ops.object.camera_add(location=(building_width*0.7, -building_length*0.7, building_height*0.7))
-camera = bpy.context.active_object
-camera.rotation_euler = (1.0, 0, 0.785)
-scene.camera = camera
-
-# Configure render settings
-scene.render.resolution_x = 1920
-scene.render.resolution_y = 1080
-scene.render.film_transparent = False
-scene.render.engine = 'CYCLES'
-scene.cycles.samples = 64
-scene.cycles.use_denoising = True
-
-# Export files
-output_dir = "{self.temp_dir.replace(chr(92), '/')}"
-blend_file = output_dir + "/improved_floor_plan_{self.scene_id}.blend"
-obj_file = output_dir + "/improved_floor_plan_{self.scene_id}.obj"
-mtl_file = output_dir + "/improved_floor_plan_{self.scene_id}.mtl"
-render_file = output_dir + "/improved_floor_plan_{self.scene_id}.png"
-
-# Save blend file
-bpy.ops.wm.save_as_mainfile(filepath=blend_file)
-print("BLEND_FILE: " + blend_file)
-
-# Export OBJ with materials
-try:
-    bpy.ops.wm.obj_export(
-        filepath=obj_file,
-        check_existing=False,
-        export_selected_objects=False,
-        export_materials=True,
-        export_material_groups=True,
-        export_vertex_groups=False,
-        export_smooth_groups=False
-    )
-    print("OBJ_FILE: " + obj_file)
-    print("MTL_FILE: " + mtl_file)
-except:
-    try:
-        bpy.ops.export_scene.obj(
-            filepath=obj_file,
-            check_existing=False,
-            use_selection=False,
-            use_materials=True,
-            use_mesh_modifiers=True
-        )
-        print("OBJ_FILE: " + obj_file)
-        print("MTL_FILE: " + mtl_file)
-    except Exception as e:
-        print("OBJ export failed: " + str(e))
-
-# Render preview image
-try:
-    scene.render.filepath = render_file
-    bpy.ops.render.render(write_still=True)
-    print("RENDER_FILE: " + render_file)
-except Exception as e:
-    print("Render failed: " + str(e))
-
-print("SCENE_ID: {self.scene_id}")
-"""
-
-        # Write script to file
-        script_path = os.path.join(self.temp_dir, f"render_script_{self.scene_id}.py")
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(blender_script)
+        # The OBJ comes straight from the same boxes, so Blender only builds and renders;
+        # the script never reads it, so it is written on a thread while Blender works
+        obj_file = Path(self.temp_dir, f'improved_floor_plan_{scene_id}.obj').as_posix()
+        mtl_file = Path(self.temp_dir, f'improved_floor_plan_{scene_id}.mtl').as_posix()
+        executor = ThreadPoolExecutor(max_workers=1)
+        obj_future = executor.submit(_write_obj, boxes, obj_file, mtl_file)
+        executor.shutdown(wait=False)
         
-        # Run Blender
-        cmd = [
-            self.blender_path,
-            '--background',
-            '--python', script_path,
-            '--',
-            '--verbose'
-        ]
+        layout = {
+            'scene_id': scene_id,
+            'output_dir': Path(self.temp_dir).as_posix(),
+            'building': building_dims,
+            'materials': CONNECTED_MATERIALS,
+            'box_corners': BOX_CORNERS,
+            'box_faces': BOX_FACES,
+            'boxes': boxes,
+            'render': RENDER_QUALITY[quality],
+            'obj_file': obj_file,
+            'mtl_file': mtl_file,
+        }
+        layout_path = Path(self.temp_dir, f'layout_{scene_id}.json').as_posix()
+        with open(layout_path, 'w', encoding='utf-8') as f:
+            json.dump(layout, f)
+        
+        print(f"Connected floor plan layout written to: {layout_path}")
         
-        print(f"Running Blender: {' '.join(cmd)}")
+        # Run the script in a warm Blender, started on the first render and reused after that.
+        # Markers are picked out as lines arrive; the full transcript only goes to the log file
+        log_path = os.path.join(self.temp_dir, f"improved_floor_plan_{scene_id}.log")
+        result = {'scene_id': scene_id, 'success': False}
+        def on_line(line):
+            marker, _, value = line.partition(': ')
+            if marker in CONNECTED_MARKERS:
+                result[CONNECTED_MARKERS[marker]] = value.strip()
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                cwd=self.temp_dir
-            )
+            ok, output_tail = self._worker_pool().run([CONNECTED_SCRIPT_PATH, '--', '--config', layout_path],
+                                                      log_path, on_line, timeout=300)
+            obj_future.result()
             
-            print("STDOUT:")
-            print(result.stdout)
-            if result.stderr:
-                print("STDERR:")
-                print(result.stderr)
+            if not ok:
+                print(f"Blender script error: {output_tail}")
             
-            return self.parse_output(result.stdout)
+            output = self.publish_outputs(result)
+            if output['success']:
+                self.store_cached_result(cache_key, output)
+            return output
             
         except subprocess.TimeoutExpired:
             print("Blender process timed out")
@@ -382,65 +325,136 @@ print("SCENE_ID: {self.scene_id}")
             print(f"Error running Blender: {e}")
             return None
     
-    def parse_output(self, output):
-        """Parse Blender output to extract file paths"""
-        result = {
-            'scene_id': self.scene_id,
-            'success': False
-        }
-        
-        lines = output.split('\n')
-        for line in lines:
-            if 'SCENE_ID:' in line:
-                result['scene_id'] = line.split('SCENE_ID:')[1].strip()
-            elif 'BLEND_FILE:' in line:
-                result['blend_file'] = line.split('BLEND_FILE:')[1].strip()
-            elif 'OBJ_FILE:' in line:
-                result['obj_file'] = line.split('OBJ_FILE:')[1].strip()
-            elif 'MTL_FILE:' in line:
-                result['mtl_file'] = line.split('MTL_FILE:')[1].strip()
-            elif 'RENDER_FILE:' in line:
-                result['render_file'] = line.split('RENDER_FILE:')[1].strip()
-        
-        # Copy files to public directory with cache-busting
+    def publish_outputs(self, result):
+        """Publish the files named by the script's markers in the public directory
+
+        Paths in result are replaced by cache-busted /renders URLs. Success means both
+        the OBJ and its MTL were produced.
+        """
         public_renders = 'public/renders'
         os.makedirs(public_renders, exist_ok=True)
         
-        cache_buster = f"?v={int(uuid.uuid4().int % 1e10)}"
+        cache_buster = f"?v={time.time_ns()}"
         
-        if 'obj_file' in result:
-            src_obj = result['obj_file']
-            dst_obj = os.path.join(public_renders, os.path.basename(src_obj))
-            if os.path.exists(src_obj):
-                shutil.copy2(src_obj, dst_obj)
-                result['obj_file'] = f"/renders/{os.path.basename(src_obj)}{cache_buster}"
+        for key in CACHED_OUTPUTS:
+            src_file = result.get(key)
+            if src_file and os.path.exists(src_file):
+                _publish(src_file, os.path.join(public_renders, os.path.basename(src_file)))
+                result[key] = f"/renders/{os.path.basename(src_file)}{cache_buster}"
         
-        if 'mtl_file' in result:
-            src_mtl = result['mtl_file']
-            dst_mtl = os.path.join(public_renders, os.path.basename(src_mtl))
-            if os.path.exists(src_mtl):
-                shutil.copy2(src_mtl, dst_mtl)
-                result['mtl_file'] = f"/renders/{os.path.basename(src_mtl)}{cache_buster}"
+        result['success'] = 'obj_file' in result and 'mtl_file' in result
+        return result
+    
+    def config_hash(self, config):
+        """Stable digest of everything in a config that changes the render
+
+        Of the output section only the quality changes the files, so the scene id is left
+        out; floats are rounded so float noise does not split entries.
+        """
+        def normalize(value):
+            if isinstance(value, float):
+                return round(value, 4)
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+        scene = {key: value for key, value in config.items() if key != 'output'}
+        scene['quality'] = _render_quality(config)
+        payload = json.dumps(normalize(scene), sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def cached_result(self, cache_key, scene_id):
+        """Previous render's cached outputs published under scene_id, or None on a miss
+
+        The files are linked into public/renders with this scene's names, and the OBJ is
+        rewritten so its mtllib line points at the renamed .mtl.
+        """
+        cache_dir = os.path.join(self._cache_dir, cache_key)
+        meta_path = os.path.join(cache_dir, 'result.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
         
-        if 'blend_file' in result:
-            src_blend = result['blend_file']
-            dst_blend = os.path.join(public_renders, os.path.basename(src_blend))
-            if os.path.exists(src_blend):
-                shutil.copy2(src_blend, dst_blend)
-                result['blend_file'] = f"/renders/{os.path.basename(src_blend)}{cache_buster}"
+        sources = {key: os.path.join(cache_dir, cached[key]) for key in CACHED_OUTPUTS}
+        if not all(map(os.path.exists, sources.values())):
+            return None
         
-        if 'render_file' in result:
-            src_render = result['render_file']
-            dst_render = os.path.join(public_renders, os.path.basename(src_render))
-            if os.path.exists(src_render):
-                shutil.copy2(src_render, dst_render)
-                result['render_file'] = f"/renders/{os.path.basename(src_render)}{cache_buster}"
+        public_renders = 'public/renders'
+        os.makedirs(public_renders, exist_ok=True)
+        names = {key: f"improved_floor_plan_{scene_id}{os.path.splitext(src_file)[1]}"
+                 for key, src_file in sources.items()}
+        for key, src_file in sources.items():
+            dst_file = os.path.join(public_renders, names[key])
+            if key != 'obj_file':
+                _publish(src_file, dst_file)
+                continue
+            # Removed first - a link to the cached OBJ must not be rewritten in place
+            if os.path.exists(dst_file):
+                os.remove(dst_file)
+            with open(src_file, 'r', encoding='utf-8', newline='') as src, \
+                    open(dst_file, 'w', encoding='utf-8', newline='') as dst:
+                first_line = src.readline()
+                if first_line.startswith('mtllib '):
+                    first_line = f"mtllib {names['mtl_file']}\n"
+                dst.write(first_line)
+                shutil.copyfileobj(src, dst)
         
-        result['success'] = 'obj_file' in result and 'mtl_file' in result
+        cache_buster = f"?v={time.time_ns()}"
+        result = {'scene_id': scene_id, 'success': True, 'cached': True}
+        for key, name in names.items():
+            result[key] = f"/renders/{name}{cache_buster}"
         return result
     
+    def store_cached_result(self, cache_key, result):
+        """Keep a successful render's published outputs for identical later requests"""
+        # '/renders/name.obj?v=123' was published as public/renders/name.obj
+        files = {key: os.path.basename(result[key].split('?')[0]) for key in CACHED_OUTPUTS if key in result}
+        sources = {key: os.path.join('public', 'renders', name) for key, name in files.items()}
+        if len(sources) < len(CACHED_OUTPUTS) or not all(map(os.path.exists, sources.values())):
+            return
+        cache_dir = os.path.join(self._cache_dir, cache_key)
+        os.makedirs(cache_dir, exist_ok=True)
+        for key, src_file in sources.items():
+            _publish(src_file, os.path.join(cache_dir, files[key]))
+        # Written last, so an interrupted store is never read as a hit
+        with open(os.path.join(cache_dir, 'result.json'), 'w', encoding='utf-8') as f:
+            json.dump({'scene_id': result['scene_id'], 'success': True, **files}, f)
+    
+    def invalidate_cache(self, boq_config=None):
+        """Drop the cached render for one BOQ config, or the whole cache"""
+        if boq_config is None:
+            target = self._cache_dir
+        else:
+            target = os.path.join(self._cache_dir, self.config_hash(boq_config))
+        shutil.rmtree(target, ignore_errors=True)
+    
+    def _worker_pool(self, size=1):
+        """The renderer's warm Blender pool, grown to at least size workers"""
+        if self._pool is None:
+            self._pool = BlenderWorkerPool(self.blender_path, size, self.gpu_count)
+        else:
+            self._pool.gpu_count = self.gpu_count
+            self._pool.grow(size)
+        return self._pool
+    
+    def render_batch(self, boq_configs, max_workers=2, gpu_count=None):
+        """Render several connected floor plans concurrently, returning results in config order
+
+        Each thread prepares its layout and script, then waits on its own pool worker. Worker
+        i is pinned to GPU i % gpu_count, so parallel renders land on distinct devices.
+        """
+        if gpu_count is not None:
+            self.gpu_count = gpu_count
+        self._worker_pool(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.render_connected_floor_plan, boq_configs))
+    
     def cleanup(self):
-        """Clean up temporary files"""
+        """Stop the warm Blender process and clean up temporary files"""
+        if self._pool is not None:
+            self._pool.close()
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
 
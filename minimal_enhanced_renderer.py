@@ -100,8 +100,8 @@ class MinimalEnhancedRenderer:
         print(f"Generated simple layout with {len(layout_positions)} rooms")
         
         # Create enhanced Blender script
-        layout_json_str = json.dumps(layout_positions).replace('true', 'True').replace('false', 'False').replace('null', 'None')
-        enhanced_features_str = json.dumps(enhanced_features).replace('true', 'True').replace('false', 'False').replace('null', 'None')
+        layout_json_str = repr(layout_positions)
+        enhanced_features_str = repr(enhanced_features)
         
         blender_script = f'''
 import bpy
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP session shared by the validation and status-check scripts
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_session(pool_connections=1, pool_maxsize=4):
+    """requests.Session with keep-alive pooling and retries for http:// URLs
+
+    Only connection failures are retried, since POST is not an idempotent method for Retry.
+    """
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                         max_retries=Retry(total=2, backoff_factor=0.3)))
+    return session
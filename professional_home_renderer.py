@@ -377,7 +377,7 @@ def create_bathroom_furniture(room_x, room_y, room_width, room_length, room_heig
     return furniture
 
 # Create rooms with interiors
-layout_positions = {json.dumps(layout_positions).replace('true', 'True').replace('false', 'False').replace('null', 'None')}
+layout_positions = {repr(layout_positions)}
 
 for room_data in layout_positions:
     room = room_data['room']